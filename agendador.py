@@ -0,0 +1,338 @@
+"""
+Agendador das atualizações periódicas do dataset
+Processo de longa duração que roda, cada uma no seu intervalo (com jitter):
+    listagem   coleta incremental das provas novas
+    detalhes   enriquecimento pelas páginas de detalhe (novas primeiro)
+    pdfs       download dos PDFs ainda não baixados
+
+As tarefas rodam uma de cada vez, na ordem de prioridade acima; uma execução
+nunca se sobrepõe a outra (nem a outro agendador no mesmo dataset, graças ao
+arquivo de trava). Cada tarefa publica o provas_concursos.json atualizado de
+forma atômica (repositório SQLite + JSON exportado dele) e o estado das
+execuções fica em status_agendador.json.
+
+    python agendador.py --intervalo-listagem 3600 --intervalo-detalhes 21600
+    python agendador.py --status
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import traceback
+from datetime import datetime
+
+from arquivos import gravar_atomico
+from baixar_pdfs import BaixadorPDFs
+from repositorio import ARQUIVO_BANCO, RepositorioProvas
+from scraper import ConcursoScraper, URL_BASE
+
+# Ordem de prioridade quando mais de uma tarefa está vencida
+TAREFAS = ('listagem', 'detalhes', 'pdfs')
+
+FORMATO_DATA = '%Y-%m-%d %H:%M:%S'
+
+
+def _formatar(instante):
+    return datetime.fromtimestamp(instante).strftime(FORMATO_DATA) if instante else None
+
+
+def _ler_data(texto):
+    return datetime.strptime(texto, FORMATO_DATA).timestamp() if texto else None
+
+
+def _origem(config):
+    """Dataset anterior: o banco, ou o JSON antes da primeira gravação no banco"""
+    return config.banco if os.path.exists(config.banco) else config.arquivo
+
+
+def _publicar(config, provas=None):
+    """Grava as provas no banco (se dadas), publica a versão (com o delta) e regenera o JSON e os snapshots"""
+    repositorio = RepositorioProvas(config.banco)
+    try:
+        if provas is not None:
+            repositorio.salvar(provas)
+        repositorio.publicar(config.arquivo)
+    finally:
+        repositorio.fechar()
+
+
+def _gravar_lote(config, lote):
+    """Grava só as provas de um lote, sem reordenar nem publicar: o progresso não se perde numa queda"""
+    repositorio = RepositorioProvas(config.banco)
+    try:
+        repositorio.regravar(lote)
+    finally:
+        repositorio.fechar()
+
+
+def tarefa_listagem(config):
+    """Coleta só as provas novas (para na marca d'água) e publica o dataset"""
+    scraper = ConcursoScraper(diretorio_cache=config.cache, base_url=config.base_url)
+    try:
+        scraper.carregar_existentes(_origem(config), limite_conhecidos=config.limite_conhecidos)
+        scraper.scrape_multiplas_paginas(num_paginas=config.paginas, assincrono=True,
+                                         concorrencia=config.concorrencia, taxa_por_host=config.taxa)
+        novas = scraper.total_provas()
+        scraper.mesclar_existentes()
+        if novas:
+            _publicar(config, scraper.provas)
+        return {'novas': novas, 'total': scraper.total_provas(),
+                'paginas_com_erro': scraper.paginas_com_erro}
+    finally:
+        scraper.cliente.fechar()
+
+
+def tarefa_detalhes(config):
+    """Enriquece um lote de provas incompletas ou desatualizadas e publica o dataset"""
+    scraper = ConcursoScraper(diretorio_cache=config.cache, base_url=config.base_url)
+    try:
+        if not scraper.carregar_existentes(_origem(config)):
+            return {'enriquecidas': 0}
+        scraper.mesclar_existentes()
+        enriquecidas = scraper.enriquecer_detalhes(concorrencia=config.concorrencia, taxa_por_host=config.taxa,
+                                                   limite=config.limite_detalhes,
+                                                   ao_salvar_lote=lambda lote: _gravar_lote(config, lote))
+        if enriquecidas:
+            # Uma publicação por execução; com o dataset inteiro, caso ele ainda viesse do JSON
+            _publicar(config, scraper.provas)
+        return {'enriquecidas': enriquecidas}
+    finally:
+        scraper.cliente.fechar()
+
+
+def tarefa_pdfs(config):
+    """Baixa um lote de PDFs pendentes e publica o dataset com os caminhos"""
+    if not os.path.exists(config.banco):
+        return {'baixados': 0, 'erros': 0}
+    repositorio = RepositorioProvas(config.banco)
+    provas = repositorio.todas()
+    repositorio.fechar()
+
+    baixador = BaixadorPDFs(config.diretorio_pdfs, concorrencia=config.concorrencia)
+    baixados, erros = baixador.baixar_todos(provas, ao_salvar_lote=lambda lote: _gravar_lote(config, lote),
+                                            limite=config.limite_pdfs)
+    if erros and not baixados:
+        raise RuntimeError(f"nenhum PDF baixado ({erros} downloads falharam)")
+    if baixados:
+        _publicar(config)
+    return {'baixados': baixados, 'erros': erros}
+
+
+FUNCOES = {
+    'listagem': tarefa_listagem,
+    'detalhes': tarefa_detalhes,
+    'pdfs': tarefa_pdfs,
+}
+
+
+class TravaArquivo:
+    """Trava entre processos: um arquivo criado com O_EXCL contendo o PID do dono"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def _dono_vivo(self):
+        try:
+            with open(self.caminho, 'r') as f:
+                pid = int(f.read().strip() or 0)
+            os.kill(pid, 0)
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def adquirir(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._dono_vivo():
+                    return False
+                # Trava deixada por um processo que morreu
+                try:
+                    os.remove(self.caminho)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            return True
+        return False
+
+    def liberar(self):
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+
+
+class Agendador:
+    """Executa as tarefas nos seus intervalos, uma de cada vez, registrando o status"""
+
+    def __init__(self, config, intervalos, jitter=0.1, arquivo_status='status_agendador.json',
+                 reagendar_pulada=60):
+        self.config = config
+        self.intervalos = intervalos  # nome da tarefa -> segundos
+        self.jitter = jitter
+        self.arquivo_status = arquivo_status
+        self.reagendar_pulada = reagendar_pulada
+        self.trava = TravaArquivo(config.arquivo + '.lock')
+        self.status = self._carregar_status()
+
+        agora = time.time()
+        self.proximas = {}
+        for nome in intervalos:
+            # Retoma o agendamento anterior; tarefas novas rodam já
+            anterior = _ler_data(self.status['tarefas'].get(nome, {}).get('proxima_execucao'))
+            self.proximas[nome] = anterior if anterior else agora
+
+    def _carregar_status(self):
+        try:
+            with open(self.arquivo_status, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {'tarefas': {}}
+
+    def _salvar_status(self):
+        self.status['atualizado_em'] = _formatar(time.time())
+        self.status['pid'] = os.getpid()
+        gravar_atomico(self.arquivo_status, json.dumps(self.status, ensure_ascii=False, indent=2),
+                       sincronizar=False)
+
+    def _agendar(self, nome, base):
+        intervalo = self.intervalos[nome]
+        self.proximas[nome] = base + intervalo * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def proxima_vencida(self):
+        """Tarefa vencida de maior prioridade, ou None"""
+        agora = time.time()
+        for nome in TAREFAS:
+            if nome in self.proximas and self.proximas[nome] <= agora:
+                return nome
+        return None
+
+    def executar(self, nome):
+        estado = self.status['tarefas'].setdefault(nome, {'execucoes': 0, 'falhas': 0})
+        inicio = time.time()
+
+        if not self.trava.adquirir():
+            print(f"⏭ {nome}: outra execução está em andamento no mesmo dataset, pulando")
+            estado.update(resultado='pulada', ultimo_inicio=_formatar(inicio), ultimo_fim=_formatar(inicio))
+            self.proximas[nome] = inicio + self.reagendar_pulada
+            estado['proxima_execucao'] = _formatar(self.proximas[nome])
+            self._salvar_status()
+            return
+
+        print(f"\n▶ {nome}: iniciando ({_formatar(inicio)})")
+        estado.update(resultado='executando', ultimo_inicio=_formatar(inicio), ultimo_fim=None)
+        self._salvar_status()
+        try:
+            detalhes = FUNCOES[nome](self.config)
+            # Tarefa que terminou com parte dos itens falhando
+            resultado = 'parcial' if detalhes.get('erros') else 'ok'
+            estado.update(resultado=resultado, detalhes=detalhes, erro=None)
+        except Exception as e:
+            traceback.print_exc()
+            estado.update(resultado='erro', erro=f"{e.__class__.__name__}: {e}")
+            estado['falhas'] += 1
+        finally:
+            self.trava.liberar()
+
+        fim = time.time()
+        estado['execucoes'] += 1
+        estado.update(ultimo_fim=_formatar(fim), duracao_segundos=round(fim - inicio, 1))
+        # O intervalo conta a partir do fim: uma execução longa não gera execuções acumuladas
+        self._agendar(nome, fim)
+        estado['proxima_execucao'] = _formatar(self.proximas[nome])
+        self._salvar_status()
+        print(f"■ {nome}: {estado['resultado']} em {fim - inicio:.1f}s, "
+              f"próxima às {estado['proxima_execucao']}")
+
+    def executar_uma_vez(self):
+        """Roda cada tarefa uma vez, em ordem de prioridade (útil para testes e cron)"""
+        for nome in TAREFAS:
+            if nome in self.intervalos:
+                self.executar(nome)
+
+    def rodar(self):
+        print(f"🕒 Agendador iniciado: " + ', '.join(
+            f"{nome} a cada {self.intervalos[nome] / 60:.0f} min" for nome in TAREFAS if nome in self.intervalos))
+        for nome in TAREFAS:
+            if nome in self.proximas:
+                print(f"   {nome}: próxima às {_formatar(self.proximas[nome])}")
+        try:
+            while True:
+                nome = self.proxima_vencida()
+                if nome:
+                    self.executar(nome)
+                    continue
+                espera = min(self.proximas.values()) - time.time()
+                time.sleep(min(max(espera, 0.1), 60))
+        except KeyboardInterrupt:
+            print("\n✓ Agendador encerrado")
+
+
+def exibir_status(arquivo):
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            status = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ {arquivo} não encontrado: o agendador ainda não rodou")
+        return
+
+    print(f"\n📊 Status do agendador (atualizado em {status.get('atualizado_em')}, PID {status.get('pid')})\n")
+    for nome in TAREFAS:
+        estado = status['tarefas'].get(nome)
+        if not estado:
+            continue
+        print(f"{nome}: {estado.get('resultado')} | última {estado.get('ultimo_inicio')} "
+              f"({estado.get('duracao_segundos', '-')}s) | próxima {estado.get('proxima_execucao')}")
+        if estado.get('detalhes'):
+            print(f"   {estado['detalhes']}")
+        if estado.get('erro'):
+            print(f"   erro: {estado['erro']}")
+        print(f"   execuções: {estado.get('execucoes', 0)}, falhas: {estado.get('falhas', 0)}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Agendador das atualizações periódicas do dataset")
+    parser.add_argument('--arquivo', default='provas_concursos.json', help="JSON exportado do banco")
+    parser.add_argument('--banco', default=ARQUIVO_BANCO, metavar='ARQUIVO')
+    parser.add_argument('--status-arquivo', default='status_agendador.json', metavar='ARQUIVO')
+    parser.add_argument('--status', action='store_true', help="mostra o status da última execução e sai")
+    parser.add_argument('--uma-vez', action='store_true', help="roda cada tarefa uma vez e sai")
+    parser.add_argument('--tarefas', nargs='+', choices=TAREFAS, default=list(TAREFAS))
+    parser.add_argument('--intervalo-listagem', type=float, default=3600, metavar='SEGUNDOS')
+    parser.add_argument('--intervalo-detalhes', type=float, default=6 * 3600, metavar='SEGUNDOS')
+    parser.add_argument('--intervalo-pdfs', type=float, default=12 * 3600, metavar='SEGUNDOS')
+    parser.add_argument('--jitter', type=float, default=0.1,
+                        help="variação aleatória dos intervalos, em fração (padrão: 0.1)")
+    parser.add_argument('--paginas', type=int, default=50,
+                        help="máximo de páginas por atualização da listagem")
+    parser.add_argument('--limite-conhecidos', type=int, default=10)
+    parser.add_argument('--limite-detalhes', type=int, default=500,
+                        help="páginas de detalhe por execução")
+    parser.add_argument('--limite-pdfs', type=int, default=200, help="PDFs por execução")
+    parser.add_argument('--diretorio-pdfs', default='pdfs')
+    parser.add_argument('--concorrencia', type=int, default=4)
+    parser.add_argument('--taxa', type=float, default=1.0)
+    parser.add_argument('--cache', default='.cache_http', metavar='DIR')
+    parser.add_argument('--base-url', default=URL_BASE, metavar='URL')
+    args = parser.parse_args()
+
+    if args.status:
+        exibir_status(args.status_arquivo)
+        return
+
+    intervalos = {nome: getattr(args, f'intervalo_{nome}') for nome in args.tarefas}
+    agendador = Agendador(args, intervalos, jitter=args.jitter, arquivo_status=args.status_arquivo)
+    if args.uma_vez:
+        agendador.executar_uma_vez()
+    else:
+        agendador.rodar()
+
+
+if __name__ == "__main__":
+    main()
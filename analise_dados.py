@@ -4,30 +4,50 @@ Requer: matplotlib, seaborn, plotly
 """
 
 import pandas as pd
-import json
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 
+from repositorio import ARQUIVO_BANCO, abrir_repositorio
+from versoes import aplicar_delta_dataframe, deltas_pendentes
+
 class AnalisadorConcursos:
     """Classe para análise e visualização de dados de concursos"""
     
-    def __init__(self, arquivo_json='provas_concursos.json'):
+    def __init__(self, arquivo_json='provas_concursos.json', arquivo_banco=ARQUIVO_BANCO):
         self.arquivo = arquivo_json
+        self.arquivo_banco = arquivo_banco
         self.df = None
+        self.versao = 0
         self._carregar_dados()
     
     def _carregar_dados(self):
-        """Carrega dados do arquivo JSON"""
+        """Carrega dados do snapshot colunar ou do repositório SQLite (importando o JSON na primeira vez)"""
         try:
-            with open(self.arquivo, 'r', encoding='utf-8') as f:
-                dados = json.load(f)
-            self.df = pd.DataFrame(dados)
+            repositorio = abrir_repositorio(self.arquivo_banco, self.arquivo)
+            if repositorio is None:
+                raise FileNotFoundError(self.arquivo)
+            self.df = repositorio.dataframe()
+            self.versao = repositorio.versao()
+            repositorio.fechar()
             print(f"✓ {len(self.df)} provas carregadas para análise")
         except FileNotFoundError:
             print(f"⚠ Arquivo '{self.arquivo}' não encontrado.")
             print("Execute o scraper primeiro: python scraper.py")
     
+    def atualizar(self):
+        """Traz os dados para a última versão publicada aplicando só os deltas (ou recarrega tudo se faltar algum)"""
+        if self.df is None:
+            return self._carregar_dados()
+        deltas = deltas_pendentes(self.versao)
+        if deltas is None:
+            return self._carregar_dados()
+        for delta in deltas:
+            self.df = aplicar_delta_dataframe(self.df, delta)
+            self.versao = delta['versao']
+            print(f"✓ Versão {delta['versao']}: +{len(delta['adicionadas'])} -{len(delta['removidas'])} "
+                  f"~{len(delta['modificadas'])} provas")
+    
     def grafico_bancas(self, top=10, salvar=False):
         """Gráfico de barras das bancas mais frequentes"""
         if self.df is None:
@@ -80,7 +100,7 @@ class AnalisadorConcursos:
         bancas_top = self.df['banca'].value_counts().head(top).index
         df_top = self.df[self.df['banca'].isin(bancas_top)]
         
-        media_questoes = df_top.groupby('banca')['num_questoes'].mean().sort_values(ascending=False)
+        media_questoes = df_top.groupby('banca', observed=True)['num_questoes'].mean().sort_values(ascending=False)
         
         plt.figure(figsize=(12, 6))
         media_questoes.plot(kind='barh', color='coral')
@@ -244,6 +264,7 @@ def main():
             print("[5] Heatmap Banca vs Nível")
             print("[6] Gerar TODOS os gráficos")
             print("[7] Relatório Completo")
+            print("[8] Atualizar dados (última versão)")
             print("[0] Sair")
             print("="*60)
             
@@ -264,6 +285,8 @@ def main():
                     analisador.gerar_todos_graficos(salvar=True)
                 elif opcao == '7':
                     analisador.relatorio_completo()
+                elif opcao == '8':
+                    analisador.atualizar()
                 elif opcao == '0':
                     print("\n✓ Encerrando análise. Até logo!")
                     break
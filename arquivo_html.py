@@ -0,0 +1,151 @@
+"""
+Arquivo do HTML bruto baixado pelo scraper
+Cada página (listagem ou detalhe) é guardada comprimida em um único arquivo
+só de acréscimo, no estilo dos .warc.gz: um membro gzip por registro, lido
+direto pelo deslocamento. O índice (indice.jsonl, também só de acréscimo)
+diz onde está cada versão de cada URL. Assim, depois de corrigir o parsing,
+o dataset inteiro pode ser refeito a partir do arquivo, sem acessar o site
+(python scraper.py --reprocessar).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+ARQUIVO_DADOS = 'paginas.gz'
+ARQUIVO_INDICE = 'indice.jsonl'
+
+
+def ler_registro(caminho, entrada):
+    """Lê e descomprime o corpo de uma entrada do índice"""
+    with open(caminho, 'rb') as f:
+        f.seek(entrada['offset'])
+        return gzip.decompress(f.read(entrada['tamanho']))
+
+
+class ArquivoHTML:
+    """Arquivo de páginas brutas com índice URL -> deslocamento
+
+    O arquivo de dados só é aberto para escrita na primeira gravação, então
+    a mesma classe serve para ler o arquivo durante o reprocessamento.
+    """
+
+    def __init__(self, diretorio='arquivo_html', nivel_compressao=6):
+        self.diretorio = diretorio
+        self.caminho_dados = os.path.join(diretorio, ARQUIVO_DADOS)
+        self.caminho_indice = os.path.join(diretorio, ARQUIVO_INDICE)
+        self.nivel_compressao = nivel_compressao
+        self.coleta = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')  # identifica as páginas desta coleta
+        self.entradas = []  # todas as versões, na ordem em que foram gravadas
+        self._ultimos = {}  # url -> hash da última versão gravada
+        self._dados = None
+        self._indice = None
+        self._lock = threading.Lock()
+        self._carregar_indice()
+
+    def _carregar_indice(self):
+        try:
+            with open(self.caminho_indice, 'r', encoding='utf-8') as f:
+                linhas = f.readlines()
+        except FileNotFoundError:
+            return
+        tamanho_dados = os.path.getsize(self.caminho_dados) if os.path.exists(self.caminho_dados) else 0
+        for linha in linhas:
+            try:
+                entrada = json.loads(linha)
+            except ValueError:
+                continue  # última linha cortada por uma queda no meio da escrita
+            if entrada['offset'] + entrada['tamanho'] > tamanho_dados:
+                continue
+            self.entradas.append(entrada)
+            self._ultimos[entrada['url']] = entrada['sha256']
+
+    def gravar(self, url, corpo, tipo, pagina=None):
+        """Acrescenta o corpo da página, se for diferente da última versão da URL"""
+        digest = hashlib.sha256(corpo).hexdigest()
+        if self._ultimos.get(url) == digest:
+            return False
+        comprimido = gzip.compress(corpo, compresslevel=self.nivel_compressao)
+
+        with self._lock:
+            if self._dados is None:
+                os.makedirs(self.diretorio, exist_ok=True)
+                self._dados = open(self.caminho_dados, 'ab')
+                self._indice = open(self.caminho_indice, 'a', encoding='utf-8')
+            # O índice só é escrito depois dos dados: uma entrada nunca aponta para bytes que faltam
+            offset = self._dados.seek(0, os.SEEK_END)
+            self._dados.write(comprimido)
+            self._dados.flush()
+            entrada = {
+                'url': url,
+                'tipo': tipo,
+                'pagina': pagina,
+                'offset': offset,
+                'tamanho': len(comprimido),
+                'bytes': len(corpo),
+                'sha256': digest,
+                'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'coleta': self.coleta,
+            }
+            self._indice.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+            self._indice.flush()
+            self.entradas.append(entrada)
+            self._ultimos[url] = digest
+        return True
+
+    def ler(self, entrada):
+        return ler_registro(self.caminho_dados, entrada)
+
+    def listagens(self):
+        """Todas as versões das páginas da listagem, das coletas mais novas para as mais antigas
+
+        Dentro de cada coleta as páginas vêm em ordem (1, 2, 3...), como foram
+        mescladas na coleta original. Versões antigas também entram: provas
+        que já mudaram de página desde então só aparecem nelas.
+        """
+        coletas = {}  # coleta -> posição cronológica (o arquivo só recebe acréscimos)
+        entradas = []
+        paginas_legado, legado = set(), 0
+        for entrada in self.entradas:
+            if entrada['tipo'] != 'listagem':
+                continue
+            coleta = entrada.get('coleta')
+            if coleta is None:
+                # Arquivos gravados antes do campo `coleta`: uma página repetida começa outra coleta
+                if entrada['pagina'] in paginas_legado:
+                    paginas_legado, legado = set(), legado + 1
+                paginas_legado.add(entrada['pagina'])
+                coleta = ('legado', legado)
+            entradas.append((coletas.setdefault(coleta, len(coletas)), entrada))
+        entradas.sort(key=lambda item: (-item[0], item[1]['pagina'] or 0))
+        return [entrada for _, entrada in entradas]
+
+    def detalhes(self):
+        """Última versão da página de detalhe de cada prova"""
+        ultimas = {}
+        for entrada in self.entradas:
+            if entrada['tipo'] == 'detalhe':
+                ultimas[entrada['url']] = entrada
+        return list(ultimas.values())
+
+    def resumo(self):
+        bytes_originais = sum(e['bytes'] for e in self.entradas)
+        bytes_comprimidos = sum(e['tamanho'] for e in self.entradas)
+        return {
+            'registros': len(self.entradas),
+            'urls': len(self._ultimos),
+            'listagens': sum(1 for e in self.entradas if e['tipo'] == 'listagem'),
+            'detalhes': sum(1 for e in self.entradas if e['tipo'] == 'detalhe'),
+            'bytes_originais': bytes_originais,
+            'bytes_comprimidos': bytes_comprimidos,
+        }
+
+    def fechar(self):
+        with self._lock:
+            if self._dados is not None:
+                self._dados.close()
+                self._indice.close()
+                self._dados = self._indice = None
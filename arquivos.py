@@ -0,0 +1,30 @@
+"""
+Funções auxiliares para gravação segura de arquivos
+"""
+
+import os
+import tempfile
+
+
+def gravar_atomico(caminho, dados, sincronizar=True):
+    """Grava em arquivo temporário e renomeia, para nunca deixar arquivo pela metade
+
+    Se o processo cair no meio da escrita, o arquivo anterior continua intacto.
+    Com `sincronizar`, os dados são forçados para o disco (fsync) antes da troca.
+    """
+    diretorio = os.path.dirname(caminho) or '.'
+    os.makedirs(diretorio, exist_ok=True)
+    if isinstance(dados, str):
+        dados = dados.encode('utf-8')
+
+    fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+            if sincronizar:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
@@ -0,0 +1,214 @@
+"""
+Download paralelo dos PDFs de provas e gabaritos
+Os arquivos são gravados em blocos direto no disco, downloads interrompidos
+continuam com HTTP Range e o armazenamento é endereçado pelo SHA-256 do
+conteúdo, então PDFs idênticos ficam guardados uma única vez
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from repositorio import ARQUIVO_BANCO, RepositorioProvas, importar_json
+
+# Campo com o link -> prefixo dos campos preenchidos após o download
+CAMPOS_PDF = {
+    'link_prova_pdf': 'prova_pdf',
+    'link_gabarito_pdf': 'gabarito_pdf',
+}
+
+
+class BaixadorPDFs:
+    """Baixa PDFs em paralelo para um repositório endereçado por conteúdo"""
+
+    def __init__(self, diretorio='pdfs', concorrencia=8, tamanho_bloco=64 * 1024,
+                 timeout=30, max_tentativas=3, headers=None):
+        self.diretorio = diretorio
+        self.concorrencia = concorrencia
+        self.tamanho_bloco = tamanho_bloco
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=concorrencia, pool_maxsize=concorrencia)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        os.makedirs(os.path.join(diretorio, 'parciais'), exist_ok=True)
+        self._lock = threading.Lock()
+        self.bytes_baixados = 0
+
+    def caminho_final(self, digest):
+        """Caminho do PDF no repositório: pdfs/ab/abcdef....pdf"""
+        return os.path.join(self.diretorio, digest[:2], digest + '.pdf')
+
+    def _caminho_parcial(self, url):
+        chave = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.diretorio, 'parciais', chave + '.part')
+
+    def _hash_parcial(self, caminho):
+        """Recalcula o hash do trecho já baixado para continuar de onde parou"""
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(self.tamanho_bloco), b''):
+                h.update(bloco)
+        return h
+
+    def _baixar_parcial(self, url, parcial):
+        """Baixa (ou continua baixando) a URL para o arquivo parcial e retorna o hash"""
+        inicio = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        headers = {'Range': f'bytes={inicio}-'} if inicio else {}
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+            if inicio and r.status_code == 416:
+                # O trecho salvo já é o arquivo inteiro
+                return self._hash_parcial(parcial)
+            r.raise_for_status()
+
+            if inicio and r.status_code == 206:
+                h = self._hash_parcial(parcial)
+                modo = 'ab'
+            else:
+                # Servidor ignorou o Range (200): recomeça do zero
+                h = hashlib.sha256()
+                modo = 'wb'
+
+            with open(parcial, modo) as f:
+                for bloco in r.iter_content(chunk_size=self.tamanho_bloco):
+                    f.write(bloco)
+                    h.update(bloco)
+                    with self._lock:
+                        self.bytes_baixados += len(bloco)
+
+        return h
+
+    def baixar(self, url):
+        """Baixa um PDF e retorna (caminho, tamanho, sha256)"""
+        parcial = self._caminho_parcial(url)
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                h = self._baixar_parcial(url, parcial)
+                break
+            except (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                # O que já foi gravado no .part é aproveitado na próxima tentativa
+                if tentativa == self.max_tentativas:
+                    raise
+                time.sleep(2 ** tentativa)
+
+        digest = h.hexdigest()
+        tamanho = os.path.getsize(parcial)
+        final = self.caminho_final(digest)
+        if os.path.exists(final):
+            os.remove(parcial)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(parcial, final)
+        return final, tamanho, digest
+
+    def _ja_baixado(self, prova, prefixo):
+        caminho = prova.get(f'arquivo_{prefixo}')
+        return bool(caminho) and os.path.exists(caminho)
+
+    def baixar_todos(self, provas, campos=tuple(CAMPOS_PDF), tamanho_lote=100, ao_salvar_lote=None,
+                     limite=None):
+        """Baixa os PDFs das provas, grava caminho, tamanho e hash em cada registro e retorna (baixados, erros)
+
+        Cada URL é baixada uma só vez, mesmo que apareça em vários registros.
+        A cada `tamanho_lote` downloads, `ao_salvar_lote(lote)` recebe as provas alteradas nesse lote.
+        `limite` restringe quantas URLs são baixadas nesta chamada, na ordem das provas.
+        """
+        pendentes = {}  # url -> [(prova, prefixo), ...]
+        for prova in provas:
+            for campo in campos:
+                url = prova.get(campo)
+                prefixo = CAMPOS_PDF[campo]
+                if url and not self._ja_baixado(prova, prefixo):
+                    if limite is not None and url not in pendentes and len(pendentes) >= limite:
+                        continue
+                    pendentes.setdefault(url, []).append((prova, prefixo))
+
+        print(f"📄 {len(pendentes)} PDFs para baixar ({self.concorrencia} downloads simultâneos)")
+        inicio = time.monotonic()
+        feitos = erros = 0
+        lote = []
+
+        with ThreadPoolExecutor(max_workers=self.concorrencia) as executor:
+            futuros = {executor.submit(self.baixar, url): url for url in pendentes}
+            for futuro in as_completed(futuros):
+                url = futuros[futuro]
+                try:
+                    caminho, tamanho, digest = futuro.result()
+                except Exception as e:
+                    erros += 1
+                    print(f"  ✗ Erro ao baixar {url}: {e}")
+                    continue
+
+                for prova, prefixo in pendentes[url]:
+                    prova[f'arquivo_{prefixo}'] = caminho
+                    prova[f'tamanho_{prefixo}'] = tamanho
+                    prova[f'hash_{prefixo}'] = digest
+                    lote.append(prova)
+
+                feitos += 1
+                if feitos % tamanho_lote == 0:
+                    print(f"  ✓ {feitos}/{len(pendentes)} PDFs baixados")
+                    if ao_salvar_lote:
+                        ao_salvar_lote(lote)
+                    lote = []
+
+        if ao_salvar_lote and lote:
+            ao_salvar_lote(lote)
+
+        duracao = time.monotonic() - inicio
+        print(f"✓ {feitos} PDFs baixados, {erros} erros, "
+              f"{self.bytes_baixados / 1e6:.1f} MB em {duracao:.1f}s")
+        return feitos, erros
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Baixa os PDFs de provas e gabaritos")
+    parser.add_argument('--banco', default=ARQUIVO_BANCO,
+                        help=f"repositório com os links dos PDFs (padrão: {ARQUIVO_BANCO})")
+    parser.add_argument('--arquivo', default='provas_concursos.json',
+                        help="JSON exportado após os downloads (e importado se o banco ainda não existir)")
+    parser.add_argument('--diretorio', default='pdfs',
+                        help="repositório local dos PDFs (padrão: pdfs)")
+    parser.add_argument('--concorrencia', type=int, default=8,
+                        help="downloads simultâneos")
+    parser.add_argument('--tipo', choices=['todos', 'prova', 'gabarito'], default='todos',
+                        help="quais PDFs baixar")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.banco):
+        if not os.path.exists(args.arquivo):
+            print("⚠ Nenhum dataset encontrado. Execute o scraper primeiro: python scraper.py")
+            return
+        print(f"✓ {importar_json(args.arquivo, args.banco)} provas importadas de {args.arquivo} para {args.banco}")
+
+    campos = {
+        'todos': tuple(CAMPOS_PDF),
+        'prova': ('link_prova_pdf',),
+        'gabarito': ('link_gabarito_pdf',),
+    }[args.tipo]
+
+    repositorio = RepositorioProvas(args.banco)
+    try:
+        provas = repositorio.todas()
+        baixador = BaixadorPDFs(args.diretorio, concorrencia=args.concorrencia)
+        baixador.baixar_todos(provas, campos=campos, ao_salvar_lote=repositorio.regravar)
+        print(f"✓ Versão {repositorio.publicar(args.arquivo)} do dataset publicada")
+    finally:
+        repositorio.fechar()
+
+
+if __name__ == "__main__":
+    main()
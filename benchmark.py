@@ -0,0 +1,134 @@
+"""
+Benchmark do scraper com páginas sintéticas, sem acessar o site
+Mede páginas/s e registros/s de cada etapa em 1x, 10x e 100x páginas:
+    scrape_pagina  download (fixtures reproduzidas) + parsing + mesclagem
+    parsing        só extrair_provas sobre o HTML já em memória
+    dedupe         mesclagem por link canônico, com cada página vista duas vezes
+    exportacao     JSON, CSV e JSONL
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from exportacao import SaidaJSONL
+from fixtures_http import gerar_pagina_listagem, gravar_fixtures_sinteticas
+from scraper import ConcursoScraper, extrair_provas
+
+
+def _medir(funcao):
+    """Executa `funcao` sem a saída no terminal e retorna (resultado, segundos)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        return resultado, time.perf_counter() - inicio
+
+
+def _linha(etapa, paginas, registros, segundos):
+    return {
+        'etapa': etapa,
+        'paginas': paginas,
+        'registros': registros,
+        'segundos': round(segundos, 4),
+        'paginas_s': round(paginas / segundos, 1) if segundos else None,
+        'registros_s': round(registros / segundos, 1) if segundos else None,
+    }
+
+
+def medir_escala(num_paginas, parser='lxml', por_pagina=30, diretorio=None):
+    """Roda todas as etapas para `num_paginas` páginas sintéticas"""
+    resultados = []
+    paginas = [gerar_pagina_listagem(p, por_pagina) for p in range(1, num_paginas + 1)]
+
+    # scrape_pagina de ponta a ponta, reproduzindo as páginas de um arquivo de fixtures
+    arquivo_fixtures = os.path.join(diretorio, f'fixtures_{num_paginas}.zip')
+    base = ConcursoScraper(parser=parser)
+    gravar_fixtures_sinteticas(arquivo_fixtures, base._url_pagina, num_paginas, por_pagina)
+    scraper = ConcursoScraper(parser=parser, fixtures=arquivo_fixtures)
+    _, segundos = _medir(lambda: [scraper.scrape_pagina(p) for p in range(1, num_paginas + 1)])
+    resultados.append(_linha('scrape_pagina', num_paginas, len(scraper.provas), segundos))
+    scraper.cliente.fechar()
+
+    # Parsing puro
+    registros_por_pagina, segundos = _medir(
+        lambda: [extrair_provas(html, base.base_url, parser) for html in paginas])
+    total = sum(len(r) for r in registros_por_pagina)
+    resultados.append(_linha(f'parsing ({parser})', num_paginas, total, segundos))
+
+    # Dedupe: cada página é registrada duas vezes, a segunda só com links repetidos
+    dedupe = ConcursoScraper(parser=parser)
+
+    def registrar_duas_vezes():
+        for _ in range(2):
+            for pagina, registros in enumerate(registros_por_pagina, 1):
+                dedupe._registrar_provas([dict(r) for r in registros], pagina)
+
+    _, segundos = _medir(registrar_duas_vezes)
+    resultados.append(_linha('dedupe', 2 * num_paginas, 2 * total, segundos))
+
+    # Exportações a partir dos registros já deduplicados
+    arquivo_json = os.path.join(diretorio, 'provas.json')
+    arquivo_csv = os.path.join(diretorio, 'provas.csv')
+    arquivo_jsonl = os.path.join(diretorio, 'provas.jsonl')
+    _, segundos = _medir(lambda: dedupe.salvar_json(arquivo_json))
+    resultados.append(_linha('exportacao json', num_paginas, len(dedupe.provas), segundos))
+    _, segundos = _medir(lambda: dedupe.salvar_csv(arquivo_csv))
+    resultados.append(_linha('exportacao csv', num_paginas, len(dedupe.provas), segundos))
+
+    def exportar_jsonl():
+        saida = SaidaJSONL(arquivo_jsonl)
+        saida.escrever(dedupe.provas)
+        saida.sincronizar()
+        saida.fechar()
+
+    _, segundos = _medir(exportar_jsonl)
+    resultados.append(_linha('exportacao jsonl', num_paginas, len(dedupe.provas), segundos))
+
+    return resultados
+
+
+def exibir(resultados):
+    print(f"\n{'etapa':<20} {'páginas':>8} {'registros':>10} {'segundos':>9} {'páginas/s':>10} {'registros/s':>12}")
+    print('-' * 74)
+    for r in resultados:
+        print(f"{r['etapa']:<20} {r['paginas']:>8} {r['registros']:>10} {r['segundos']:>9.3f} "
+              f"{r['paginas_s']:>10.1f} {r['registros_s']:>12.1f}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do scraper com páginas sintéticas")
+    parser.add_argument('--paginas-base', type=int, default=10, metavar='N',
+                        help="páginas na escala 1x (padrão: 10)")
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100],
+                        help="multiplicadores de páginas (padrão: 1 10 100)")
+    parser.add_argument('--por-pagina', type=int, default=30,
+                        help="provas por página (padrão: 30, como no site)")
+    parser.add_argument('--parser', choices=['lxml', 'bs4'], default='lxml')
+    parser.add_argument('--saida', metavar='ARQUIVO',
+                        help="grava os resultados em JSON para comparar execuções")
+    args = parser.parse_args()
+
+    todos = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for escala in args.escalas:
+            num_paginas = args.paginas_base * escala
+            print(f"\n⏱ Escala {escala}x: {num_paginas} páginas, {num_paginas * args.por_pagina} provas")
+            resultados = medir_escala(num_paginas, args.parser, args.por_pagina, diretorio)
+            for r in resultados:
+                r['escala'] = escala
+            exibir(resultados)
+            todos.extend(resultados)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(todos, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ Resultados salvos em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
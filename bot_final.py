@@ -5,8 +5,7 @@ Versão otimizada e estável
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters, CallbackQueryHandler
-import json
-import pandas as pd
+from repositorio import abrir_repositorio
 
 # Estados da conversa
 ESPERANDO_BANCA, ESPERANDO_ORGAO, ESPERANDO_CARGO, ESPERANDO_ANO = range(4)
@@ -16,17 +15,14 @@ class BotConcursos:
     
     def __init__(self, token):
         self.token = token
-        self.dados = []
-        self.df = None
+        self.repositorio = None
         self._carregar_dados()
     
     def _carregar_dados(self):
-        """Carrega os dados das provas"""
+        """Abre o repositório das provas (filtros e contagens são consultas indexadas)"""
         try:
-            with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-                self.dados = json.load(f)
-            self.df = pd.DataFrame(self.dados)
-            print(f"✓ {len(self.dados)} provas carregadas")
+            self.repositorio = abrir_repositorio()
+            print(f"✓ {self.repositorio.total()} provas disponíveis")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
     
@@ -134,11 +130,11 @@ Este bot ajuda você a buscar provas de concursos públicos.
             context.user_data['mode'] = 'ano'
         
         elif query.data == "stats":
-            df_com_questoes = self.df[self.df['num_questoes'] > 0]
+            estatisticas = self.repositorio.estatisticas(com_questoes=True)
             
-            total = len(df_com_questoes)
-            total_q = df_com_questoes['num_questoes'].sum()
-            media = df_com_questoes['num_questoes'].mean()
+            total = estatisticas['total']
+            total_q = estatisticas['total_questoes']
+            media = estatisticas['media_questoes']
             
             msg = f"""📊 **ESTATÍSTICAS (Apenas com Questões)**
 
@@ -148,16 +144,14 @@ Este bot ajuda você a buscar provas de concursos públicos.
 
 🏛️ **Top 5 Bancas:**
 """
-            for banca, count in df_com_questoes['banca'].value_counts().head(5).items():
+            for banca, count in self.repositorio.contar('banca', com_questoes=True, limite=5):
                 msg += f"  • {banca}: {count}\n"
             
             await query.edit_message_text(msg, parse_mode='Markdown')
         
         elif query.data == "bancas_list":
-            df_com_questoes = self.df[self.df['num_questoes'] > 0]
-            
             msg = "🏛️ **BANCAS (com Questões)**\n\n"
-            for i, (banca, count) in enumerate(df_com_questoes['banca'].value_counts().items(), 1):
+            for i, (banca, count) in enumerate(self.repositorio.contar('banca', com_questoes=True), 1):
                 msg += f"{i}. {banca}: **{count}** provas\n"
             
             await query.edit_message_text(msg, parse_mode='Markdown')
@@ -190,30 +184,22 @@ Este bot ajuda você a buscar provas de concursos públicos.
     
     async def _buscar_banca(self, update: Update, termo: str):
         """Busca por banca"""
-        resultados = [p for p in self.dados 
-                     if termo.upper() in p.get('banca', '').upper() 
-                     and p.get('num_questoes', 0) > 0]
+        resultados = self.repositorio.buscar(com_questoes=True, contendo=True, banca=termo)
         await self._enviar_resultados(update, resultados, f"🏛️ Banca: {termo}")
     
     async def _buscar_orgao(self, update: Update, termo: str):
         """Busca por órgão"""
-        resultados = [p for p in self.dados 
-                     if termo.upper() in p.get('orgao', '').upper()
-                     and p.get('num_questoes', 0) > 0]
+        resultados = self.repositorio.buscar(com_questoes=True, contendo=True, orgao=termo)
         await self._enviar_resultados(update, resultados, f"🏢 Órgão: {termo}")
     
     async def _buscar_cargo(self, update: Update, termo: str):
         """Busca por cargo"""
-        resultados = [p for p in self.dados 
-                     if termo.upper() in p.get('cargo', '').upper()
-                     and p.get('num_questoes', 0) > 0]
+        resultados = self.repositorio.buscar(com_questoes=True, contendo=True, cargo=termo)
         await self._enviar_resultados(update, resultados, f"💼 Cargo: {termo}")
     
     async def _buscar_ano(self, update: Update, termo: str):
         """Busca por ano"""
-        resultados = [p for p in self.dados 
-                     if termo in p.get('ano', '')
-                     and p.get('num_questoes', 0) > 0]
+        resultados = self.repositorio.buscar(com_questoes=True, ano=termo)
         await self._enviar_resultados(update, resultados, f"📅 Ano: {termo}")
     
     async def _enviar_resultados(self, update: Update, resultados: list, titulo: str):
@@ -226,13 +212,13 @@ Este bot ajuda você a buscar provas de concursos públicos.
             tipo = titulo.split(':')[0].strip()  # Ex: "🏛️ Banca"
             
             if "Banca" in tipo:
-                provas_sem_q = [p for p in self.dados if termo.upper() in p.get('banca', '').upper()]
+                provas_sem_q = self.repositorio.buscar(contendo=True, banca=termo)
             elif "Órgão" in tipo:
-                provas_sem_q = [p for p in self.dados if termo.upper() in p.get('orgao', '').upper()]
+                provas_sem_q = self.repositorio.buscar(contendo=True, orgao=termo)
             elif "Cargo" in tipo:
-                provas_sem_q = [p for p in self.dados if termo.upper() in p.get('cargo', '').upper()]
+                provas_sem_q = self.repositorio.buscar(contendo=True, cargo=termo)
             elif "Ano" in tipo:
-                provas_sem_q = [p for p in self.dados if termo in p.get('ano', '')]
+                provas_sem_q = self.repositorio.buscar(ano=termo)
             else:
                 provas_sem_q = []
             
@@ -277,16 +263,16 @@ Este bot ajuda você a buscar provas de concursos públicos.
     
     async def _enviar_stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Envia estatísticas"""
-        if self.df is None or len(self.df) == 0:
+        if self.repositorio is None or not self.repositorio.total():
             await update.message.reply_text("⚠ Sem dados")
             return
         
-        # Filtrar apenas provas com questões
-        df_com_questoes = self.df[self.df['num_questoes'] > 0]
+        # Apenas provas com questões
+        estatisticas = self.repositorio.estatisticas(com_questoes=True)
         
-        total = len(df_com_questoes)
-        total_q = df_com_questoes['num_questoes'].sum()
-        media = df_com_questoes['num_questoes'].mean()
+        total = estatisticas['total']
+        total_q = estatisticas['total_questoes']
+        media = estatisticas['media_questoes']
         
         msg = f"""📊 **ESTATÍSTICAS (Apenas com Questões)**
 
@@ -296,17 +282,15 @@ Este bot ajuda você a buscar provas de concursos públicos.
 
 🏛️ **Top 5 Bancas:**
 """
-        for banca, count in df_com_questoes['banca'].value_counts().head(5).items():
+        for banca, count in self.repositorio.contar('banca', com_questoes=True, limite=5):
             msg += f"  • {banca}: {count}\n"
         
         await update.message.reply_text(msg, parse_mode='Markdown')
     
     async def _enviar_bancas(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Envia lista de bancas"""
-        df_com_questoes = self.df[self.df['num_questoes'] > 0]
-        
         msg = "🏛️ **BANCAS (com Questões)**\n\n"
-        for i, (banca, count) in enumerate(df_com_questoes['banca'].value_counts().items(), 1):
+        for i, (banca, count) in enumerate(self.repositorio.contar('banca', com_questoes=True), 1):
             msg += f"{i}. {banca}: **{count}** provas\n"
         
         await update.message.reply_text(msg, parse_mode='Markdown')
@@ -321,28 +305,22 @@ Este bot ajuda você a buscar provas de concursos públicos.
     
     async def cmd_orgaos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /orgaos"""
-        df_com_questoes = self.df[self.df['num_questoes'] > 0]
-        
         msg = "🏢 **ÓRGÃOS (com Questões)**\n\n"
-        for i, (orgao, count) in enumerate(df_com_questoes['orgao'].value_counts().head(20).items(), 1):
+        for i, (orgao, count) in enumerate(self.repositorio.contar('orgao', com_questoes=True, limite=20), 1):
             msg += f"{i}. {orgao}: **{count}** provas\n"
         await update.message.reply_text(msg, parse_mode='Markdown')
     
     async def cmd_cargos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /cargos"""
-        df_com_questoes = self.df[self.df['num_questoes'] > 0]
-        
         msg = "💼 **CARGOS (com Questões)**\n\n"
-        for i, (cargo, count) in enumerate(df_com_questoes['cargo'].value_counts().head(20).items(), 1):
+        for i, (cargo, count) in enumerate(self.repositorio.contar('cargo', com_questoes=True, limite=20), 1):
             msg += f"{i}. {cargo}: **{count}** provas\n"
         await update.message.reply_text(msg, parse_mode='Markdown')
     
     async def cmd_anos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /anos"""
-        df_com_questoes = self.df[self.df['num_questoes'] > 0]
-        
         msg = "📅 **ANOS (com Questões)**\n\n"
-        for ano, count in df_com_questoes['ano'].value_counts().sort_index(ascending=False).items():
+        for ano, count in sorted(self.repositorio.contar('ano', com_questoes=True), reverse=True):
             if ano:
                 msg += f"• {ano}: **{count}** provas\n"
         await update.message.reply_text(msg, parse_mode='Markdown')
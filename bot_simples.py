@@ -5,25 +5,21 @@ Versão com menu visual claro
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, MessageHandler, filters
-import json
-import pandas as pd
+from repositorio import abrir_repositorio
 
 class BotSimples:
     """Bot super simples com menu visual"""
     
     def __init__(self, token):
         self.token = token
-        self.dados = []
-        self.df = None
+        self.repositorio = None
         self._carregar_dados()
     
     def _carregar_dados(self):
-        """Carrega os dados das provas"""
+        """Abre o repositório das provas (filtros e contagens são consultas indexadas)"""
         try:
-            with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-                self.dados = json.load(f)
-            self.df = pd.DataFrame(self.dados)
-            print(f"✓ {len(self.dados)} provas carregadas")
+            self.repositorio = abrir_repositorio()
+            print(f"✓ {self.repositorio.total()} provas disponíveis")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
     
@@ -86,10 +82,10 @@ O que você quer fazer?
         await query.answer()
         
         if query.data == "buscar_banca":
-            bancas_top = self.df[self.df['num_questoes'] > 0]['banca'].value_counts().head(10)
+            bancas_top = self.repositorio.contar('banca', com_questoes=True, limite=10)
             
             keyboard = []
-            for banca, count in bancas_top.items():
+            for banca, count in bancas_top:
                 keyboard.append([InlineKeyboardButton(f"{banca} ({count})", callback_data=f"banca:{banca}")])
             keyboard.append([InlineKeyboardButton("⬅️ Voltar", callback_data="menu")])
             
@@ -105,19 +101,18 @@ Clique em uma banca para ver as provas:
             await query.edit_message_text(msg, reply_markup=reply_markup)
         
         elif query.data == "listar_bancas":
-            df_com_q = self.df[self.df['num_questoes'] > 0]
             msg = "🏛️ **BANCAS DISPONÍVEIS:**\n\n"
             
-            for i, (banca, count) in enumerate(df_com_q['banca'].value_counts().items(), 1):
+            for i, (banca, count) in enumerate(self.repositorio.contar('banca', com_questoes=True), 1):
                 msg += f"{i}. {banca}: {count} provas\n"
             
             keyboard = [[InlineKeyboardButton("⬅️ Voltar", callback_data="menu")]]
             await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
         
         elif query.data == "stats":
-            df_com_q = self.df[self.df['num_questoes'] > 0]
-            total = len(df_com_q)
-            total_q = df_com_q['num_questoes'].sum()
+            estatisticas = self.repositorio.estatisticas(com_questoes=True)
+            total = estatisticas['total']
+            total_q = estatisticas['total_questoes']
             media = total_q / total if total > 0 else 0
             
             msg = f"""
@@ -131,19 +126,17 @@ Clique em uma banca para ver as provas:
 
 🏛️ TOP 5 Bancas:
 """
-            for banca, count in df_com_q['banca'].value_counts().head(5).items():
+            for banca, count in self.repositorio.contar('banca', com_questoes=True, limite=5):
                 msg += f"  • {banca}: {count}\n"
             
             keyboard = [[InlineKeyboardButton("⬅️ Voltar", callback_data="menu")]]
             await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
         
         elif query.data == "anos":
-            df_com_q = self.df[self.df['num_questoes'] > 0]
-            anos = sorted(df_com_q['ano'].unique(), reverse=True)
+            anos = sorted(self.repositorio.contar('ano', com_questoes=True), reverse=True)
             
             keyboard = []
-            for ano in anos:
-                count = len(df_com_q[df_com_q['ano'] == ano])
+            for ano, count in anos:
                 keyboard.append([InlineKeyboardButton(f"{ano} ({count})", callback_data=f"ano:{ano}")])
             keyboard.append([InlineKeyboardButton("⬅️ Voltar", callback_data="menu")])
             
@@ -151,20 +144,18 @@ Clique em uma banca para ver as provas:
             await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
         
         elif query.data == "orgaos":
-            df_com_q = self.df[self.df['num_questoes'] > 0]
             msg = "🏢 **ÓRGÃOS PÚBLICOS:**\n\n"
             
-            for i, (orgao, count) in enumerate(df_com_q['orgao'].value_counts().head(15).items(), 1):
+            for i, (orgao, count) in enumerate(self.repositorio.contar('orgao', com_questoes=True, limite=15), 1):
                 msg += f"{i}. {orgao}: {count} provas\n"
             
             keyboard = [[InlineKeyboardButton("⬅️ Voltar", callback_data="menu")]]
             await query.edit_message_text(msg, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
         
         elif query.data == "cargos":
-            df_com_q = self.df[self.df['num_questoes'] > 0]
             msg = "💼 **CARGOS MAIS COMUNS:**\n\n"
             
-            for i, (cargo, count) in enumerate(df_com_q['cargo'].value_counts().head(15).items(), 1):
+            for i, (cargo, count) in enumerate(self.repositorio.contar('cargo', com_questoes=True, limite=15), 1):
                 msg += f"{i}. {cargo}: {count} provas\n"
             
             keyboard = [[InlineKeyboardButton("⬅️ Voltar", callback_data="menu")]]
@@ -183,8 +174,7 @@ Clique em uma banca para ver as provas:
     
     async def _mostrar_provas_banca(self, query, banca: str):
         """Mostra provas de uma banca"""
-        provas = [p for p in self.dados 
-                 if p.get('banca') == banca and p.get('num_questoes', 0) > 0]
+        provas = self.repositorio.buscar(com_questoes=True, banca=banca)
         
         if not provas:
             await query.edit_message_text("❌ Nenhuma prova encontrada")
@@ -211,8 +201,7 @@ Clique em uma banca para ver as provas:
     
     async def _mostrar_provas_ano(self, query, ano: str):
         """Mostra provas de um ano"""
-        provas = [p for p in self.dados 
-                 if p.get('ano') == ano and p.get('num_questoes', 0) > 0]
+        provas = self.repositorio.buscar(com_questoes=True, ano=ano)
         
         if not provas:
             await query.edit_message_text("❌ Nenhuma prova encontrada")
@@ -5,28 +5,30 @@ Funcionalidades: Busca por banca, órgão, cargo, ano, estatísticas
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
-import json
-import pandas as pd
 from datetime import datetime
 
+from repositorio import abrir_repositorio
+
 class ConcursosBot:
     """Bot do Telegram para notificações de provas de concursos"""
     
     def __init__(self, token: str):
         self.token = token
         self.app = Application.builder().token(token).build()
-        self.dados_provas = []
+        self.repositorio = None
         self._carregar_dados()
         self._registrar_comandos()
     
     def _carregar_dados(self):
-        """Carrega dados das provas coletadas"""
-        try:
-            with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-                self.dados_provas = json.load(f)
-            print(f"✓ {len(self.dados_provas)} provas carregadas")
-        except FileNotFoundError:
+        """Abre o repositório das provas coletadas (consultas indexadas)"""
+        self.repositorio = abrir_repositorio()
+        if self.repositorio is None:
             print("⚠ Arquivo de dados não encontrado. Execute o scraper primeiro.")
+            return
+        print(f"✓ {self.repositorio.total()} provas disponíveis")
+    
+    def _sem_dados(self):
+        return self.repositorio is None or not self.repositorio.total()
     
     def _registrar_comandos(self):
         """Registra todos os comandos do bot"""
@@ -125,18 +127,19 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida
     
     async def comando_estatisticas(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /estatisticas - Mostra estatísticas gerais"""
-        if not self.dados_provas:
+        if self._sem_dados():
             await update.message.reply_text("⚠ Nenhuma prova disponível no momento.")
             return
         
-        df = pd.DataFrame(self.dados_provas)
+        estatisticas = self.repositorio.estatisticas()
         
-        total_provas = len(self.dados_provas)
-        total_questoes = df['num_questoes'].sum()
-        media_questoes = df['num_questoes'].mean()
+        total_provas = estatisticas['total']
+        total_questoes = estatisticas['total_questoes']
+        media_questoes = estatisticas['media_questoes']
         
-        bancas_top = df['banca'].value_counts().head(5)
-        orgaos_top = df['orgao'].value_counts().head(5)
+        bancas_top = self.repositorio.contar('banca', limite=5)
+        orgaos_top = self.repositorio.contar('orgao', limite=5)
+        mais_recente = self.repositorio.buscar(limite=1)
         
         mensagem = f"""
 📊 **ESTATÍSTICAS GERAIS**
@@ -151,7 +154,7 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida
 🏢 **Top 5 Órgãos:**
 {self._formatar_lista(orgaos_top)}
 
-📅 Última atualização: {df['data_coleta'].iloc[0] if len(df) > 0 else 'N/A'}
+📅 Última atualização: {mais_recente[0].get('data_coleta', 'N/A') if mais_recente else 'N/A'}
         """
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
@@ -176,10 +179,7 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida
             except ValueError:
                 pass
         
-        provas_filtradas = [
-            p for p in self.dados_provas 
-            if banca_busca in p.get('banca', '').upper()
-        ]
+        provas_filtradas = self.repositorio.buscar(contendo=True, banca=banca_busca) if self.repositorio else []
         
         if not provas_filtradas:
             await update.message.reply_text(
@@ -237,15 +237,14 @@ _Digite: /buscar {banca_busca} {i} para ver detalhes_
     
     async def comando_bancas(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /bancas - Lista todas as bancas"""
-        if not self.dados_provas:
+        if self._sem_dados():
             await update.message.reply_text("⚠ Nenhuma prova disponível.")
             return
         
-        df = pd.DataFrame(self.dados_provas)
-        bancas = df['banca'].value_counts()
+        bancas = self.repositorio.contar('banca')
         
         mensagem = "🏛️ **BANCAS DISPONÍVEIS**\n\n"
-        for banca, count in bancas.head(20).items():
+        for banca, count in bancas[:20]:
             mensagem += f"• {banca}: **{count}** provas\n"
         
         if len(bancas) > 20:
@@ -255,15 +254,14 @@ _Digite: /buscar {banca_busca} {i} para ver detalhes_
     
     async def comando_orgaos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /orgaos - Lista todos os órgãos"""
-        if not self.dados_provas:
+        if self._sem_dados():
             await update.message.reply_text("⚠ Nenhuma prova disponível.")
             return
         
-        df = pd.DataFrame(self.dados_provas)
-        orgaos = df['orgao'].value_counts()
+        orgaos = self.repositorio.contar('orgao')
         
         mensagem = "🏢 **ÓRGÃOS DISPONÍVEIS**\n\n"
-        for orgao, count in orgaos.head(20).items():
+        for orgao, count in orgaos[:20]:
             mensagem += f"• {orgao}: **{count}** provas\n"
         
         if len(orgaos) > 20:
@@ -271,10 +269,10 @@ _Digite: /buscar {banca_busca} {i} para ver detalhes_
         
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
-    def _formatar_lista(self, series):
-        """Formata uma Series do pandas como lista"""
+    def _formatar_lista(self, contagens):
+        """Formata [(nome, quantidade), ...] como lista numerada"""
         return '\n'.join([f"{i}. {nome}: **{count}**" 
-                         for i, (nome, count) in enumerate(series.items(), 1)])
+                         for i, (nome, count) in enumerate(contagens, 1)])
     
     def iniciar(self):
         """Inicia o bot"""
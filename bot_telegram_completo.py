@@ -5,30 +5,27 @@ Com todos os filtros integrados
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler, MessageHandler, filters
-import json
-import pandas as pd
 from datetime import datetime
 
+from repositorio import abrir_repositorio
+
 class ConcursosBotCompleto:
     """Bot completo do Telegram para concursos"""
     
     def __init__(self, token: str):
         self.token = token
         self.app = Application.builder().token(token).build()
-        self.dados_provas = []
-        self.df = None
+        self.repositorio = None
         self._carregar_dados()
         self._registrar_comandos()
     
     def _carregar_dados(self):
-        """Carrega dados das provas coletadas"""
-        try:
-            with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-                self.dados_provas = json.load(f)
-            self.df = pd.DataFrame(self.dados_provas)
-            print(f"✓ {len(self.dados_provas)} provas carregadas")
-        except FileNotFoundError:
+        """Abre o repositório das provas coletadas (consultas indexadas)"""
+        self.repositorio = abrir_repositorio()
+        if self.repositorio is None:
             print("⚠ Arquivo de dados não encontrado. Execute o scraper primeiro.")
+            return
+        print(f"✓ {self.repositorio.total()} provas disponíveis")
     
     def _registrar_comandos(self):
         """Registra todos os comandos do bot"""
@@ -190,20 +187,23 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida.
     
     async def _buscar_e_enviar(self, update: Update, termo: str, tipo: str):
         """Busca provas e envia resultado"""
-        if tipo == 'banca':
-            resultados = [p for p in self.dados_provas if termo.upper() in p.get('banca', '').upper()]
+        if self.repositorio is None:
+            resultados = []
+            emoji, titulo = "🔍", termo
+        elif tipo == 'banca':
+            resultados = self.repositorio.buscar(contendo=True, banca=termo)
             emoji = "🏛️"
             titulo = f"Banca: {termo}"
         elif tipo == 'orgao':
-            resultados = [p for p in self.dados_provas if termo.upper() in p.get('orgao', '').upper()]
+            resultados = self.repositorio.buscar(contendo=True, orgao=termo)
             emoji = "🏢"
             titulo = f"Órgão: {termo}"
         elif tipo == 'cargo':
-            resultados = [p for p in self.dados_provas if termo.upper() in p.get('cargo', '').upper()]
+            resultados = self.repositorio.buscar(contendo=True, cargo=termo)
             emoji = "💼"
             titulo = f"Cargo: {termo}"
         elif tipo == 'ano':
-            resultados = [p for p in self.dados_provas if termo in p.get('ano', '')]
+            resultados = self.repositorio.buscar(ano=termo)
             emoji = "📅"
             titulo = f"Ano: {termo}"
         
@@ -232,17 +232,18 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida.
     
     async def comando_estatisticas(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /estatisticas"""
-        if self.df is None or len(self.df) == 0:
+        if self.repositorio is None or not self.repositorio.total():
             await update.message.reply_text("⚠ Nenhuma prova carregada.")
             return
         
-        total = len(self.dados_provas)
-        total_questoes = self.df['num_questoes'].sum()
-        media_questoes = self.df['num_questoes'].mean()
+        estatisticas = self.repositorio.estatisticas()
+        total = estatisticas['total']
+        total_questoes = estatisticas['total_questoes']
+        media_questoes = estatisticas['media_questoes']
         
-        bancas = self.df['banca'].value_counts().head(10)
-        orgaos = self.df['orgao'].value_counts().head(10)
-        niveis = self.df['nivel'].value_counts()
+        bancas = self.repositorio.contar('banca', limite=5)
+        orgaos = self.repositorio.contar('orgao', limite=5)
+        niveis = self.repositorio.contar('nivel')
         
         mensagem = f"""
 📊 **ESTATÍSTICAS GERAIS**
@@ -253,68 +254,68 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida.
 
 🏛️ **Top 5 Bancas:**
 """
-        for banca, count in bancas.head(5).items():
+        for banca, count in bancas:
             mensagem += f"  • {banca}: {count} provas\n"
         
         mensagem += "\n🏢 **Top 5 Órgãos:**\n"
-        for orgao, count in orgaos.head(5).items():
+        for orgao, count in orgaos:
             mensagem += f"  • {orgao}: {count} provas\n"
         
-        if not niveis.empty:
+        if niveis:
             mensagem += "\n📚 **Níveis de Escolaridade:**\n"
-            for nivel, count in niveis.items():
+            for nivel, count in niveis:
                 mensagem += f"  • {nivel or 'N/A'}: {count} provas\n"
         
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
     async def comando_bancas(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /bancas"""
-        if self.df is None:
+        if self.repositorio is None:
             return
         
-        bancas = self.df['banca'].value_counts()
+        bancas = self.repositorio.contar('banca')
         
         mensagem = "🏛️ **TODAS AS BANCAS DISPONÍVEIS**\n\n"
-        for i, (banca, count) in enumerate(bancas.items(), 1):
+        for i, (banca, count) in enumerate(bancas, 1):
             mensagem += f"{i}. {banca}: **{count}** provas\n"
         
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
     async def comando_orgaos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /orgaos"""
-        if self.df is None:
+        if self.repositorio is None:
             return
         
-        orgaos = self.df['orgao'].value_counts()
+        orgaos = self.repositorio.contar('orgao')
         
         mensagem = "🏢 **TODOS OS ÓRGÃOS DISPONÍVEIS**\n\n"
-        for i, (orgao, count) in enumerate(orgaos.items(), 1):
+        for i, (orgao, count) in enumerate(orgaos, 1):
             mensagem += f"{i}. {orgao}: **{count}** provas\n"
         
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
     async def comando_cargos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /cargos"""
-        if self.df is None:
+        if self.repositorio is None:
             return
         
-        cargos = self.df['cargo'].value_counts().head(20)
+        cargos = self.repositorio.contar('cargo', limite=20)
         
         mensagem = "💼 **TOP CARGOS MAIS COBRADOS**\n\n"
-        for i, (cargo, count) in enumerate(cargos.items(), 1):
+        for i, (cargo, count) in enumerate(cargos, 1):
             mensagem += f"{i}. {cargo}: **{count}** provas\n"
         
         await update.message.reply_text(mensagem, parse_mode='Markdown')
     
     async def comando_anos(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /anos"""
-        if self.df is None:
+        if self.repositorio is None:
             return
         
-        anos = self.df['ano'].value_counts().sort_index(ascending=False)
+        anos = sorted(self.repositorio.contar('ano'), reverse=True)
         
         mensagem = "📅 **PROVAS POR ANO**\n\n"
-        for ano, count in anos.items():
+        for ano, count in anos:
             if ano:
                 mensagem += f"• {ano}: **{count}** provas\n"
         
@@ -322,10 +323,10 @@ Este bot ajuda você a encontrar provas de concursos públicos de forma rápida.
     
     async def comando_recentes(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Comando /provas_recentes"""
-        if self.df is None:
+        if self.repositorio is None:
             return
         
-        recentes = self.dados_provas[-10:]
+        recentes = self.repositorio.ultimas(10)
         
         mensagem = "🆕 **ÚLTIMAS 10 PROVAS COLETADAS**\n\n"
         for i, prova in enumerate(recentes, 1):
@@ -1,16 +1,26 @@
 """
 Script para buscar e filtrar provas de forma fácil
+As buscas são consultas ao repositório SQLite (provas_concursos.db)
 """
 
-import json
-import pandas as pd
+from modelo import ColecaoProvas
+from repositorio import abrir_repositorio
+
+
+def _buscar(**filtros):
+    """Consulta o repositório e fecha a conexão"""
+    repositorio = abrir_repositorio()
+    if repositorio is None:
+        print("⚠ Nenhum dado encontrado. Execute o scraper primeiro: python scraper.py")
+        return ColecaoProvas()
+    try:
+        return repositorio.buscar(**filtros)
+    finally:
+        repositorio.fechar()
 
 def buscar_por_banca(banca):
     """Busca provas por banca"""
-    with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-        provas = json.load(f)
-    
-    resultados = [p for p in provas if banca.upper() in p.get('banca', '').upper()]
+    resultados = _buscar(contendo=True, banca=banca)
     
     print(f"\n🔍 Encontradas {len(resultados)} provas de {banca}\n")
     
@@ -25,10 +35,7 @@ def buscar_por_banca(banca):
 
 def buscar_por_orgao(orgao):
     """Busca provas por órgão"""
-    with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-        provas = json.load(f)
-    
-    resultados = [p for p in provas if orgao.upper() in p.get('orgao', '').upper()]
+    resultados = _buscar(contendo=True, orgao=orgao)
     
     print(f"\n🏢 Encontradas {len(resultados)} provas do {orgao}\n")
     
@@ -42,10 +49,7 @@ def buscar_por_orgao(orgao):
 
 def buscar_por_cargo(cargo):
     """Busca provas por cargo"""
-    with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-        provas = json.load(f)
-    
-    resultados = [p for p in provas if cargo.upper() in p.get('cargo', '').upper()]
+    resultados = _buscar(contendo=True, cargo=cargo)
     
     print(f"\n💼 Encontradas {len(resultados)} provas para {cargo}\n")
     
@@ -59,10 +63,7 @@ def buscar_por_cargo(cargo):
 
 def buscar_por_ano(ano):
     """Busca provas por ano"""
-    with open('provas_concursos.json', 'r', encoding='utf-8') as f:
-        provas = json.load(f)
-    
-    resultados = [p for p in provas if str(ano) in p.get('ano', '')]
+    resultados = _buscar(ano=ano)
     
     print(f"\n📅 Encontradas {len(resultados)} provas de {ano}\n")
     
@@ -76,9 +77,7 @@ def buscar_por_ano(ano):
 
 def exportar_filtro_excel(banca, arquivo_saida='resultado_busca.xlsx'):
     """Exporta resultados para Excel"""
-    df = pd.read_csv('provas_concursos.csv')
-    
-    resultado = df[df['banca'].str.contains(banca, case=False, na=False)]
+    resultado = _buscar(contendo=True, banca=banca).dataframe()
     
     resultado.to_excel(arquivo_saida, index=False)
     
@@ -0,0 +1,76 @@
+"""
+Cache em disco de respostas HTTP
+Guarda corpo, ETag e Last-Modified por URL para permitir GET condicional
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from arquivos import gravar_atomico
+
+
+class CacheHTTP:
+    """Cache persistente de respostas HTTP, indexado pela URL"""
+
+    def __init__(self, diretorio='.cache_http', ttl=None):
+        self.diretorio = diretorio
+        self.ttl = ttl  # segundos sem revalidar; None revalida sempre
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminhos(self, url):
+        """Arquivos de metadados e de corpo de uma URL"""
+        chave = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.diretorio, chave[:2], chave)
+        return base + '.json', base + '.body'
+
+    def obter(self, url):
+        """Retorna (metadados, corpo) da URL, ou None se não estiver no cache"""
+        caminho_meta, caminho_corpo = self._caminhos(url)
+        try:
+            with open(caminho_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(caminho_corpo, 'rb') as f:
+                corpo = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, corpo
+
+    def fresco(self, meta):
+        """Indica se a entrada ainda está dentro do TTL e dispensa revalidação"""
+        return self.ttl is not None and time.time() - meta['validado_em'] < self.ttl
+
+    def cabecalhos_condicionais(self, meta):
+        """Cabeçalhos If-None-Match/If-Modified-Since para revalidar a entrada"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def salvar(self, url, headers, corpo):
+        """Armazena uma resposta 200"""
+        caminho_meta, caminho_corpo = self._caminhos(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag', ''),
+            'last_modified': headers.get('Last-Modified', ''),
+            'content_type': headers.get('Content-Type', ''),
+            'validado_em': time.time(),
+        }
+        # O corpo vai primeiro: metadados só existem se o corpo já está completo
+        gravar_atomico(caminho_corpo, corpo, sincronizar=False)
+        gravar_atomico(caminho_meta, json.dumps(meta, ensure_ascii=False), sincronizar=False)
+
+    def renovar(self, url, meta, headers):
+        """Atualiza a entrada após um 304 Not Modified"""
+        caminho_meta, _ = self._caminhos(url)
+        meta = dict(meta, validado_em=time.time())
+        if headers.get('ETag'):
+            meta['etag'] = headers['ETag']
+        if headers.get('Last-Modified'):
+            meta['last_modified'] = headers['Last-Modified']
+        gravar_atomico(caminho_meta, json.dumps(meta, ensure_ascii=False), sincronizar=False)
+        return meta
@@ -0,0 +1,343 @@
+"""
+Camada de acesso HTTP do scraper
+Sessão com pool de conexões keep-alive, retentativas com backoff exponencial,
+cache com GET condicional e registro do tempo de cada requisição (DNS,
+conexão, primeiro byte e download)
+"""
+
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metricas import LIMITES_BYTES
+
+# Respostas que indicam falha transitória do servidor
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+# Tempos de DNS e de conexão da requisição em andamento nesta thread
+_fases_conexao = threading.local()
+
+
+def _conectar_medindo(conexao, conectar):
+    """Abre a conexão anotando o tempo de DNS e de conexão (TCP + TLS)
+
+    O DNS é medido com uma resolução feita logo antes de conectar; a conexão
+    em si resolve o nome de novo, normalmente já em cache no sistema.
+    """
+    inicio = time.perf_counter()
+    try:
+        socket.getaddrinfo(conexao._dns_host, conexao.port, type=socket.SOCK_STREAM)
+    except OSError:
+        pass  # o erro de resolução é tratado pelo próprio urllib3 em conectar()
+    meio = time.perf_counter()
+    conectar()
+    _fases_conexao.dns = getattr(_fases_conexao, 'dns', 0.0) + meio - inicio
+    _fases_conexao.conexao = getattr(_fases_conexao, 'conexao', 0.0) + time.perf_counter() - meio
+
+
+class _ConexaoHTTP(HTTPConnection):
+    def connect(self):
+        _conectar_medindo(self, super().connect)
+
+
+class _ConexaoHTTPS(HTTPSConnection):
+    def connect(self):
+        _conectar_medindo(self, super().connect)
+
+
+class _PoolHTTP(HTTPConnectionPool):
+    ConnectionCls = _ConexaoHTTP
+
+
+class _PoolHTTPS(HTTPSConnectionPool):
+    ConnectionCls = _ConexaoHTTPS
+
+
+class AdaptadorMedido(HTTPAdapter):
+    """HTTPAdapter cujas conexões registram o tempo de DNS e de conexão"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _PoolHTTP, 'https': _PoolHTTPS}
+
+
+class RespostaHTTP:
+    """Resposta simplificada devolvida pelo ClienteHTTP"""
+
+    def __init__(self, url, status_code, content, headers, tempo, tentativas, origem='rede', fases=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.tempo = tempo  # segundos, somando todas as tentativas
+        self.tentativas = tentativas
+        self.origem = origem  # 'rede', 'cache' (dentro do TTL) ou 'revalidado' (304)
+        self.fases = fases or {}  # dns, conexao, ttfb e download da última tentativa
+
+    def raise_for_status(self):
+        """Lança requests.HTTPError para respostas 4xx/5xx"""
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} ao acessar {self.url}")
+
+
+class ControleConcorrencia:
+    """Limite de requisições simultâneas ajustado por AIMD
+
+    Cada resposta 2xx/3xx com latência estável soma 1/limite ao limite (cerca de
+    +1 por "janela" de respostas). 429, 503, erros de conexão ou latência acima
+    de `tolerancia_latencia` vezes a menor latência observada multiplicam o
+    limite por `fator_reducao`, no máximo uma vez por janela de latência.
+    """
+
+    def __init__(self, minimo=1, maximo=16, inicial=None, fator_reducao=0.5,
+                 tolerancia_latencia=2.0, suavizacao=0.2):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.limite = float(inicial or minimo)
+        self.fator_reducao = fator_reducao
+        self.tolerancia_latencia = tolerancia_latencia
+        self.suavizacao = suavizacao
+
+        self.ativas = 0
+        self.latencia_media = None  # média móvel exponencial
+        self.latencia_base = None   # menor latência observada
+        self._ultima_reducao = 0.0
+        self.reducoes = 0
+        self.pico = self.limite
+        self._condicao = threading.Condition()
+
+    def adquirir(self):
+        """Bloqueia até haver vaga dentro do limite atual"""
+        with self._condicao:
+            while self.ativas >= int(self.limite):
+                self._condicao.wait()
+            self.ativas += 1
+
+    def liberar(self):
+        with self._condicao:
+            self.ativas -= 1
+            self._condicao.notify_all()
+
+    def registrar(self, status, latencia):
+        """Ajusta o limite com o resultado de uma requisição (status None = erro de conexão)"""
+        with self._condicao:
+            sobrecarga = status is None or status in (429, 503)
+            if latencia is not None and not sobrecarga:
+                if self.latencia_media is None:
+                    self.latencia_media = latencia
+                else:
+                    self.latencia_media += self.suavizacao * (latencia - self.latencia_media)
+                if self.latencia_base is None or latencia < self.latencia_base:
+                    self.latencia_base = latencia
+                else:
+                    # A referência sobe devagar, para acompanhar um servidor que ficou mais lento de vez
+                    self.latencia_base += 0.01 * (self.latencia_media - self.latencia_base)
+                lenta = self.latencia_media > self.tolerancia_latencia * self.latencia_base
+            else:
+                lenta = False
+
+            if sobrecarga or lenta:
+                # Respostas de requisições já em voo refletem o limite antigo: uma redução por janela
+                agora = time.monotonic()
+                if agora - self._ultima_reducao < (self.latencia_media or 0.0):
+                    return
+                self._ultima_reducao = agora
+                anterior = int(self.limite)
+                self.limite = max(self.minimo, self.limite * self.fator_reducao)
+                self.reducoes += 1
+                motivo = f"HTTP {status}" if status else ("erro de conexão" if sobrecarga else "latência em alta")
+                print(f"  ↓ concorrência {anterior} → {int(self.limite)} ({motivo})")
+            elif status is not None and status < 400:
+                self.limite = min(self.maximo, self.limite + 1 / self.limite)
+                self.pico = max(self.pico, self.limite)
+            self._condicao.notify_all()
+
+    def resumo(self):
+        with self._condicao:
+            return {'limite': int(self.limite), 'pico': int(self.pico), 'reducoes': self.reducoes,
+                    'latencia_media': self.latencia_media, 'latencia_base': self.latencia_base}
+
+
+class ClienteHTTP:
+    """Cliente HTTP compartilhado com pool de conexões e retentativas"""
+
+    def __init__(self, headers=None, timeout=10, max_tentativas=4, backoff_base=1.0,
+                 backoff_max=30.0, retry_after_max=120.0, tamanho_pool=10, cache=None, metricas=None,
+                 controle=None):
+        self.timeout = timeout
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.cache = cache  # CacheHTTP opcional
+        self.metricas = metricas  # Metricas opcional
+        self.controle = controle  # ControleConcorrencia opcional
+
+        # Uma única sessão reaproveita as conexões TCP/TLS entre as páginas
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = AdaptadorMedido(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.tempos = []  # (url, status, segundos, tentativas) de cada requisição
+        self.origens = {'rede': 0, 'cache': 0, 'revalidado': 0}
+        self._lock = threading.Lock()
+
+    def _espera_backoff(self, tentativa):
+        """Backoff exponencial com jitter: metade fixa, metade aleatória"""
+        teto = min(self.backoff_max, self.backoff_base * 2 ** (tentativa - 1))
+        return teto / 2 + random.uniform(0, teto / 2)
+
+    def _espera_retry_after(self, response):
+        """Lê o cabeçalho Retry-After (segundos ou data HTTP), se houver"""
+        valor = response.headers.get('Retry-After')
+        if not valor:
+            return None
+
+        try:
+            espera = float(valor)
+        except ValueError:
+            try:
+                espera = (parsedate_to_datetime(valor) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+
+        return min(max(espera, 0), self.retry_after_max)
+
+    def _registrar(self, url, status, tempo, tentativas, origem, tamanho=0):
+        with self._lock:
+            self.tempos.append((url, status, tempo, tentativas))
+            self.origens[origem] += 1
+        if self.metricas:
+            self.metricas.contar('http_requisicoes', origem=origem, status=status)
+            self.metricas.contar('http_retentativas', max(tentativas - 1, 0))
+            self.metricas.contar('http_bytes', tamanho)
+            self.metricas.observar('http_requisicao_segundos', tempo)
+            self.metricas.observar('http_resposta_bytes', tamanho, limites=LIMITES_BYTES)
+    
+    def _requisitar(self, url, headers):
+        """Uma tentativa de GET; retorna (response, fases) com o corpo já lido"""
+        if self.controle:
+            self.controle.adquirir()
+        try:
+            _fases_conexao.dns = _fases_conexao.conexao = 0.0
+            inicio = time.perf_counter()
+            # stream=True separa o tempo até os cabeçalhos do tempo de download do corpo
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            cabecalhos = time.perf_counter()
+            try:
+                response.content
+            finally:
+                response.close()
+            fim = time.perf_counter()
+        except (requests.Timeout, requests.ConnectionError):
+            if self.controle:
+                self.controle.registrar(None, None)
+            raise
+        finally:
+            if self.controle:
+                self.controle.liberar()
+        
+        if self.controle:
+            self.controle.registrar(response.status_code, cabecalhos - inicio)
+        
+        fases = {
+            'dns': _fases_conexao.dns,
+            'conexao': _fases_conexao.conexao,
+            'ttfb': max(cabecalhos - inicio - _fases_conexao.dns - _fases_conexao.conexao, 0.0),
+            'download': fim - cabecalhos,
+        }
+        if self.metricas:
+            for fase, segundos in fases.items():
+                # DNS e conexão só acontecem quando o pool abre uma conexão nova
+                if segundos or fase in ('ttfb', 'download'):
+                    self.metricas.observar('http_fase_segundos', segundos, fase=fase)
+        return response, fases
+
+    def get(self, url, headers=None):
+        """Faz um GET com retentativas em timeouts, erros de conexão, 429 e 5xx
+
+        Com cache configurado, entradas dentro do TTL são devolvidas sem acessar
+        a rede e as demais são revalidadas com If-None-Match/If-Modified-Since.
+        """
+        inicio = time.monotonic()
+
+        entrada = self.cache.obter(url) if self.cache else None
+        if entrada:
+            meta, corpo = entrada
+            if self.cache.fresco(meta):
+                tempo = time.monotonic() - inicio
+                self._registrar(url, 200, tempo, 0, 'cache')
+                return RespostaHTTP(url, 200, corpo, {'Content-Type': meta['content_type']},
+                                    tempo, 0, origem='cache')
+            headers = dict(headers or {}, **self.cache.cabecalhos_condicionais(meta))
+
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                response, fases = self._requisitar(url, headers)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if tentativa == self.max_tentativas:
+                    raise
+                espera = self._espera_backoff(tentativa)
+                print(f"  ↻ {e.__class__.__name__} em {url}, nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+                continue
+
+            if response.status_code in STATUS_RETENTAVEIS and tentativa < self.max_tentativas:
+                espera = self._espera_retry_after(response)
+                if espera is None:
+                    espera = self._espera_backoff(tentativa)
+                print(f"  ↻ HTTP {response.status_code} em {url}, nova tentativa em {espera:.1f}s")
+                time.sleep(espera)
+                continue
+
+            break
+
+        tempo = time.monotonic() - inicio
+
+        if entrada and response.status_code == 304:
+            self.cache.renovar(url, meta, response.headers)
+            self._registrar(url, 304, tempo, tentativa, 'revalidado', len(response.content))
+            return RespostaHTTP(url, 200, corpo, {'Content-Type': meta['content_type']},
+                                tempo, tentativa, origem='revalidado', fases=fases)
+
+        if self.cache and response.status_code == 200:
+            self.cache.salvar(url, response.headers, response.content)
+
+        self._registrar(url, response.status_code, tempo, tentativa, 'rede', len(response.content))
+        return RespostaHTTP(url, response.status_code, response.content,
+                            response.headers, tempo, tentativa, fases=fases)
+
+    def resumo_tempos(self):
+        """Resumo dos tempos das requisições feitas até agora"""
+        with self._lock:
+            tempos = sorted(t[2] for t in self.tempos)
+            retentativas = sum(max(t[3] - 1, 0) for t in self.tempos)
+            origens = dict(self.origens)
+
+        if not tempos:
+            return None
+
+        return {
+            'requisicoes': len(tempos),
+            'retentativas': retentativas,
+            'media': sum(tempos) / len(tempos),
+            'p50': tempos[len(tempos) // 2],
+            'p95': tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+            'max': tempos[-1],
+            'do_cache': origens['cache'],
+            'revalidadas': origens['revalidado'],
+        }
+
+    def fechar(self):
+        """Fecha as conexões do pool"""
+        self.session.close()
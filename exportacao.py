@@ -0,0 +1,136 @@
+"""
+Saída em streaming (JSONL) e exportações geradas a partir dela
+Cada página coletada é anexada ao arquivo JSONL assim que termina; JSON, CSV e
+Excel são gerados depois lendo esse arquivo (ou o repositório SQLite) em
+lotes, com memória limitada
+"""
+
+import json
+import os
+from collections import Counter
+
+
+class SaidaJSONL:
+    """Arquivo JSONL em que os registros são anexados conforme as páginas terminam"""
+
+    def __init__(self, arquivo='provas_concursos.jsonl', posicao=0):
+        self.arquivo = arquivo
+        # Abre sem truncar e corta no ponto indicado (0 = começar do zero,
+        # ou a posição salva no checkpoint ao retomar uma coleta)
+        modo = 'r+b' if os.path.exists(arquivo) else 'w+b'
+        self._f = open(arquivo, modo)
+        self._f.truncate(posicao)
+        self._f.seek(posicao)
+
+    def escrever(self, registros):
+        """Anexa os registros, um JSON por linha"""
+        for registro in registros:
+            linha = json.dumps(registro, ensure_ascii=False, default=dict) + '\n'
+            self._f.write(linha.encode('utf-8'))
+
+    def sincronizar(self):
+        """Descarrega o buffer no disco e retorna o tamanho atual do arquivo"""
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        return self._f.tell()
+
+    def fechar(self):
+        self._f.close()
+
+
+def ler_lotes(arquivo, tamanho_lote=5000):
+    """Lê o JSONL em listas de até `tamanho_lote` registros"""
+    lote = []
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            if linha.strip():
+                lote.append(json.loads(linha))
+            if len(lote) >= tamanho_lote:
+                yield lote
+                lote = []
+    if lote:
+        yield lote
+
+
+def _lotes(origem, tamanho_lote=5000):
+    """Lotes de um arquivo JSONL ou de qualquer origem com `lotes()` (ex.: RepositorioProvas)"""
+    if hasattr(origem, 'lotes'):
+        return origem.lotes(tamanho_lote)
+    return ler_lotes(origem, tamanho_lote)
+
+
+def colunas(origem):
+    """Campos presentes no JSONL, na ordem em que aparecem (mesma ordem do pandas)"""
+    encontradas = {}
+    for lote in _lotes(origem):
+        for registro in lote:
+            for campo in registro:
+                encontradas.setdefault(campo, None)
+    return list(encontradas)
+
+
+def exportar_json(origem, arquivo='provas_concursos.json', tamanho_lote=5000):
+    """Gera o JSON no mesmo formato de json.dump(..., indent=2), registro a registro"""
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write('[')
+        primeiro = True
+        for lote in _lotes(origem, tamanho_lote):
+            for registro in lote:
+                texto = json.dumps(registro, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                f.write(('\n  ' if primeiro else ',\n  ') + texto)
+                primeiro = False
+        f.write(']' if primeiro else '\n]')
+    os.replace(temporario, arquivo)
+
+
+def exportar_csv(origem, arquivo='provas_concursos.csv', tamanho_lote=5000):
+    """Gera o CSV anexando um DataFrame por lote"""
+    import pandas as pd
+
+    temporario = arquivo + '.tmp'
+    campos = colunas(origem)
+    primeiro = True
+    for lote in _lotes(origem, tamanho_lote):
+        df = pd.DataFrame(lote, columns=campos)
+        # O BOM do utf-8-sig só pode aparecer no início do arquivo
+        df.to_csv(temporario, index=False, header=primeiro, mode='w' if primeiro else 'a',
+                  encoding='utf-8-sig' if primeiro else 'utf-8')
+        primeiro = False
+    if primeiro:
+        return False
+    os.replace(temporario, arquivo)
+    return True
+
+
+def exportar_excel(origem, arquivo='provas_concursos.xlsx', tamanho_lote=5000):
+    """Gera o Excel com o modo write-only do openpyxl, que não mantém as linhas em memória"""
+    from openpyxl import Workbook
+
+    campos = colunas(origem)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(campos)
+    linhas = 0
+    for lote in _lotes(origem, tamanho_lote):
+        for registro in lote:
+            ws.append([registro.get(campo) for campo in campos])
+            linhas += 1
+    if not linhas:
+        return False
+    wb.save(arquivo)
+    return True
+
+
+def contar_campos(origem, campos=('banca', 'orgao', 'nivel'), tamanho_lote=5000):
+    """Contagens por campo e soma de questões, lendo o JSONL em lotes"""
+    contagens = {campo: Counter() for campo in campos}
+    total = 0
+    total_questoes = 0
+    for lote in _lotes(origem, tamanho_lote):
+        for registro in lote:
+            total += 1
+            total_questoes += registro.get('num_questoes', 0) or 0
+            for campo in campos:
+                contagens[campo][registro.get(campo, '')] += 1
+    return total, total_questoes, contagens
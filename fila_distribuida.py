@@ -0,0 +1,476 @@
+"""
+Fila de trabalho para coletas distribuídas
+O intervalo de páginas da listagem é dividido em unidades (ex.: páginas 1-20,
+21-40...) que os trabalhadores arrendam por um tempo limitado. Se um trabalhador
+morrer, o arrendamento expira e a unidade volta para a fila. As provas de cada
+unidade são mescladas pelo link canônico, então reprocessar uma unidade não
+duplica nada.
+
+Backends:
+    FilaSQLite  arquivo SQLite compartilhado (vários processos na mesma máquina)
+    FilaHTTP    cliente de um coordenador (subcomando `servir`), para várias máquinas
+
+    python fila_distribuida.py criar --paginas 2000 --tamanho-unidade 20 --taxa-global 8
+    python fila_distribuida.py servir --porta 8900
+    python fila_distribuida.py trabalhar --coordenador http://maquina-1:8900 --assincrono
+    python fila_distribuida.py exportar
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from repositorio import ARQUIVO_BANCO, RepositorioProvas
+from scraper import ConcursoScraper, mesclar_prova, URL_BASE
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS unidades (
+    id INTEGER PRIMARY KEY,
+    pagina_inicio INTEGER NOT NULL,
+    pagina_fim INTEGER NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendente',
+    trabalhador TEXT,
+    expira_em REAL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    registros INTEGER NOT NULL DEFAULT 0,
+    erro TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_unidades_estado ON unidades(estado, id);
+CREATE TABLE IF NOT EXISTS provas (
+    link TEXT PRIMARY KEY,
+    pagina INTEGER NOT NULL,
+    posicao INTEGER NOT NULL,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_provas_ordem ON provas(pagina, posicao);
+CREATE TABLE IF NOT EXISTS configuracao (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+class FilaSQLite:
+    """Fila de unidades de trabalho e provas coletadas em um arquivo SQLite (modo WAL)"""
+
+    def __init__(self, arquivo='fila_coleta.db', max_tentativas=5):
+        self.arquivo = arquivo
+        self.max_tentativas = max_tentativas
+        # Transações explícitas (BEGIN IMMEDIATE) serializam o arrendamento entre processos
+        self.conn = sqlite3.connect(arquivo, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ESQUEMA)
+        self._lock = threading.Lock()
+
+    def _transacao(self, funcao):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = funcao()
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return resultado
+
+    def criar(self, num_paginas, tamanho_unidade=20, pagina_inicial=1, taxa_global=None):
+        """Cria as unidades até `num_paginas`; páginas já cobertas não são recriadas"""
+        def criar():
+            ultima = self.conn.execute("SELECT MAX(pagina_fim) FROM unidades").fetchone()[0]
+            inicio = max(pagina_inicial, (ultima or 0) + 1)
+            novas = [(p, min(p + tamanho_unidade - 1, num_paginas))
+                     for p in range(inicio, num_paginas + 1, tamanho_unidade)]
+            self.conn.executemany("INSERT INTO unidades (pagina_inicio, pagina_fim) VALUES (?, ?)", novas)
+            if taxa_global is not None:
+                self.conn.execute("INSERT OR REPLACE INTO configuracao VALUES ('taxa_global', ?)",
+                                  (str(taxa_global),))
+            return len(novas)
+
+        return self._transacao(criar)
+
+    def _taxa_global(self):
+        linha = self.conn.execute("SELECT valor FROM configuracao WHERE chave = 'taxa_global'").fetchone()
+        return float(linha[0]) if linha else None
+
+    def arrendar(self, trabalhador, duracao=300):
+        """Arrenda a próxima unidade livre (ou com arrendamento vencido), ou retorna None
+
+        A unidade vem com `taxa`: a taxa global dividida pelos trabalhadores ativos.
+        """
+        def arrendar():
+            agora = time.time()
+            # Arrendamentos vencidos que já esgotaram as tentativas não voltam mais para a fila
+            self.conn.execute("""
+                UPDATE unidades SET estado = 'falhou', erro = COALESCE(erro, 'arrendamento expirado')
+                WHERE estado = 'arrendada' AND expira_em < ? AND tentativas >= ?
+            """, (agora, self.max_tentativas))
+            linha = self.conn.execute("""
+                SELECT id, pagina_inicio, pagina_fim, tentativas FROM unidades
+                WHERE estado = 'pendente' OR (estado = 'arrendada' AND expira_em < ?)
+                ORDER BY id LIMIT 1
+            """, (agora,)).fetchone()
+            if linha is None:
+                return None
+            self.conn.execute("""
+                UPDATE unidades SET estado = 'arrendada', trabalhador = ?, expira_em = ?,
+                                    tentativas = tentativas + 1
+                WHERE id = ?
+            """, (trabalhador, agora + duracao, linha[0]))
+            ativos = self.conn.execute("""
+                SELECT COUNT(DISTINCT trabalhador) FROM unidades
+                WHERE estado = 'arrendada' AND expira_em >= ?
+            """, (agora,)).fetchone()[0]
+            taxa_global = self._taxa_global()
+            return {
+                'id': linha[0],
+                'pagina_inicio': linha[1],
+                'pagina_fim': linha[2],
+                'tentativa': linha[3] + 1,
+                'taxa': taxa_global / max(1, ativos) if taxa_global else None,
+            }
+
+        return self._transacao(arrendar)
+
+    def renovar(self, id_unidade, trabalhador, duracao=300):
+        """Estende o arrendamento; False se a unidade já não pertence ao trabalhador"""
+        def renovar():
+            cursor = self.conn.execute("""
+                UPDATE unidades SET expira_em = ?
+                WHERE id = ? AND trabalhador = ? AND estado = 'arrendada'
+            """, (time.time() + duracao, id_unidade, trabalhador))
+            return cursor.rowcount == 1
+
+        return self._transacao(renovar)
+
+    def _mesclar(self, pagina, provas):
+        for posicao, prova in enumerate(provas):
+            linha = self.conn.execute("SELECT pagina, posicao, dados FROM provas WHERE link = ?",
+                                      (prova['link'],)).fetchone()
+            if linha is None:
+                self.conn.execute("INSERT INTO provas VALUES (?, ?, ?, ?)",
+                                  (prova['link'], pagina, posicao,
+                                   json.dumps(prova, ensure_ascii=False, default=dict)))
+                continue
+            existente = json.loads(linha[2])
+            mesclar_prova(existente, prova)
+            # A prova fica na posição da primeira página em que aparece na listagem
+            ordem = min((linha[0], linha[1]), (pagina, posicao))
+            self.conn.execute("UPDATE provas SET pagina = ?, posicao = ?, dados = ? WHERE link = ?",
+                              (ordem[0], ordem[1], json.dumps(existente, ensure_ascii=False), prova['link']))
+
+    def concluir(self, id_unidade, trabalhador, provas):
+        """Mescla as provas da unidade e marca a unidade como concluída"""
+        def concluir():
+            pagina = self.conn.execute("SELECT pagina_inicio FROM unidades WHERE id = ?",
+                                       (id_unidade,)).fetchone()[0]
+            self._mesclar(pagina, provas)
+            # Mesmo vindo de um arrendamento vencido, o resultado vale: a mescla é idempotente
+            self.conn.execute("""
+                UPDATE unidades SET estado = 'concluida', trabalhador = ?, registros = ?, erro = NULL
+                WHERE id = ?
+            """, (trabalhador, len(provas), id_unidade))
+
+        self._transacao(concluir)
+
+    def falhar(self, id_unidade, trabalhador, erro, provas=()):
+        """Mescla o que foi coletado e devolve a unidade para a fila (ou a marca como falha)"""
+        def falhar():
+            pagina = self.conn.execute("SELECT pagina_inicio FROM unidades WHERE id = ?",
+                                       (id_unidade,)).fetchone()[0]
+            self._mesclar(pagina, provas)
+            self.conn.execute("""
+                UPDATE unidades
+                SET estado = CASE WHEN tentativas >= ? THEN 'falhou' ELSE 'pendente' END,
+                    trabalhador = NULL, expira_em = NULL, erro = ?
+                WHERE id = ? AND trabalhador = ? AND estado = 'arrendada'
+            """, (self.max_tentativas, erro, id_unidade, trabalhador))
+
+        self._transacao(falhar)
+
+    def progresso(self):
+        with self._lock:
+            estados = dict(self.conn.execute("SELECT estado, COUNT(*) FROM unidades GROUP BY estado"))
+            ativos = self.conn.execute("""
+                SELECT COUNT(DISTINCT trabalhador) FROM unidades
+                WHERE estado = 'arrendada' AND expira_em >= ?
+            """, (time.time(),)).fetchone()[0]
+            provas = self.conn.execute("SELECT COUNT(*) FROM provas").fetchone()[0]
+        return {
+            'pendentes': estados.get('pendente', 0),
+            'arrendadas': estados.get('arrendada', 0),
+            'concluidas': estados.get('concluida', 0),
+            'falhas': estados.get('falhou', 0),
+            'trabalhadores_ativos': ativos,
+            'provas': provas,
+        }
+
+    def provas(self, tamanho_lote=5000):
+        """Provas coletadas na ordem da listagem, em lotes"""
+        ultimo = (0, -1)
+        while True:
+            with self._lock:
+                linhas = self.conn.execute("""
+                    SELECT pagina, posicao, dados FROM provas
+                    WHERE (pagina, posicao) > (?, ?)
+                    ORDER BY pagina, posicao LIMIT ?
+                """, (ultimo[0], ultimo[1], tamanho_lote)).fetchall()
+            if not linhas:
+                return
+            ultimo = (linhas[-1][0], linhas[-1][1])
+            yield [json.loads(linha[2]) for linha in linhas]
+
+    def fechar(self):
+        self.conn.close()
+
+
+class FilaHTTP:
+    """Mesma interface da FilaSQLite, falando com um coordenador remoto"""
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _chamar(self, metodo, **parametros):
+        response = self.session.post(f"{self.url}/{metodo}", json=parametros, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['resultado']
+
+    def criar(self, num_paginas, tamanho_unidade=20, pagina_inicial=1, taxa_global=None):
+        return self._chamar('criar', num_paginas=num_paginas, tamanho_unidade=tamanho_unidade,
+                            pagina_inicial=pagina_inicial, taxa_global=taxa_global)
+
+    def arrendar(self, trabalhador, duracao=300):
+        return self._chamar('arrendar', trabalhador=trabalhador, duracao=duracao)
+
+    def renovar(self, id_unidade, trabalhador, duracao=300):
+        return self._chamar('renovar', id_unidade=id_unidade, trabalhador=trabalhador, duracao=duracao)
+
+    def concluir(self, id_unidade, trabalhador, provas):
+        return self._chamar('concluir', id_unidade=id_unidade, trabalhador=trabalhador,
+                            provas=[dict(prova) for prova in provas])
+
+    def falhar(self, id_unidade, trabalhador, erro, provas=()):
+        return self._chamar('falhar', id_unidade=id_unidade, trabalhador=trabalhador, erro=erro,
+                            provas=[dict(prova) for prova in provas])
+
+    def progresso(self):
+        return self._chamar('progresso')
+
+    def fechar(self):
+        self.session.close()
+
+
+# Métodos da FilaSQLite expostos pelo coordenador
+METODOS_REMOTOS = {'criar', 'arrendar', 'renovar', 'concluir', 'falhar', 'progresso'}
+
+
+class HandlerCoordenador(BaseHTTPRequestHandler):
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        metodo = self.path.strip('/')
+        if metodo not in METODOS_REMOTOS:
+            self._responder(404, {'erro': f'método desconhecido: {metodo}'})
+            return
+        tamanho = int(self.headers.get('Content-Length', 0))
+        parametros = json.loads(self.rfile.read(tamanho) or b'{}')
+        try:
+            resultado = getattr(self.server.fila, metodo)(**parametros)
+        except Exception as e:
+            self._responder(500, {'erro': str(e)})
+            return
+        self._responder(200, {'resultado': resultado})
+
+    def do_GET(self):
+        if self.path.strip('/') == 'progresso':
+            self._responder(200, {'resultado': self.server.fila.progresso()})
+        else:
+            self._responder(404, {'erro': 'não encontrado'})
+
+
+def servir(fila, porta=8900, endereco='0.0.0.0'):
+    """Coordenador HTTP: expõe a FilaSQLite para trabalhadores em outras máquinas"""
+    servidor = ThreadingHTTPServer((endereco, porta), HandlerCoordenador)
+    servidor.daemon_threads = True
+    servidor.fila = fila
+    print(f"🚀 Coordenador da fila em http://{endereco}:{porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def trabalhar(fila, nome=None, duracao=300, espera=2, opcoes_scraper=None, opcoes_coleta=None,
+              adaptativo=None):
+    """Arrenda e coleta unidades até a fila acabar; retorna quantas unidades concluiu
+
+    `opcoes_scraper` vai para o ConcursoScraper, `opcoes_coleta` para
+    scrape_multiplas_paginas e `adaptativo` = (mínimo, máximo) liga o controle AIMD.
+    """
+    nome = nome or f"{socket.gethostname()}-{os.getpid()}"
+    opcoes_coleta = dict(opcoes_coleta or {})
+    concluidas = 0
+
+    while True:
+        unidade = fila.arrendar(nome, duracao)
+        if unidade is None:
+            progresso = fila.progresso()
+            if not progresso['pendentes'] and not progresso['arrendadas']:
+                break
+            # Outros trabalhadores ainda estão com unidades; se morrerem, elas voltam para a fila
+            time.sleep(espera)
+            continue
+
+        inicio, fim = unidade['pagina_inicio'], unidade['pagina_fim']
+        print(f"\n📦 {nome}: unidade {unidade['id']} (páginas {inicio}-{fim}, tentativa {unidade['tentativa']})")
+
+        scraper = ConcursoScraper(**(opcoes_scraper or {}))
+        if adaptativo:
+            scraper.configurar_concorrencia_adaptativa(*adaptativo)
+        if unidade['taxa']:
+            opcoes_coleta['taxa_por_host'] = unidade['taxa']
+
+        # Renova o arrendamento enquanto a unidade está sendo coletada
+        parar = threading.Event()
+
+        def renovar():
+            while not parar.wait(duracao / 3):
+                try:
+                    if not fila.renovar(unidade['id'], nome, duracao):
+                        print(f"  ⚠ Arrendamento da unidade {unidade['id']} perdido")
+                        return
+                except Exception as e:
+                    print(f"  ⚠ Erro ao renovar o arrendamento: {e}")
+
+        renovador = threading.Thread(target=renovar, daemon=True)
+        renovador.start()
+        try:
+            scraper.scrape_multiplas_paginas(num_paginas=fim, pagina_inicial=inicio, **opcoes_coleta)
+        except Exception as e:
+            fila.falhar(unidade['id'], nome, str(e), scraper.provas)
+            continue
+        finally:
+            parar.set()
+            scraper.cliente.fechar()
+
+        if scraper.paginas_com_erro:
+            erro = f"páginas com erro: {scraper.paginas_com_erro}"
+            print(f"  ✗ Unidade {unidade['id']} volta para a fila ({erro})")
+            fila.falhar(unidade['id'], nome, erro, scraper.provas)
+        else:
+            fila.concluir(unidade['id'], nome, scraper.provas)
+            concluidas += 1
+
+    print(f"\n✓ {nome}: {concluidas} unidades concluídas, fila vazia")
+    return concluidas
+
+
+def exportar(fila, arquivo_banco=ARQUIVO_BANCO, arquivo='provas_concursos.json',
+             arquivo_csv='provas_concursos.csv'):
+    """Grava as provas da fila no repositório, publica a versão e gera JSON, CSV e snapshots a partir dele"""
+    repositorio = RepositorioProvas(arquivo_banco)
+    try:
+        total = repositorio.salvar(prova for lote in fila.provas() for prova in lote)
+        versao = repositorio.publicar(arquivo)
+        repositorio.exportar_csv(arquivo_csv)
+    finally:
+        repositorio.fechar()
+    print(f"✓ {total} provas gravadas em {arquivo_banco} (versão {versao}), exportadas para {arquivo} e {arquivo_csv}")
+    return total
+
+
+def exibir_progresso(progresso):
+    print(f"\n📊 Unidades: {progresso['concluidas']} concluídas, {progresso['arrendadas']} em andamento, "
+          f"{progresso['pendentes']} pendentes, {progresso['falhas']} com falha")
+    print(f"   Trabalhadores ativos: {progresso['trabalhadores_ativos']} | Provas: {progresso['provas']}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Coleta distribuída com fila de unidades arrendadas")
+    parser.add_argument('--fila', default='fila_coleta.db',
+                        help="arquivo SQLite da fila (padrão: fila_coleta.db)")
+    parser.add_argument('--coordenador', metavar='URL',
+                        help="usa o coordenador remoto em URL em vez do arquivo SQLite")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    criar = sub.add_parser('criar', help="divide o intervalo de páginas em unidades")
+    criar.add_argument('--paginas', type=int, required=True)
+    criar.add_argument('--tamanho-unidade', type=int, default=20)
+    criar.add_argument('--pagina-inicial', type=int, default=1)
+    criar.add_argument('--taxa-global', type=float, default=None, metavar='RPS',
+                       help="requisições/s somando todos os trabalhadores")
+
+    servir_cmd = sub.add_parser('servir', help="expõe a fila SQLite por HTTP para outras máquinas")
+    servir_cmd.add_argument('--porta', type=int, default=8900)
+    servir_cmd.add_argument('--endereco', default='0.0.0.0')
+
+    trabalhar_cmd = sub.add_parser('trabalhar', help="coleta unidades até a fila acabar")
+    trabalhar_cmd.add_argument('--nome', help="identificação do trabalhador (padrão: máquina-pid)")
+    trabalhar_cmd.add_argument('--arrendamento', type=float, default=300, metavar='SEGUNDOS')
+    trabalhar_cmd.add_argument('--assincrono', action='store_true')
+    trabalhar_cmd.add_argument('--concorrencia', type=int, default=4)
+    trabalhar_cmd.add_argument('--taxa', type=float, default=1.0,
+                               help="requisições/s deste trabalhador, se a fila não tiver taxa global")
+    trabalhar_cmd.add_argument('--adaptativo', action='store_true')
+    trabalhar_cmd.add_argument('--concorrencia-max', type=int, default=16)
+    trabalhar_cmd.add_argument('--parser', choices=['lxml', 'bs4'], default='lxml')
+    trabalhar_cmd.add_argument('--cache', default='.cache_http', metavar='DIR')
+    trabalhar_cmd.add_argument('--base-url', default=URL_BASE, metavar='URL')
+
+    sub.add_parser('status', help="mostra o andamento da fila")
+
+    exportar_cmd = sub.add_parser('exportar', help="grava as provas coletadas no banco e gera JSON, CSV e snapshots")
+    exportar_cmd.add_argument('--banco', default=ARQUIVO_BANCO)
+    exportar_cmd.add_argument('--saida', default='provas_concursos.json')
+    exportar_cmd.add_argument('--csv', default='provas_concursos.csv')
+
+    args = parser.parse_args()
+
+    if args.coordenador and args.comando in ('servir', 'exportar'):
+        parser.error(f"'{args.comando}' roda na máquina do coordenador, com --fila")
+    fila = FilaHTTP(args.coordenador) if args.coordenador else FilaSQLite(args.fila)
+
+    if args.comando == 'criar':
+        novas = fila.criar(args.paginas, args.tamanho_unidade, args.pagina_inicial, args.taxa_global)
+        print(f"✓ {novas} unidades criadas")
+        exibir_progresso(fila.progresso())
+    elif args.comando == 'servir':
+        servir(fila, args.porta, args.endereco)
+    elif args.comando == 'trabalhar':
+        trabalhar(fila, nome=args.nome, duracao=args.arrendamento,
+                  opcoes_scraper={'diretorio_cache': args.cache, 'parser': args.parser,
+                                  'base_url': args.base_url},
+                  opcoes_coleta={'assincrono': args.assincrono, 'concorrencia': args.concorrencia,
+                                 'taxa_por_host': None if args.adaptativo else args.taxa},
+                  adaptativo=(1, args.concorrencia_max) if args.adaptativo else None)
+    elif args.comando == 'status':
+        exibir_progresso(fila.progresso())
+    else:
+        exportar(fila, args.banco, args.saida, args.csv)
+
+    fila.fechar()
+
+
+if __name__ == "__main__":
+    main()
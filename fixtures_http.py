@@ -0,0 +1,194 @@
+"""
+Fixtures HTTP para testar e medir o scraper sem acessar o site
+- Gravação: guarda as respostas de uma coleta real em um arquivo .zip
+- Reprodução: devolve essas respostas ao ConcursoScraper, offline
+- Páginas sintéticas de listagem e de detalhe, para benchmarks e para o servidor_mock.py
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+import zipfile
+
+from cliente_http import ClienteHTTP, RespostaHTTP
+
+BANCAS = ['FGV', 'CESPE', 'FCC', 'VUNESP', 'CESGRANRIO', 'IBFC', 'IDECAN', 'QUADRIX']
+ORGAOS = ['TRT', 'TRF', 'INSS', 'Prefeitura de São Paulo', 'Banco do Brasil', 'Petrobras',
+          'Polícia Federal', 'TJ-SP', 'Receita Federal', 'Câmara dos Deputados']
+CARGOS = ['Analista Judiciário', 'Técnico Administrativo', 'Auditor Fiscal', 'Escriturário',
+          'Agente de Polícia', 'Professor', 'Enfermeiro', 'Engenheiro Civil']
+NIVEIS = ['Superior', 'Médio', 'Fundamental']
+
+
+def _nome_entrada(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class ArquivoFixtures:
+    """Arquivo .zip com as respostas gravadas, indexadas pela URL
+
+    Cada corpo fica em uma entrada própria (comprimida) e o índice
+    URL -> status/cabeçalhos vai em indice.json ao fechar o arquivo.
+    """
+
+    def __init__(self, arquivo, modo='r'):
+        self.arquivo = arquivo
+        self.modo = modo
+        self._zip = zipfile.ZipFile(arquivo, modo, compression=zipfile.ZIP_DEFLATED)
+        self._lock = threading.Lock()
+        if modo == 'r':
+            self.indice = json.loads(self._zip.read('indice.json'))
+        else:
+            self.indice = {}
+
+    def gravar(self, url, status, headers, corpo):
+        nome = _nome_entrada(url)
+        with self._lock:
+            if url not in self.indice:
+                self._zip.writestr(nome, corpo)
+            self.indice[url] = {'status': status, 'content_type': headers.get('Content-Type', ''),
+                                'corpo': nome}
+
+    def ler(self, url):
+        """Retorna (status, content_type, corpo) da URL, ou None se não foi gravada"""
+        entrada = self.indice.get(url)
+        if entrada is None:
+            return None
+        with self._lock:
+            corpo = self._zip.read(entrada['corpo'])
+        return entrada['status'], entrada['content_type'], corpo
+
+    def fechar(self):
+        with self._lock:
+            if self.modo != 'r':
+                self._zip.writestr('indice.json', json.dumps(self.indice, ensure_ascii=False, indent=2))
+            self._zip.close()
+
+
+class ClienteGravador(ClienteHTTP):
+    """ClienteHTTP que também grava cada resposta no arquivo de fixtures"""
+
+    def __init__(self, arquivo, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures = ArquivoFixtures(arquivo, 'w')
+
+    def get(self, url, headers=None):
+        response = super().get(url, headers)
+        self.fixtures.gravar(url, response.status_code, response.headers, response.content)
+        return response
+
+    def fechar(self):
+        self.fixtures.fechar()
+        super().fechar()
+
+
+class ClienteReproducao(ClienteHTTP):
+    """ClienteHTTP que responde a partir de um arquivo de fixtures, sem rede
+
+    URLs que não estão no arquivo respondem 404.
+    """
+
+    def __init__(self, arquivo, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures = ArquivoFixtures(arquivo, 'r')
+
+    def get(self, url, headers=None):
+        inicio = time.monotonic()
+        gravada = self.fixtures.ler(url)
+        status, content_type, corpo = gravada if gravada else (404, 'text/plain', b'')
+        tempo = time.monotonic() - inicio
+        self._registrar(url, status, tempo, 1, 'rede', len(corpo))
+        return RespostaHTTP(url, status, corpo, {'Content-Type': content_type}, tempo, 1)
+
+    def fechar(self):
+        self.fixtures.fechar()
+        super().fechar()
+
+
+def dados_prova(pagina, indice, semente=0):
+    """Dados sintéticos da prova `indice` da página `pagina` (determinísticos)"""
+    rng = random.Random(f"{semente}-{pagina}-{indice}")
+    banca = rng.choice(BANCAS)
+    ano = rng.randint(2010, 2025)
+    return {
+        'slug': f"{banca.lower()}-{ano}-p{pagina}-{indice}",
+        'banca': banca,
+        'ano': ano,
+        'orgao': rng.choice(ORGAOS),
+        'cargo': rng.choice(CARGOS),
+        'nivel': rng.choice(NIVEIS),
+        'mes': rng.randint(1, 12),
+        'questoes': rng.randint(20, 120),
+    }
+
+
+def gerar_card(dados):
+    """HTML de um card de prova no formato da listagem"""
+    slug = dados['slug']
+    return (
+        f'<div class="card-prova">'
+        f'<h3><a href="/questoes-de-concurso/prova/{slug}">'
+        f'{dados["banca"]} - {dados["ano"]} - {dados["orgao"]} - {dados["cargo"]}</a></h3>'
+        f'<p>Concurso Público: {dados["orgao"]}</p>'
+        f'<p>Prova aplicada em: {dados["mes"]:02d}/{dados["ano"]}</p>'
+        f'<p>{dados["questoes"]} Questões</p>'
+        f'<p>Nível: {dados["nivel"]}</p>'
+        f'<a href="/questoes-de-concurso/prova/{slug}">Informações</a>'
+        f'<a href="/arquivos/{slug}-prova.pdf">Prova</a>'
+        f'<a href="/arquivos/{slug}-gabarito.pdf">Gabarito</a>'
+        f'</div>'
+    )
+
+
+def _pagina_html(titulo, conteudo):
+    return (
+        f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{titulo}</title></head><body>'
+        '<header><nav><a href="/">Início</a><a href="/questoes-de-concurso">Questões</a></nav></header>'
+        f'<main>{conteudo}</main>'
+        '<footer><p>Aprova Concursos</p></footer></body></html>'
+    ).encode('utf-8')
+
+
+def gerar_pagina_listagem(pagina, por_pagina=30, semente=0, total=None):
+    """HTML sintético de uma página da listagem (determinístico por página e semente)
+
+    Com `total`, a listagem tem só `total` provas e as páginas seguintes vêm vazias.
+    """
+    inicio = (pagina - 1) * por_pagina
+    quantidade = por_pagina if total is None else max(0, min(por_pagina, total - inicio))
+    cards = ''.join(gerar_card(dados_prova(pagina, i, semente)) for i in range(quantidade))
+    return _pagina_html('Provas', f'<section class="lista-provas">{cards}</section>')
+
+
+def gerar_pagina_detalhe(pagina, indice, semente=0):
+    """HTML sintético da página de detalhe de uma prova da listagem"""
+    dados = dados_prova(pagina, indice, semente)
+    titulo = f'{dados["banca"]} - {dados["ano"]} - {dados["orgao"]} - {dados["cargo"]}'
+    conteudo = (
+        f'<h1>{titulo}</h1>'
+        f'<ul class="detalhes">'
+        f'<li>Banca: {dados["banca"]}</li>'
+        f'<li>Concurso Público: {dados["orgao"]}</li>'
+        f'<li>Prova aplicada em: {dados["mes"]:02d}/{dados["ano"]}</li>'
+        f'<li>Nível: {dados["nivel"]}</li>'
+        f'<li>{dados["questoes"]} Questões</li>'
+        f'</ul>'
+        f'<a href="/arquivos/{dados["slug"]}-prova.pdf">Baixar prova</a>'
+        f'<a href="/arquivos/{dados["slug"]}-gabarito.pdf">Baixar gabarito</a>'
+        '<script>var x = "Informações";</script>'
+    )
+    return _pagina_html(titulo, conteudo)
+
+
+def gravar_fixtures_sinteticas(arquivo, url_pagina, num_paginas, por_pagina=30, semente=0):
+    """Cria um arquivo de fixtures com `num_paginas` páginas sintéticas da listagem
+
+    `url_pagina(pagina)` monta a URL de cada página (ex.: ConcursoScraper._url_pagina).
+    """
+    fixtures = ArquivoFixtures(arquivo, 'w')
+    for pagina in range(1, num_paginas + 1):
+        fixtures.gravar(url_pagina(pagina), 200, {'Content-Type': 'text/html; charset=utf-8'},
+                        gerar_pagina_listagem(pagina, por_pagina, semente))
+    fixtures.fechar()
@@ -0,0 +1,226 @@
+"""
+Gabaritos estruturados
+Converte os PDFs de gabarito em um vetor compacto por prova (um byte por
+questão) e guarda tudo num arquivo binário indexado pelo link da prova, para
+corrigir as respostas de um usuário sem abrir nenhum PDF.
+
+Codificação de cada questão (ASCII):
+    A-E  alternativa correta (C/E também servem para Certo/Errado)
+    *    questão anulada
+    ?    questão sem resposta no gabarito
+
+Requer: pypdf
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from arquivos import gravar_atomico
+from indice_questoes import extrair_texto_pdf
+
+ANULADA = ord('*')
+SEM_GABARITO = ord('?')
+
+# "1 - A", "01.B", "12) C", "3 ANULADA", "4 X", "5 *"
+RE_RESPOSTA = re.compile(r'(?<!\d)(\d{1,3})\s*[-.):]?\s*(ANULAD[AO]|NULA|[A-E]|X|\*)(?![A-Za-z])',
+                         re.IGNORECASE)
+
+MAGICO = b'GAB1'
+CABECALHO = struct.Struct('<4sII')  # mágico, nº de gabaritos, nº de provas
+
+
+def extrair_gabarito(texto):
+    """Converte o texto de um gabarito em bytes, um por questão
+
+    Gabaritos com vários tipos de prova repetem a numeração; só o primeiro
+    bloco (até a numeração voltar a 1) é usado.
+    """
+    respostas = {}
+    for match in RE_RESPOSTA.finditer(texto):
+        numero = int(match.group(1))
+        if numero == 0:
+            continue
+        if numero in respostas:
+            break
+        codigo = match.group(2).upper()
+        if len(codigo) > 1 or codigo in ('X', '*'):
+            respostas[numero] = ANULADA
+        else:
+            respostas[numero] = ord(codigo)
+
+    if not respostas:
+        return b''
+    return bytes(respostas.get(n, SEM_GABARITO) for n in range(1, max(respostas) + 1))
+
+
+def processar_gabarito(digest, caminho):
+    """Extrai um gabarito; roda nos processos do pool (sem o pypdf, o ImportError sobe)"""
+    try:
+        _, texto = extrair_texto_pdf(caminho)
+    except ImportError:
+        raise
+    except Exception as e:
+        return digest, b'', str(e)
+    return digest, extrair_gabarito(texto), None
+
+
+class ArquivoGabaritos:
+    """Gabaritos de todas as provas em um único arquivo binário
+
+    Layout: cabeçalho; hashes SHA-256 dos PDFs (32 bytes cada); offsets
+    uint32 das respostas; respostas concatenadas; para cada prova, o índice
+    do seu gabarito (uint32); e os links das provas separados por '\\n'.
+    """
+
+    def __init__(self, arquivo='gabaritos.bin'):
+        self.arquivo = arquivo
+        self.gabaritos = {}  # hash do PDF -> bytes
+        self.links = {}      # link da prova -> hash do PDF
+        if os.path.exists(arquivo):
+            self.carregar()
+
+    def carregar(self):
+        with open(self.arquivo, 'rb') as f:
+            dados = f.read()
+
+        magico, n_gabaritos, n_links = CABECALHO.unpack_from(dados, 0)
+        if magico != MAGICO:
+            raise ValueError(f"{self.arquivo} não é um arquivo de gabaritos")
+        pos = CABECALHO.size
+
+        hashes = [dados[pos + 32 * i:pos + 32 * (i + 1)].hex() for i in range(n_gabaritos)]
+        pos += 32 * n_gabaritos
+        offsets = struct.unpack_from(f'<{n_gabaritos + 1}I', dados, pos)
+        pos += 4 * (n_gabaritos + 1)
+        respostas = dados[pos:pos + offsets[-1]]
+        pos += offsets[-1]
+        indices = struct.unpack_from(f'<{n_links}I', dados, pos)
+        pos += 4 * n_links
+        links = dados[pos:].decode('utf-8').split('\n') if n_links else []
+
+        self.gabaritos = {h: respostas[offsets[i]:offsets[i + 1]] for i, h in enumerate(hashes)}
+        self.links = {link: hashes[i] for link, i in zip(links, indices)}
+
+    def salvar(self):
+        hashes = list(self.gabaritos)
+        posicao = {h: i for i, h in enumerate(hashes)}
+        links = [link for link, h in self.links.items() if h in posicao]
+
+        offsets = [0]
+        for h in hashes:
+            offsets.append(offsets[-1] + len(self.gabaritos[h]))
+
+        partes = [
+            CABECALHO.pack(MAGICO, len(hashes), len(links)),
+            b''.join(bytes.fromhex(h) for h in hashes),
+            struct.pack(f'<{len(offsets)}I', *offsets),
+            b''.join(self.gabaritos[h] for h in hashes),
+            struct.pack(f'<{len(links)}I', *(posicao[self.links[link]] for link in links)),
+            '\n'.join(links).encode('utf-8'),
+        ]
+        gravar_atomico(self.arquivo, b''.join(partes))
+
+    def atualizar(self, provas, processos=None):
+        """Extrai em paralelo os gabaritos cujo PDF (hash) ainda não foi lido"""
+        pendentes = {}
+        for p in provas:
+            digest = p.get('hash_gabarito_pdf')
+            if not digest:
+                continue
+            self.links[p['link']] = digest
+            if digest not in self.gabaritos and p.get('arquivo_gabarito_pdf'):
+                pendentes[digest] = p['arquivo_gabarito_pdf']
+
+        print(f"📝 {len(pendentes)} gabaritos novos ({len(self.gabaritos)} já extraídos)")
+        vazios = 0
+        if pendentes:
+            import pypdf  # noqa: F401 (sem ele, falha aqui, antes de abrir o pool)
+            with ProcessPoolExecutor(max_workers=processos) as pool:
+                futuros = [pool.submit(processar_gabarito, d, c) for d, c in pendentes.items()]
+                for futuro in as_completed(futuros):
+                    digest, respostas, erro = futuro.result()
+                    if erro:
+                        print(f"  ✗ Erro ao ler {pendentes[digest]}: {erro}")
+                        continue
+                    if not respostas:
+                        vazios += 1
+                    # Gabarito vazio também é guardado, para não ser relido a cada execução
+                    self.gabaritos[digest] = respostas
+
+        self.salvar()
+        print(f"✓ {len(pendentes)} gabaritos processados ({vazios} sem respostas reconhecidas)")
+        return len(pendentes)
+
+    def respostas(self, link):
+        """Gabarito da prova como bytes, ou None se não houver"""
+        digest = self.links.get(link)
+        return self.gabaritos.get(digest) if digest else None
+
+    def corrigir(self, link, respostas_usuario):
+        """Corrige as respostas ('ABCD-E...', '-' ou espaço = em branco)
+
+        Questões anuladas contam como acerto para todos.
+        """
+        gabarito = self.respostas(link)
+        if not gabarito:
+            return None
+
+        marcadas = respostas_usuario.upper().encode('ascii', 'replace')
+        resultado = {'total': len(gabarito), 'acertos': 0, 'erros': 0,
+                     'em_branco': 0, 'anuladas': 0, 'sem_gabarito': 0}
+        for i, correta in enumerate(gabarito):
+            if correta == ANULADA:
+                resultado['anuladas'] += 1
+                resultado['acertos'] += 1
+            elif correta == SEM_GABARITO:
+                resultado['sem_gabarito'] += 1
+            elif i >= len(marcadas) or marcadas[i] in b' -':
+                resultado['em_branco'] += 1
+            elif marcadas[i] == correta:
+                resultado['acertos'] += 1
+            else:
+                resultado['erros'] += 1
+        return resultado
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Extração de gabaritos e correção de provas")
+    parser.add_argument('--gabaritos', default='gabaritos.bin',
+                        help="arquivo binário dos gabaritos (padrão: gabaritos.bin)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    atualizar = sub.add_parser('atualizar', help="extrai os gabaritos baixados que ainda não foram lidos")
+    atualizar.add_argument('--arquivo', default='provas_concursos.json')
+    atualizar.add_argument('--processos', type=int, default=None)
+
+    corrigir = sub.add_parser('corrigir', help="corrige as respostas de uma prova")
+    corrigir.add_argument('link', help="link da prova")
+    corrigir.add_argument('respostas', help="respostas em sequência, ex.: ABCD-EA ('-' = em branco)")
+
+    args = parser.parse_args()
+    gabaritos = ArquivoGabaritos(args.gabaritos)
+
+    if args.comando == 'atualizar':
+        with open(args.arquivo, 'r', encoding='utf-8') as f:
+            provas = json.load(f)
+        try:
+            gabaritos.atualizar(provas, processos=args.processos)
+        except ImportError:
+            print("⚠ Instale pypdf para extrair o texto dos PDFs: pip install pypdf")
+    else:
+        resultado = gabaritos.corrigir(args.link, args.respostas)
+        if resultado is None:
+            print("❌ Gabarito não encontrado para essa prova")
+            return
+        print(f"\n✓ {resultado['acertos']}/{resultado['total']} acertos")
+        print(f"  Erros: {resultado['erros']} | Em branco: {resultado['em_branco']} | "
+              f"Anuladas: {resultado['anuladas']}")
+
+
+if __name__ == "__main__":
+    main()
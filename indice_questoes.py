@@ -0,0 +1,221 @@
+"""
+Extração do texto das provas em PDF e índice de busca por questão
+Cada PDF baixado (baixar_pdfs.py) é lido em paralelo, dividido em questões
+e guardado num índice full-text SQLite (FTS5). O processamento é incremental:
+só PDFs com hash ainda não indexado são lidos em cada execução.
+
+Requer: pypdf
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# Início de questão no começo da linha: "1.", "01)", "Questão 12", "QUESTÃO 3 -"
+RE_INICIO_QUESTAO = re.compile(r'^[ \t]*(?:QUEST[ÃA]O[ \t]*)?(\d{1,3})[ \t]*[.)\-–:]?[ \t]+(?=\S)',
+                               re.MULTILINE | re.IGNORECASE)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pdfs (
+    hash TEXT PRIMARY KEY,
+    paginas INTEGER,
+    questoes INTEGER,
+    erro TEXT,
+    processado_em TEXT
+);
+CREATE TABLE IF NOT EXISTS provas (
+    link TEXT PRIMARY KEY,
+    hash TEXT,
+    titulo TEXT,
+    banca TEXT,
+    orgao TEXT,
+    cargo TEXT,
+    ano TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_provas_hash ON provas(hash);
+CREATE VIRTUAL TABLE IF NOT EXISTS questoes USING fts5(
+    texto,
+    hash UNINDEXED,
+    numero UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def extrair_texto_pdf(caminho):
+    """Retorna (número de páginas, texto) de um PDF"""
+    from pypdf import PdfReader
+
+    leitor = PdfReader(caminho)
+    paginas = [pagina.extract_text() or '' for pagina in leitor.pages]
+    return len(paginas), '\n'.join(paginas)
+
+
+def dividir_questoes(texto):
+    """Divide o texto da prova em [(número, texto da questão), ...]
+
+    Só aceita marcadores em sequência (1, 2, 3...), o que descarta números
+    soltos no início de linhas de enunciados, tabelas e alternativas.
+    """
+    questoes = []
+    esperado = 1
+    inicio_atual = None
+
+    for match in RE_INICIO_QUESTAO.finditer(texto):
+        numero = int(match.group(1))
+        if numero != esperado:
+            continue
+        if inicio_atual is not None:
+            questoes.append((esperado - 1, texto[inicio_atual:match.start()].strip()))
+        inicio_atual = match.end()
+        esperado += 1
+
+    if inicio_atual is not None:
+        questoes.append((esperado - 1, texto[inicio_atual:].strip()))
+    return questoes
+
+
+def processar_pdf(digest, caminho):
+    """Extrai e divide um PDF; roda nos processos do pool
+
+    Sem o pypdf o ImportError sobe: o hash não pode ficar marcado como processado.
+    """
+    try:
+        paginas, texto = extrair_texto_pdf(caminho)
+    except ImportError:
+        raise
+    except Exception as e:
+        return digest, 0, [], str(e)
+    return digest, paginas, dividir_questoes(texto), None
+
+
+class IndiceQuestoes:
+    """Índice full-text das questões das provas, indexado pelo hash do PDF"""
+
+    def __init__(self, arquivo='indice_questoes.db'):
+        self.conn = sqlite3.connect(arquivo)
+        self.conn.executescript(ESQUEMA)
+
+    def hashes_processados(self):
+        return {linha[0] for linha in self.conn.execute("SELECT hash FROM pdfs")}
+
+    def registrar_provas(self, provas):
+        """Atualiza os metadados das provas que têm PDF baixado"""
+        linhas = [(p['link'], p['hash_prova_pdf'], p.get('titulo', ''), p.get('banca', ''),
+                   p.get('orgao', ''), p.get('cargo', ''), p.get('ano', ''))
+                  for p in provas if p.get('hash_prova_pdf')]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO provas VALUES (?, ?, ?, ?, ?, ?, ?)", linhas)
+
+    def atualizar(self, provas, processos=None):
+        """Indexa os PDFs de prova ainda não processados, em paralelo"""
+        self.registrar_provas(provas)
+
+        processados = self.hashes_processados()
+        pendentes = {}
+        for p in provas:
+            digest = p.get('hash_prova_pdf')
+            if digest and digest not in processados and p.get('arquivo_prova_pdf'):
+                pendentes[digest] = p['arquivo_prova_pdf']
+
+        print(f"📚 {len(pendentes)} PDFs novos para indexar ({len(processados)} já indexados)")
+        if not pendentes:
+            return 0
+        import pypdf  # noqa: F401 (sem ele, falha aqui, antes de abrir o pool)
+
+        total_questoes = 0
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = [pool.submit(processar_pdf, digest, caminho) for digest, caminho in pendentes.items()]
+            for feitos, futuro in enumerate(as_completed(futuros), 1):
+                digest, paginas, questoes, erro = futuro.result()
+                agora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                # Questões e marcação do PDF entram na mesma transação: nunca fica indexado pela metade
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT INTO questoes (texto, hash, numero) VALUES (?, ?, ?)",
+                        [(texto, digest, numero) for numero, texto in questoes])
+                    self.conn.execute("INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?, ?)",
+                                      (digest, paginas, len(questoes), erro, agora))
+                total_questoes += len(questoes)
+                if erro:
+                    print(f"  ✗ Erro ao ler {pendentes[digest]}: {erro}")
+                if feitos % 100 == 0:
+                    print(f"  ✓ {feitos}/{len(pendentes)} PDFs indexados")
+
+        print(f"✓ {len(pendentes)} PDFs indexados, {total_questoes} questões")
+        return len(pendentes)
+
+    def buscar(self, consulta, banca=None, orgao=None, ano=None, limite=20):
+        """Busca questões pelo texto, opcionalmente filtrando pelos dados da prova
+
+        Todos os termos da consulta precisam aparecer na questão (acentos e
+        maiúsculas são ignorados).
+        """
+        termos = ' '.join('"' + t.replace('"', '') + '"' for t in consulta.split())
+        sql = """
+            SELECT p.titulo, p.banca, p.ano, p.link, q.numero,
+                   snippet(questoes, 0, '[', ']', '…', 20)
+            FROM questoes q
+            JOIN provas p ON p.hash = q.hash
+            WHERE questoes MATCH ?
+        """
+        parametros = [termos]
+        for campo, valor in (('banca', banca), ('orgao', orgao), ('ano', ano)):
+            if valor:
+                sql += f" AND p.{campo} LIKE ?"
+                parametros.append(f"%{valor}%")
+        sql += " ORDER BY rank LIMIT ?"
+        parametros.append(limite)
+
+        colunas = ('titulo', 'banca', 'ano', 'link', 'numero', 'trecho')
+        return [dict(zip(colunas, linha)) for linha in self.conn.execute(sql, parametros)]
+
+    def fechar(self):
+        self.conn.close()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Índice de busca das questões das provas")
+    parser.add_argument('--banco', default='indice_questoes.db',
+                        help="arquivo SQLite do índice (padrão: indice_questoes.db)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    atualizar = sub.add_parser('atualizar', help="indexa os PDFs baixados que ainda não estão no índice")
+    atualizar.add_argument('--arquivo', default='provas_concursos.json')
+    atualizar.add_argument('--processos', type=int, default=None)
+
+    buscar = sub.add_parser('buscar', help="busca questões pelo texto")
+    buscar.add_argument('consulta')
+    buscar.add_argument('--banca')
+    buscar.add_argument('--orgao')
+    buscar.add_argument('--ano')
+    buscar.add_argument('--limite', type=int, default=20)
+
+    args = parser.parse_args()
+    indice = IndiceQuestoes(args.banco)
+
+    if args.comando == 'atualizar':
+        with open(args.arquivo, 'r', encoding='utf-8') as f:
+            provas = json.load(f)
+        try:
+            indice.atualizar(provas, processos=args.processos)
+        except ImportError:
+            print("⚠ Instale pypdf para extrair o texto dos PDFs: pip install pypdf")
+    else:
+        resultados = indice.buscar(args.consulta, banca=args.banca, orgao=args.orgao,
+                                   ano=args.ano, limite=args.limite)
+        print(f"\n🔍 {len(resultados)} questões encontradas para '{args.consulta}'\n")
+        for i, r in enumerate(resultados, 1):
+            print(f"{i}. {r['titulo']} — questão {r['numero']}")
+            print(f"   {r['trecho']}")
+            print()
+
+    indice.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Métricas da coleta
+Contadores e histogramas por etapa (rede, parsing, mesclagem, exportação) e
+por página, exportados em texto do Prometheus e em um resumo JSON
+"""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from arquivos import gravar_atomico
+
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LIMITES_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+LIMITES_CONTAGEM = (0, 1, 5, 10, 20, 30, 50, 100)
+
+
+class Histograma:
+    """Histograma de buckets cumulativos, no modelo do Prometheus"""
+
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = tuple(limites)
+        self.buckets = [0] * (len(self.limites) + 1)  # o último é o +Inf
+        self.contagem = 0
+        self.soma = 0.0
+        self.minimo = None
+        self.maximo = None
+
+    def observar(self, valor):
+        self.buckets[bisect_left(self.limites, valor)] += 1
+        self.contagem += 1
+        self.soma += valor
+        self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+        self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    def quantil(self, q):
+        """Estimativa do quantil: limite superior do bucket em que ele cai"""
+        if not self.contagem:
+            return None
+        alvo = q * self.contagem
+        acumulado = 0
+        for i, quantidade in enumerate(self.buckets):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return self.limites[i] if i < len(self.limites) else self.maximo
+        return self.maximo
+
+    def resumo(self):
+        return {
+            'contagem': self.contagem,
+            'soma': round(self.soma, 6),
+            'media': round(self.soma / self.contagem, 6) if self.contagem else None,
+            'min': self.minimo,
+            'p50': self.quantil(0.5),
+            'p95': self.quantil(0.95),
+            'max': self.maximo,
+        }
+
+
+def _rotulos_prometheus(rotulos, extra=()):
+    pares = list(rotulos) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nome}="{valor}"' for nome, valor in pares) + '}'
+
+
+def _formatar(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Metricas:
+    """Registro de métricas compartilhado pelo cliente HTTP e pelo scraper"""
+
+    def __init__(self, prefixo='scraper'):
+        self.prefixo = prefixo
+        self.inicio = time.time()
+        self.contadores = {}   # (nome, rótulos) -> valor
+        self.histogramas = {}  # (nome, rótulos) -> Histograma
+        self.paginas = []      # métricas de cada página da listagem
+        self._lock = threading.Lock()
+
+    def contar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, limites=LIMITES_SEGUNDOS, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            if chave not in self.histogramas:
+                self.histogramas[chave] = Histograma(limites)
+            self.histogramas[chave].observar(valor)
+
+    @contextmanager
+    def medir(self, etapa):
+        """Mede a duração de uma etapa (coleta, enriquecimento, exportação...)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar('etapa_segundos', time.perf_counter() - inicio, etapa=etapa)
+
+    def registrar_pagina(self, pagina, dados):
+        with self._lock:
+            self.paginas.append(dict(dados, pagina=pagina))
+
+    def texto_prometheus(self):
+        """Métricas no formato de texto do Prometheus (node_exporter textfile)"""
+        linhas = []
+        with self._lock:
+            tipos_escritos = set()
+            for (nome, rotulos), valor in sorted(self.contadores.items()):
+                metrica = f'{self.prefixo}_{nome}_total'
+                if metrica not in tipos_escritos:
+                    linhas.append(f'# TYPE {metrica} counter')
+                    tipos_escritos.add(metrica)
+                linhas.append(f'{metrica}{_rotulos_prometheus(rotulos)} {_formatar(valor)}')
+
+            for (nome, rotulos), histograma in sorted(self.histogramas.items()):
+                metrica = f'{self.prefixo}_{nome}'
+                if metrica not in tipos_escritos:
+                    linhas.append(f'# TYPE {metrica} histogram')
+                    tipos_escritos.add(metrica)
+                acumulado = 0
+                for limite, quantidade in zip(histograma.limites + ('+Inf',), histograma.buckets):
+                    acumulado += quantidade
+                    linhas.append(f'{metrica}_bucket{_rotulos_prometheus(rotulos, [("le", limite)])} {acumulado}')
+                linhas.append(f'{metrica}_sum{_rotulos_prometheus(rotulos)} {_formatar(histograma.soma)}')
+                linhas.append(f'{metrica}_count{_rotulos_prometheus(rotulos)} {histograma.contagem}')
+
+            linhas.append(f'# TYPE {self.prefixo}_ultima_execucao_timestamp gauge')
+            linhas.append(f'{self.prefixo}_ultima_execucao_timestamp {_formatar(self.inicio)}')
+        return '\n'.join(linhas) + '\n'
+
+    def resumo(self):
+        """Resumo da execução: contadores, histogramas resumidos e métricas por página"""
+        def chave_texto(nome, rotulos):
+            return nome + ''.join(f'[{valor}]' for _, valor in rotulos)
+
+        with self._lock:
+            return {
+                'inicio': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.inicio)),
+                'duracao_segundos': round(time.time() - self.inicio, 3),
+                'contadores': {chave_texto(n, r): v for (n, r), v in sorted(self.contadores.items())},
+                'histogramas': {chave_texto(n, r): h.resumo() for (n, r), h in sorted(self.histogramas.items())},
+                'paginas': sorted(self.paginas, key=lambda p: p['pagina']),
+            }
+
+    def exportar_prometheus(self, arquivo='metricas_scraper.prom'):
+        gravar_atomico(arquivo, self.texto_prometheus(), sincronizar=False)
+
+    def exportar_json(self, arquivo='metricas_scraper.json'):
+        gravar_atomico(arquivo, json.dumps(self.resumo(), ensure_ascii=False, indent=2), sincronizar=False)
+
+    def exibir_etapas(self):
+        """Tempo total de cada etapa, para ver onde a execução gastou tempo"""
+        with self._lock:
+            etapas = [(dict(r)['etapa'], h.soma) for (n, r), h in self.histogramas.items()
+                      if n == 'etapa_segundos']
+            rede = {dict(r).get('fase'): h for (n, r), h in self.histogramas.items()
+                    if n == 'http_fase_segundos'}
+        if etapas:
+            print("⏱ Etapas: " + ' | '.join(f"{nome} {segundos:.2f}s" for nome, segundos in etapas))
+        if rede:
+            print("⏱ Rede (p95): " + ' | '.join(f"{fase} {h.quantil(0.95)}s" for fase, h in rede.items()))
@@ -0,0 +1,268 @@
+"""
+Modelo das provas: registro tipado e coleção em colunas
+Prova guarda os campos em __slots__ (sem o dict por registro) e interna os
+campos categóricos e as datas, então "Cebraspe (Cespe)" ou "2024" existem
+uma só vez na memória, não uma vez por prova. Ela continua aceitando o
+acesso de dict usado em todo o projeto (prova['banca'], prova.get('orgao',
+'')), e json.dumps(prova, default=dict) grava o mesmo JSON de antes.
+
+ColecaoProvas é a forma em massa (struct of arrays): códigos inteiros para
+os categóricos, um array para num_questoes e listas para os textos.
+"""
+
+import sys
+from array import array
+from collections import Counter
+
+# Mesma ordem dos campos do registro montado pelo scraper
+CAMPOS = ('titulo', 'link', 'banca', 'orgao', 'cargo', 'ano', 'nivel', 'data_aplicacao',
+          'num_questoes', 'link_prova_pdf', 'link_gabarito_pdf', 'data_coleta', 'data_detalhe')
+CAMPOS_CATEGORICOS = ('banca', 'orgao', 'cargo', 'ano', 'nivel')
+CAMPOS_TEXTO = tuple(campo for campo in CAMPOS if campo not in CAMPOS_CATEGORICOS and campo != 'num_questoes')
+# Além dos categóricos, as datas (mesmo mês de aplicação, mesma hora de coleta) se repetem muito
+CAMPOS_INTERNADOS = CAMPOS_CATEGORICOS + ('data_aplicacao', 'data_coleta', 'data_detalhe')
+
+_CAMPOS = frozenset(CAMPOS)
+_CATEGORICOS = frozenset(CAMPOS_CATEGORICOS)
+_INTERNADOS = frozenset(CAMPOS_INTERNADOS)
+
+
+class Prova:
+    """Uma prova, com os campos conhecidos em slots e os demais em `extras`
+
+    Campo ausente é slot não preenchido, como a chave ausente do dict:
+    prova.get('nivel') devolve None e prova.nivel levanta AttributeError.
+    """
+
+    __slots__ = CAMPOS + ('extras',)
+
+    def __init__(self, **campos):
+        self.extras = None
+        for campo, valor in campos.items():
+            self[campo] = valor
+
+    @classmethod
+    def de_dict(cls, dados):
+        if isinstance(dados, cls):
+            return dados
+        prova = cls()
+        for campo, valor in dados.items():
+            prova[campo] = valor
+        return prova
+
+    def para_dict(self):
+        return {campo: self[campo] for campo in self}
+
+    def __setitem__(self, campo, valor):
+        if campo in _CAMPOS:
+            if campo in _INTERNADOS and type(valor) is str:
+                valor = sys.intern(valor)
+            setattr(self, campo, valor)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[campo] = valor
+
+    def __getitem__(self, campo):
+        if campo in _CAMPOS:
+            try:
+                return getattr(self, campo)
+            except AttributeError:
+                raise KeyError(campo) from None
+        if self.extras and campo in self.extras:
+            return self.extras[campo]
+        raise KeyError(campo)
+
+    def __delitem__(self, campo):
+        if campo in _CAMPOS:
+            try:
+                delattr(self, campo)
+            except AttributeError:
+                raise KeyError(campo) from None
+        elif self.extras and campo in self.extras:
+            del self.extras[campo]
+        else:
+            raise KeyError(campo)
+
+    def __contains__(self, campo):
+        if campo in _CAMPOS:
+            return hasattr(self, campo)
+        return bool(self.extras) and campo in self.extras
+
+    def __iter__(self):
+        for campo in CAMPOS:
+            if hasattr(self, campo):
+                yield campo
+        if self.extras:
+            yield from self.extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, outro):
+        if isinstance(outro, (Prova, dict)):
+            return self.para_dict() == dict(outro)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Prova({self.para_dict()!r})"
+
+    def get(self, campo, padrao=None):
+        try:
+            return self[campo]
+        except KeyError:
+            return padrao
+
+    def setdefault(self, campo, padrao=None):
+        if campo not in self:
+            self[campo] = padrao
+        return self[campo]
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[campo] for campo in self]
+
+    def items(self):
+        return [(campo, self[campo]) for campo in self]
+
+    def update(self, outro=(), **campos):
+        for campo, valor in (outro.items() if hasattr(outro, 'items') else outro):
+            self[campo] = valor
+        for campo, valor in campos.items():
+            self[campo] = valor
+
+    def copy(self):
+        return Prova.de_dict(self.para_dict())
+
+
+class ColecaoProvas:
+    """Provas em colunas (struct of arrays), para consultas e resultados em massa
+
+    Somente leitura: indexar ou iterar monta objetos Prova novos, então
+    alterá-los não muda a coleção. Valores fora do tipo da coluna (ano como
+    número, por exemplo) vão para os extras da posição e voltam intactos.
+    """
+
+    def __init__(self, provas=()):
+        self._codigos = {campo: array('i') for campo in CAMPOS_CATEGORICOS}  # -1 = ausente
+        self._valores = {campo: [] for campo in CAMPOS_CATEGORICOS}  # código -> valor
+        self._indices = {campo: {} for campo in CAMPOS_CATEGORICOS}  # valor -> código
+        self._textos = {campo: [] for campo in CAMPOS_TEXTO}  # None = ausente
+        self._num_questoes = array('i')  # -1 = ausente
+        self._extras = {}  # posição -> campos que não cabem nas colunas
+        self._total = 0
+        self.estender(provas)
+
+    def acrescentar(self, prova):
+        extras = {}
+        for campo in CAMPOS_CATEGORICOS:
+            valor = prova.get(campo)
+            if type(valor) is str:
+                indice = self._indices[campo]
+                if valor not in indice:
+                    indice[valor] = len(indice)
+                    self._valores[campo].append(sys.intern(valor))
+                self._codigos[campo].append(indice[valor])
+            else:
+                self._codigos[campo].append(-1)
+                if campo in prova:
+                    extras[campo] = valor
+        for campo in CAMPOS_TEXTO:
+            valor = prova.get(campo)
+            if type(valor) is str:
+                self._textos[campo].append(sys.intern(valor) if campo in _INTERNADOS else valor)
+            else:
+                self._textos[campo].append(None)
+                if campo in prova:
+                    extras[campo] = valor
+        valor = prova.get('num_questoes')
+        if type(valor) is int and 0 <= valor < 2**31:
+            self._num_questoes.append(valor)
+        else:
+            self._num_questoes.append(-1)
+            if 'num_questoes' in prova:
+                extras['num_questoes'] = valor
+        for campo in prova:
+            if campo not in _CAMPOS:
+                extras[campo] = prova[campo]
+        if extras:
+            self._extras[self._total] = extras
+        self._total += 1
+
+    def estender(self, provas):
+        for prova in provas:
+            self.acrescentar(prova)
+
+    def __len__(self):
+        return self._total
+
+    def _prova(self, i):
+        prova = Prova()
+        for campo in CAMPOS:
+            if campo in _CATEGORICOS:
+                codigo = self._codigos[campo][i]
+                if codigo >= 0:
+                    setattr(prova, campo, self._valores[campo][codigo])
+            elif campo == 'num_questoes':
+                if self._num_questoes[i] >= 0:
+                    prova.num_questoes = self._num_questoes[i]
+            elif self._textos[campo][i] is not None:
+                setattr(prova, campo, self._textos[campo][i])
+        for campo, valor in self._extras.get(i, {}).items():
+            prova[campo] = valor
+        return prova
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return [self._prova(i) for i in range(*posicao.indices(self._total))]
+        if posicao < 0:
+            posicao += self._total
+        if not 0 <= posicao < self._total:
+            raise IndexError(posicao)
+        return self._prova(posicao)
+
+    def __iter__(self):
+        for i in range(self._total):
+            yield self._prova(i)
+
+    def coluna(self, campo):
+        """Valores do campo em todas as provas (None onde está ausente)"""
+        if campo in _CATEGORICOS:
+            valores = self._valores[campo]
+            return [valores[codigo] if codigo >= 0 else None for codigo in self._codigos[campo]]
+        if campo == 'num_questoes':
+            return [n if n >= 0 else None for n in self._num_questoes]
+        return list(self._textos[campo])
+
+    def contar(self, campo, limite=None):
+        """[(valor, quantidade), ...] de um campo categórico, do mais frequente para o menos"""
+        contagem = Counter(self._codigos[campo])
+        contagem.pop(-1, None)
+        valores = self._valores[campo]
+        pares = sorted(((valores[codigo], n) for codigo, n in contagem.items()),
+                       key=lambda par: (-par[1], par[0]))
+        return pares if limite is None else pares[:limite]
+
+    def dataframe(self):
+        """DataFrame com os categóricos montados direto dos códigos"""
+        import numpy as np
+        import pandas as pd
+
+        dados = {}
+        for campo in CAMPOS:
+            if campo in _CATEGORICOS:
+                dados[campo] = pd.Categorical.from_codes(np.frombuffer(self._codigos[campo], dtype=np.int32),
+                                                         categories=self._valores[campo])
+            elif campo == 'num_questoes':
+                dados[campo] = np.frombuffer(self._num_questoes, dtype=np.int32).clip(0).astype(np.int16)
+            elif any(valor is not None for valor in self._textos[campo]):
+                dados[campo] = self._textos[campo]
+        df = pd.DataFrame(dados)
+        if self._extras:
+            extras = pd.DataFrame.from_dict(self._extras, orient='index').reindex(range(self._total))
+            df = pd.concat([df.drop(columns=[c for c in extras if c in df]), extras], axis=1)
+        return df
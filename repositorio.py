@@ -0,0 +1,532 @@
+"""
+Repositório SQLite das provas coletadas
+O scraper grava (upsert pelo link canônico) em provas_concursos.db e os
+consumidores (busca, análise e bots) consultam o banco com filtros e
+contagens indexados, em vez de carregar e varrer o JSON inteiro. O banco usa
+WAL: leitores nunca bloqueiam o scraper. JSON, CSV, Excel e os snapshots
+colunar (snapshot_colunar.py) e binário (snapshot_binario.py) passam a ser
+exportações geradas a partir dele. Cada publicação fecha uma versão do
+dataset, com o delta desde a anterior (ver versoes.py).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice
+
+import exportacao
+from modelo import ColecaoProvas, Prova
+
+ARQUIVO_BANCO = 'provas_concursos.db'
+
+# Campos com coluna própria (e índice) para filtros e contagens
+CAMPOS_INDEXADOS = ('banca', 'orgao', 'cargo', 'ano', 'nivel', 'num_questoes')
+
+# Sobe a cada mudança no ESQUEMA; bancos com PRAGMA user_version menor são atualizados ao abrir
+VERSAO_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS provas (
+    link TEXT PRIMARY KEY,
+    ordem INTEGER NOT NULL,
+    titulo TEXT,
+    banca TEXT,
+    orgao TEXT,
+    cargo TEXT,
+    ano TEXT,
+    nivel TEXT,
+    num_questoes INTEGER,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_provas_ordem ON provas(ordem);
+CREATE INDEX IF NOT EXISTS idx_provas_banca ON provas(banca);
+CREATE INDEX IF NOT EXISTS idx_provas_orgao ON provas(orgao);
+CREATE INDEX IF NOT EXISTS idx_provas_cargo ON provas(cargo);
+CREATE INDEX IF NOT EXISTS idx_provas_ano ON provas(ano);
+CREATE INDEX IF NOT EXISTS idx_provas_nivel ON provas(nivel);
+CREATE INDEX IF NOT EXISTS idx_provas_num_questoes ON provas(num_questoes);
+
+-- Versões publicadas e, desde a última, o estado anterior (dados e ordem) de cada prova
+-- alterada ou regravada (NULL = não existia). Os gatilhos só registram depois da primeira versão.
+CREATE TABLE IF NOT EXISTS versoes (
+    versao INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    adicionadas INTEGER NOT NULL,
+    removidas INTEGER NOT NULL,
+    modificadas INTEGER NOT NULL,
+    delta TEXT
+);
+CREATE TABLE IF NOT EXISTS mudancas (
+    link TEXT PRIMARY KEY,
+    antes TEXT,
+    ordem_antes INTEGER
+);
+-- O conflito do upsert em provas se sobrepõe ao OR IGNORE dentro do gatilho, então a
+-- primeira versão de `antes` é preservada com NOT EXISTS. DROP + CREATE atualiza os gatilhos de bancos
+-- com versão de esquema anterior.
+DROP TRIGGER IF EXISTS provas_inclusao;
+CREATE TRIGGER provas_inclusao AFTER INSERT ON provas
+WHEN EXISTS (SELECT 1 FROM versoes)
+BEGIN
+    INSERT INTO mudancas (link, antes, ordem_antes) SELECT NEW.link, NULL, NULL
+    WHERE NOT EXISTS (SELECT 1 FROM mudancas WHERE link = NEW.link);
+END;
+DROP TRIGGER IF EXISTS provas_alteracao;
+CREATE TRIGGER provas_alteracao AFTER UPDATE OF dados, ordem ON provas
+WHEN (OLD.dados IS NOT NEW.dados OR OLD.ordem IS NOT NEW.ordem) AND EXISTS (SELECT 1 FROM versoes)
+BEGIN
+    INSERT INTO mudancas (link, antes, ordem_antes) SELECT OLD.link, OLD.dados, OLD.ordem
+    WHERE NOT EXISTS (SELECT 1 FROM mudancas WHERE link = OLD.link);
+END;
+DROP TRIGGER IF EXISTS provas_remocao;
+CREATE TRIGGER provas_remocao AFTER DELETE ON provas
+WHEN EXISTS (SELECT 1 FROM versoes)
+BEGIN
+    INSERT INTO mudancas (link, antes, ordem_antes) SELECT OLD.link, OLD.dados, OLD.ordem
+    WHERE NOT EXISTS (SELECT 1 FROM mudancas WHERE link = OLD.link);
+END;
+"""
+
+
+def mesclar_dados(existente, nova):
+    """Registro do banco atualizado com uma nova coleta da mesma prova
+
+    Valores preenchidos da nova coleta substituem os antigos; valores vazios
+    (None, '', 0) não apagam o que já estava lá, e campos que ela não traz
+    (data_detalhe, arquivo_*, hash_*...) são mantidos. A ordem dos campos do
+    registro existente é preservada.
+    """
+    mesclada = dict(existente)
+    for campo, valor in nova.items():
+        if valor or campo not in mesclada:
+            mesclada[campo] = valor
+    return mesclada
+
+
+class RepositorioProvas:
+    """Provas em SQLite: upsert pelo link e consultas por campo
+
+    O registro completo fica em `dados` (JSON, na ordem original dos campos);
+    os campos de filtro são repetidos em colunas indexadas. `ordem` guarda a
+    posição no dataset (as mais novas primeiro), usada nas exportações.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_BANCO):
+        self.arquivo = arquivo
+        self.conn = sqlite3.connect(arquivo, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._atualizar_esquema()
+        # upper() do Python, para a busca por trecho ignorar maiúsculas também em letras acentuadas
+        self.conn.create_function('maiusculas', 1, lambda texto: (texto or '').upper(), deterministic=True)
+
+    def _atualizar_esquema(self):
+        """Cria ou atualiza tabelas e gatilhos só se o banco for novo ou de uma versão anterior
+
+        Abrir um banco em dia não escreve nada: leitores não disputam a trava de
+        escrita nem deixam os snapshots parecendo desatualizados.
+        """
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] >= VERSAO_ESQUEMA:
+            return
+        self.conn.executescript("BEGIN IMMEDIATE;" + ESQUEMA)
+        try:
+            if 'ordem_antes' not in {coluna for _, coluna, *_ in self.conn.execute("PRAGMA table_info(mudancas)")}:
+                self.conn.execute("ALTER TABLE mudancas ADD COLUMN ordem_antes INTEGER")
+            self.conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def salvar(self, provas, tamanho_lote=5000, remover_ausentes=False):
+        """Grava as provas (upsert pelo link) na ordem recebida, numa única transação
+
+        As provas chegam em lotes de `tamanho_lote`, então um gerador (o
+        JSONL do --jsonl, por exemplo) é gravado sem ficar inteiro na memória.
+        Cada prova é mesclada ao registro que já está no banco (ver
+        mesclar_dados): campos que a coleta atual não traz, como os da página
+        de detalhe ou dos PDFs baixados, continuam lá. As provas que já
+        estavam no banco e não vieram nesta chamada continuam depois das
+        recebidas; com `remover_ausentes` (a chamada traz o dataset inteiro,
+        como uma coleta completa da listagem), elas são removidas.
+        """
+        total = 0
+        with self.conn:
+            # As recebidas ficam abaixo da menor `ordem` atual, sem reescrever as demais linhas. Como o
+            # total só é conhecido no fim, elas entram em ordem decrescente e são invertidas depois.
+            inicio = self.conn.execute("SELECT COALESCE(MIN(ordem), 0) FROM provas").fetchone()[0]
+            provas = iter(provas)
+            while True:
+                lote = list(islice(provas, tamanho_lote))
+                if not lote:
+                    break
+                self._gravar_lote(lote, inicio - 1 - total)
+                total += len(lote)
+            if total and remover_ausentes:
+                # Só as que não vieram continuam com `ordem` a partir do início
+                self.conn.execute("DELETE FROM provas WHERE ordem >= ?", (inicio,))
+            if total:
+                self.conn.execute("UPDATE provas SET ordem = ? - ordem WHERE ordem < ?",
+                                  (2 * inicio - total - 1, inicio))
+        return total
+
+    def regravar(self, provas, tamanho_lote=5000):
+        """Grava provas alteradas (upsert mesclado, como em salvar) sem mudar a ordem do dataset
+
+        Para gravar o progresso de um lote (páginas de detalhe, PDFs baixados)
+        sem reescrever as demais provas. As que ainda não estão no banco
+        entram no fim.
+        """
+        total = 0
+        with self.conn:
+            provas = iter(provas)
+            while True:
+                lote = list(islice(provas, tamanho_lote))
+                if not lote:
+                    break
+                self._gravar_lote(lote)
+                total += len(lote)
+        return total
+
+    def _gravar_lote(self, lote, ordem_inicial=None):
+        """Upsert mesclado do lote; sem `ordem_inicial`, as provas existentes mantêm a ordem"""
+        links = list({p['link']: None for p in lote})
+        existentes = {}
+        for i in range(0, len(links), 500):  # limite de parâmetros por consulta
+            parte = links[i:i + 500]
+            existentes.update((link, (dados, ordem)) for link, dados, ordem in self.conn.execute(
+                f"SELECT link, dados, ordem FROM provas WHERE link IN ({', '.join('?' * len(parte))})", parte))
+        proxima = None
+        mescladas = {}
+        ordens = {}
+        for i, prova in enumerate(lote):
+            link = prova['link']
+            if link in mescladas:
+                anterior = mescladas[link]
+            elif link in existentes:
+                anterior = json.loads(existentes[link][0])
+            else:
+                anterior = None
+            mescladas[link] = mesclar_dados(anterior, prova) if anterior is not None else dict(prova)
+            if ordem_inicial is not None:
+                ordens[link] = ordem_inicial - i  # repetida no lote: vale a última posição
+            elif link in existentes:
+                ordens[link] = existentes[link][1]
+            elif link not in ordens:
+                if proxima is None:
+                    proxima = self.conn.execute("SELECT COALESCE(MAX(ordem), 0) + 1 FROM provas").fetchone()[0]
+                ordens[link] = proxima
+                proxima += 1
+        linhas = [
+            (link, ordens[link], p.get('titulo', ''), p.get('banca', ''), p.get('orgao', ''), p.get('cargo', ''),
+             str(p.get('ano', '') or ''), p.get('nivel', ''), p.get('num_questoes', 0) or 0,
+             json.dumps(p, ensure_ascii=False, default=dict))
+            for link, p in mescladas.items()
+        ]
+        self.conn.executemany("""
+            INSERT INTO provas (link, ordem, titulo, banca, orgao, cargo, ano, nivel, num_questoes, dados)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(link) DO UPDATE SET
+                ordem = excluded.ordem, titulo = excluded.titulo, banca = excluded.banca,
+                orgao = excluded.orgao, cargo = excluded.cargo, ano = excluded.ano,
+                nivel = excluded.nivel, num_questoes = excluded.num_questoes, dados = excluded.dados
+        """, linhas)
+
+    def _filtro(self, com_questoes=False, contendo=False, **filtros):
+        """Monta o WHERE: igualdade (indexada) ou, com `contendo`, trecho do valor"""
+        condicoes = []
+        parametros = []
+        for campo, valor in filtros.items():
+            if campo not in CAMPOS_INDEXADOS:
+                raise ValueError(f"Campo não indexado: {campo}")
+            if valor is None:
+                continue
+            if contendo:
+                condicoes.append(f"instr(maiusculas({campo}), ?) > 0")
+                parametros.append(str(valor).upper())
+            else:
+                condicoes.append(f"{campo} = ?")
+                parametros.append(str(valor) if campo == 'ano' else valor)
+        if com_questoes:
+            condicoes.append("num_questoes > 0")
+        where = (" WHERE " + " AND ".join(condicoes)) if condicoes else ""
+        return where, parametros
+
+    def buscar(self, com_questoes=False, contendo=False, limite=None, **filtros):
+        """Provas que atendem aos filtros, na ordem do dataset, em uma ColecaoProvas
+
+        buscar(banca='FGV', ano=2024) usa os índices; buscar(contendo=True,
+        orgao='tribunal') compara trechos, ignorando maiúsculas.
+        """
+        where, parametros = self._filtro(com_questoes, contendo, **filtros)
+        sql = f"SELECT dados FROM provas{where} ORDER BY ordem"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return ColecaoProvas(json.loads(dados) for dados, in self.conn.execute(sql, parametros))
+
+    def total(self, com_questoes=False, contendo=False, **filtros):
+        where, parametros = self._filtro(com_questoes, contendo, **filtros)
+        return self.conn.execute(f"SELECT COUNT(*) FROM provas{where}", parametros).fetchone()[0]
+
+    def contar(self, campo, com_questoes=False, limite=None, **filtros):
+        """[(valor, quantidade), ...] do campo, da mais frequente para a menos frequente"""
+        if campo not in CAMPOS_INDEXADOS:
+            raise ValueError(f"Campo não indexado: {campo}")
+        where, parametros = self._filtro(com_questoes, **filtros)
+        sql = f"SELECT {campo}, COUNT(*) AS n FROM provas{where} GROUP BY {campo} ORDER BY n DESC, {campo}"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return self.conn.execute(sql, parametros).fetchall()
+
+    def valores(self, campo, com_questoes=False):
+        """Valores distintos do campo, em ordem"""
+        if campo not in CAMPOS_INDEXADOS:
+            raise ValueError(f"Campo não indexado: {campo}")
+        where, parametros = self._filtro(com_questoes)
+        return [valor for valor, in self.conn.execute(
+            f"SELECT DISTINCT {campo} FROM provas{where} ORDER BY {campo}", parametros)]
+
+    def estatisticas(self, com_questoes=False):
+        """Total de provas e de questões, média, mínimo e máximo de questões por prova"""
+        where, parametros = self._filtro(com_questoes)
+        total, soma, media, minimo, maximo = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(num_questoes), 0), AVG(num_questoes), MIN(num_questoes), "
+            f"MAX(num_questoes) FROM provas{where}", parametros).fetchone()
+        return {'total': total, 'total_questoes': soma, 'media_questoes': media or 0,
+                'min_questoes': minimo, 'max_questoes': maximo}
+
+    def ultimas(self, quantidade=10):
+        """As `quantidade` últimas provas do dataset (as mais antigas da listagem)"""
+        linhas = self.conn.execute("SELECT dados FROM provas ORDER BY ordem DESC LIMIT ?", (quantidade,))
+        return ColecaoProvas([json.loads(dados) for dados, in linhas][::-1])
+
+    def lotes(self, tamanho_lote=5000):
+        """Todas as provas (dicts, para as exportações), na ordem do dataset, em listas de até `tamanho_lote`"""
+        cursor = self.conn.execute("SELECT dados FROM provas ORDER BY ordem")
+        while True:
+            linhas = cursor.fetchmany(tamanho_lote)
+            if not linhas:
+                break
+            yield [json.loads(dados) for dados, in linhas]
+
+    def todas(self):
+        """Todas as provas como objetos Prova que podem ser alterados e gravados de volta"""
+        return [Prova.de_dict(prova) for lote in self.lotes() for prova in lote]
+
+    def exportar_json(self, arquivo='provas_concursos.json'):
+        exportacao.exportar_json(self, arquivo)
+
+    def exportar_csv(self, arquivo='provas_concursos.csv'):
+        return exportacao.exportar_csv(self, arquivo)
+
+    def exportar_excel(self, arquivo='provas_concursos.xlsx'):
+        return exportacao.exportar_excel(self, arquivo)
+
+    def versao(self):
+        """Número da última versão publicada (0 = nenhuma)"""
+        return self.conn.execute("SELECT COALESCE(MAX(versao), 0) FROM versoes").fetchone()[0]
+
+    def versoes(self):
+        colunas = ('versao', 'data', 'total', 'adicionadas', 'removidas', 'modificadas', 'delta')
+        return [dict(zip(colunas, linha)) for linha in self.conn.execute(
+            f"SELECT {', '.join(colunas)} FROM versoes ORDER BY versao")]
+
+    def publicar_versao(self, diretorio=None):
+        """Fecha uma versão com as mudanças desde a anterior e retorna o número dela
+
+        A primeira versão é a base (sem delta). Se nada mudou desde a última
+        (ou só a data_coleta), nenhuma versão nova é criada. A transação é
+        de escrita desde o início, para nenhuma mudança entrar entre a
+        leitura e a limpeza da tabela `mudancas`.
+        """
+        import versoes
+
+        diretorio = diretorio or versoes.DIRETORIO_VERSOES
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            versao = anterior = self.versao()
+            delta = None
+            if anterior:
+                # Posição de cada prova no dataset (a `ordem` pode ter lacunas); removidas vêm primeiro
+                mudancas = self.conn.execute("""
+                    SELECT m.link, m.antes, p.dados, r.posicao FROM mudancas m
+                    LEFT JOIN provas p ON p.link = m.link
+                    LEFT JOIN (SELECT link, ROW_NUMBER() OVER (ORDER BY ordem) - 1 AS posicao FROM provas) r
+                        ON r.link = m.link
+                    ORDER BY r.posicao""").fetchall()
+                movidas = []
+                if any(antes is not None and depois is not None for _, antes, depois, _ in mudancas):
+                    # Provas regravadas podem ter mudado de lugar entre as que continuam no dataset
+                    movidas = versoes.movidas(self.conn.execute("""
+                        SELECT r.link, r.posicao, COALESCE(m.ordem_antes, r.ordem) FROM
+                            (SELECT link, ordem, ROW_NUMBER() OVER (ORDER BY ordem) - 1 AS posicao FROM provas) r
+                        LEFT JOIN mudancas m ON m.link = r.link
+                        WHERE m.link IS NULL OR m.antes IS NOT NULL
+                        ORDER BY r.posicao"""))
+                delta = versoes.montar_delta(anterior + 1, mudancas, movidas)
+            if delta or not anterior:
+                versao = anterior + 1
+                arquivo_delta = versoes.gravar_delta(delta, diretorio) if delta else None
+                total = self.conn.execute("SELECT COUNT(*) FROM provas").fetchone()[0]
+                self.conn.execute(
+                    "INSERT INTO versoes (versao, data, total, adicionadas, removidas, modificadas, delta) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (versao, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), total,
+                     len(delta['adicionadas']) if delta else 0, len(delta['removidas']) if delta else 0,
+                     len(delta['modificadas']) if delta else 0, arquivo_delta))
+            self.conn.execute("DELETE FROM mudancas")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        versoes.gravar_manifesto(self.versoes(), diretorio)
+        return versao
+
+    def publicar(self, arquivo_json='provas_concursos.json'):
+        """Publica uma versão e regenera o JSON e os snapshots a partir do banco; retorna o número da versão"""
+        versao = self.publicar_versao()
+        self.exportar_json(arquivo_json)
+        self.exportar_binario()
+        self.exportar_snapshot()
+        return versao
+
+    def atualizar(self):
+        """Nada a fazer: as consultas já leem o banco atual (interface comum com os snapshots)"""
+        return 0
+
+    def _consolidar(self):
+        """Passa o WAL para o banco antes de gerar um snapshot
+
+        Senão o checkpoint do fechamento da conexão alteraria o banco depois
+        do snapshot, que pareceria desatualizado (ver snapshot_em_dia).
+        """
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def exportar_snapshot(self, arquivo=None):
+        """Gera o snapshot Parquet; retorna False se o pyarrow não estiver instalado"""
+        import snapshot_colunar
+
+        if not snapshot_colunar.pyarrow_disponivel():
+            return False
+        self._consolidar()
+        snapshot_colunar.salvar_snapshot(self.lotes(), arquivo or snapshot_colunar.ARQUIVO_SNAPSHOT, self.versao())
+        return True
+
+    def exportar_binario(self, arquivo=None):
+        """Gera o snapshot binário lido por mmap pelos bots"""
+        import snapshot_binario
+
+        self._consolidar()
+        return snapshot_binario.salvar_snapshot_binario(self.lotes(), arquivo or snapshot_binario.ARQUIVO_BINARIO,
+                                                        self.versao())
+
+    def dataframe(self):
+        """Todas as provas em um DataFrame com os tipos do snapshot colunar"""
+        from snapshot_colunar import dataframe_colunar
+
+        return dataframe_colunar(self.lotes())
+
+    def fechar(self):
+        self.conn.close()
+
+
+def importar_json(arquivo_json='provas_concursos.json', arquivo_banco=ARQUIVO_BANCO):
+    """Cria/atualiza o banco a partir de um provas_concursos.json existente
+
+    Registros repetidos do mesmo link (datasets anteriores à deduplicação)
+    são mesclados como na coleta incremental.
+    """
+    from scraper import URL_BASE, canonizar_link, mesclar_prova
+
+    with open(arquivo_json, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    indice = {}
+    for prova in dados:
+        prova['link'] = canonizar_link(prova.get('link', ''), URL_BASE)
+        if prova['link'] in indice:
+            mesclar_prova(indice[prova['link']], prova)
+        else:
+            indice[prova['link']] = prova
+    repositorio = RepositorioProvas(arquivo_banco)
+    try:
+        return repositorio.salvar(indice.values())
+    finally:
+        repositorio.fechar()
+
+
+def snapshot_em_dia(arquivo_snapshot, arquivo_banco=ARQUIVO_BANCO):
+    """O snapshot existe e não é mais antigo que o banco (nem que o WAL do banco)
+
+    Um WAL vazio é só o que um leitor cria ao abrir o banco, sem nenhuma escrita.
+    """
+    if not os.path.exists(arquivo_snapshot):
+        return False
+    gerado = os.path.getmtime(arquivo_snapshot)
+    return all(gerado >= os.path.getmtime(caminho)
+               for caminho in (arquivo_banco, arquivo_banco + '-wal')
+               if os.path.exists(caminho) and os.path.getsize(caminho))
+
+
+def abrir_repositorio(arquivo=ARQUIVO_BANCO, arquivo_json='provas_concursos.json',
+                      arquivo_binario='provas_concursos.bin', arquivo_snapshot='provas_concursos.parquet'):
+    """Abre o repositório; na primeira vez, importa o provas_concursos.json existente
+
+    Snapshots em dia com o banco são usados no lugar dele, com a mesma
+    interface de consulta: primeiro o binário (mmap, abertura instantânea e
+    memória compartilhada entre processos), depois o colunar (se o pyarrow
+    estiver instalado). Retorna None se não houver nem banco nem JSON (o
+    scraper ainda não rodou).
+    """
+    if snapshot_em_dia(arquivo_binario, arquivo):
+        from snapshot_binario import SnapshotBinario
+
+        return SnapshotBinario(arquivo_binario)
+    if snapshot_em_dia(arquivo_snapshot, arquivo):
+        import snapshot_colunar
+
+        if snapshot_colunar.pyarrow_disponivel():
+            return snapshot_colunar.SnapshotColunar(arquivo_snapshot)
+    if not os.path.exists(arquivo):
+        if not os.path.exists(arquivo_json):
+            return None
+        print(f"✓ {importar_json(arquivo_json, arquivo)} provas importadas de {arquivo_json} para {arquivo}")
+    return RepositorioProvas(arquivo)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Repositório SQLite das provas")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    importar = subcomandos.add_parser('importar', help="importa um provas_concursos.json para o banco")
+    importar.add_argument('--json', default='provas_concursos.json')
+    importar.add_argument('--banco', default=ARQUIVO_BANCO)
+    exportar = subcomandos.add_parser('exportar', help="publica uma versão e gera JSON, CSV, Excel e os snapshots a partir do banco")
+    exportar.add_argument('--banco', default=ARQUIVO_BANCO)
+    args = parser.parse_args()
+
+    if args.comando == 'importar':
+        print(f"✓ {importar_json(args.json, args.banco)} provas importadas para {args.banco}")
+        return
+
+    repositorio = RepositorioProvas(args.banco)
+    print(f"✓ Versão {repositorio.publicar_versao()} do dataset publicada")
+    repositorio.exportar_json()
+    repositorio.exportar_csv()
+    try:
+        repositorio.exportar_excel()
+    except Exception as e:
+        print(f"⚠ Não foi possível salvar Excel: {e}")
+    repositorio.exportar_binario()
+    if not repositorio.exportar_snapshot():
+        print("⚠ Snapshot Parquet não gerado: instale pyarrow")
+    repositorio.fechar()
+    print("✓ Exportações geradas a partir do banco")
+
+
+if __name__ == "__main__":
+    main()
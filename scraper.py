@@ -5,175 +5,952 @@ Autor: Leonardo
 Data: Fevereiro 2026
 """
 
-import requests
 from bs4 import BeautifulSoup
-import pandas as pd
+from lxml import html as lxml_html
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
 import re
+import asyncio
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+
+from cliente_http import ClienteHTTP, ControleConcorrencia
+from fixtures_http import ClienteGravador, ClienteReproducao
+from metricas import Metricas, LIMITES_CONTAGEM
+from cache_http import CacheHTTP
+from arquivo_html import ArquivoHTML, ler_registro
+from arquivos import gravar_atomico
+from repositorio import ARQUIVO_BANCO, RepositorioProvas
+from modelo import ColecaoProvas, Prova
+import exportacao
+from exportacao import SaidaJSONL
+
+
+# Textos de âncoras que apontam para a prova mas não são o título dela
+TITULOS_AUXILIARES = {'Informações'}
+
+# Padrões compilados uma única vez e reaproveitados em todos os cards
+RE_LINK_PROVA = re.compile(r'/questoes-de-concurso/prova/')
+RE_PDF = re.compile(r'\.pdf$')
+RE_CONCURSO = re.compile(r'Concurso Público:\s*([^P]+)')
+RE_DATA_APLICACAO = re.compile(r'Prova aplicada em:\s*(\d+/\d+)')
+RE_NIVEL = re.compile(r'Nível:\s*([^I]+)')
+RE_QUESTOES = re.compile(r'(\d+)\s+Quest')
+
+# Campos que só a página de detalhe de cada prova traz de forma confiável
+CAMPOS_DETALHE = ('nivel', 'data_aplicacao', 'num_questoes', 'link_prova_pdf', 'link_gabarito_pdf')
+
+URL_BASE = "https://www.aprovaconcursos.com.br/questoes-de-concurso/provas"
+
+XPATH_LINKS_PROVA = '//a[contains(@href, "/questoes-de-concurso/prova/")]'
+XPATH_CARD = 'ancestor::*[self::div or self::article or self::section][1]'
+
+
+def canonizar_link(href, base_url):
+    """Normaliza o link de uma prova (URL absoluta, sem fragmento nem barra final)"""
+    partes = urlsplit(urljoin(base_url, href))
+    caminho = partes.path.rstrip('/') or '/'
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), caminho, partes.query, ''))
+
+
+def _cards_bs4(conteudo):
+    """Percorre os cards com BeautifulSoup (árvore completa, parser original)"""
+    soup = BeautifulSoup(conteudo, 'html.parser')
+    
+    for link in soup.find_all('a', href=RE_LINK_PROVA):
+        href = link.get('href', '')
+        parent = link.find_parent(['div', 'article', 'section'])
+        if 'prova/' not in href or not parent:
+            continue
+        
+        pdfs = [(a.get('href', ''), a.get_text(strip=True))
+                for a in parent.find_all('a', href=RE_PDF)]
+        yield href, link.get_text(strip=True), parent.get_text(separator=' ', strip=True), pdfs
+
+
+def _documento_lxml(conteudo):
+    """Decodifica o HTML (UTF-8, com fallback para cp1252) e monta a árvore lxml"""
+    if isinstance(conteudo, bytes):
+        try:
+            conteudo = conteudo.decode('utf-8')
+        except UnicodeDecodeError:
+            conteudo = conteudo.decode('cp1252', errors='replace')
+    if not conteudo.strip():
+        return None
+    return lxml_html.fromstring(conteudo)
+
+
+def _cards_lxml(conteudo):
+    """Percorre os cards com lxml, consultando só as âncoras de prova via XPath"""
+    doc = _documento_lxml(conteudo)
+    if doc is None:
+        return
+    
+    for link in doc.xpath(XPATH_LINKS_PROVA):
+        href = link.get('href', '')
+        parents = link.xpath(XPATH_CARD)
+        if 'prova/' not in href or not parents:
+            continue
+        
+        parent = parents[0]
+        pdfs = [(a.get('href', ''), ''.join(t.strip() for t in a.itertext()))
+                for a in parent.iter('a') if RE_PDF.search(a.get('href', ''))]
+        texto = ' '.join(t.strip() for t in parent.itertext() if t.strip())
+        yield href, ''.join(t.strip() for t in link.itertext()), texto, pdfs
+
+
+def extrair_provas(conteudo, base_url, parser='lxml'):
+    """Extrai os registros de prova do HTML de uma página da listagem"""
+    cards = _cards_bs4(conteudo) if parser == 'bs4' else _cards_lxml(conteudo)
+    data_coleta = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    provas = []
+    
+    for href, titulo, texto_completo, pdfs in cards:
+        prova_info = Prova(
+            titulo=titulo,
+            link=canonizar_link(href, base_url),
+            banca='',
+            orgao='',
+            cargo='',
+            ano='',
+            nivel='',
+            data_aplicacao='',
+            num_questoes=0,
+            link_prova_pdf='',
+            link_gabarito_pdf='',
+            data_coleta=data_coleta
+        )
+        
+        # Buscar concurso público
+        concurso_match = RE_CONCURSO.search(texto_completo)
+        if concurso_match:
+            prova_info['orgao'] = concurso_match.group(1).strip()
+        
+        # Buscar data de aplicação
+        data_match = RE_DATA_APLICACAO.search(texto_completo)
+        if data_match:
+            prova_info['data_aplicacao'] = data_match.group(1).strip()
+        
+        # Buscar nível
+        nivel_match = RE_NIVEL.search(texto_completo)
+        if nivel_match:
+            prova_info['nivel'] = nivel_match.group(1).strip()
+        
+        # Buscar número de questões
+        questoes_match = RE_QUESTOES.search(texto_completo)
+        if questoes_match:
+            prova_info['num_questoes'] = int(questoes_match.group(1))
+        
+        # Links PDF (absolutos, como os da página de detalhe, nos dois parsers)
+        for pdf_href, pdf_text in pdfs:
+            pdf_text = pdf_text.lower()
+            if 'prova' in pdf_text and not prova_info['link_prova_pdf']:
+                prova_info['link_prova_pdf'] = urljoin(base_url, pdf_href)
+            elif 'gabarito' in pdf_text and not prova_info['link_gabarito_pdf']:
+                prova_info['link_gabarito_pdf'] = urljoin(base_url, pdf_href)
+        
+        # Extrair banca, órgão e cargo do título
+        partes_titulo = titulo.split(' - ')
+        if len(partes_titulo) >= 3:
+            prova_info['banca'] = partes_titulo[0].strip()
+            prova_info['ano'] = partes_titulo[1].strip()
+            if not prova_info['orgao']:
+                prova_info['orgao'] = partes_titulo[2].strip()
+            if len(partes_titulo) > 3:
+                prova_info['cargo'] = ' - '.join(partes_titulo[3:]).strip()
+        
+        provas.append(prova_info)
+    
+    return provas
+
+
+def extrair_detalhes(conteudo, url):
+    """Extrai nível, data de aplicação, número de questões e PDFs da página de detalhe"""
+    doc = _documento_lxml(conteudo)
+    if doc is None:
+        return {}
+    for elemento in doc.xpath('//script|//style'):
+        elemento.drop_tree()
+    
+    texto = ' '.join(t.strip() for t in doc.itertext() if t.strip())
+    detalhes = {}
+    
+    data_match = RE_DATA_APLICACAO.search(texto)
+    if data_match:
+        detalhes['data_aplicacao'] = data_match.group(1).strip()
+    
+    # Na página de detalhe o nível fica num elemento próprio; usar só o texto
+    # desse elemento evita que o [^I]+ avance sobre o resto da página
+    for elemento in doc.xpath('//*[contains(text(), "Nível:")]'):
+        nivel_match = RE_NIVEL.search(' '.join(elemento.text_content().split()))
+        if nivel_match:
+            detalhes['nivel'] = nivel_match.group(1).strip()
+            break
+    
+    questoes_match = RE_QUESTOES.search(texto)
+    if questoes_match:
+        detalhes['num_questoes'] = int(questoes_match.group(1))
+    
+    for a in doc.iter('a'):
+        href = a.get('href', '')
+        if not RE_PDF.search(href):
+            continue
+        # Os PDFs do S3 trazem o tipo no caminho (.../prova/prova/N.pdf, .../prova/gabarito/N.pdf)
+        rotulo = (''.join(a.itertext()) + ' ' + href).lower()
+        if 'gabarito' in rotulo:
+            detalhes.setdefault('link_gabarito_pdf', urljoin(url, href))
+        elif 'prova' in rotulo:
+            detalhes.setdefault('link_prova_pdf', urljoin(url, href))
+    
+    return detalhes
+
+
+def mesclar_prova(existente, nova):
+    """Completa os campos vazios de uma prova já coletada com outra ocorrência do mesmo link"""
+    for campo, valor in nova.items():
+        atual = existente.get(campo)
+        if valor and (not atual or (campo == 'titulo' and atual in TITULOS_AUXILIARES)):
+            existente[campo] = valor
+
+
+def aplicar_detalhes(prova, detalhes, data_detalhe):
+    """Grava na prova os campos encontrados na página de detalhe"""
+    for campo, valor in detalhes.items():
+        if valor:
+            prova[campo] = valor
+    prova['data_detalhe'] = data_detalhe
+
+
+def reprocessar_registro(caminho, entrada, parser='lxml'):
+    """Refaz o parsing de uma página guardada no ArquivoHTML (roda nos processos do pool)"""
+    conteudo = ler_registro(caminho, entrada)
+    if entrada['tipo'] == 'detalhe':
+        return extrair_detalhes(conteudo, entrada['url'])
+    registros = extrair_provas(conteudo, entrada['url'], parser)
+    for registro in registros:
+        registro['data_coleta'] = entrada['data']
+    return registros
+
+
+def precisa_detalhes(prova, idade_maxima_dias=30):
+    """Indica se a prova está incompleta ou com detalhes mais antigos que `idade_maxima_dias`"""
+    data_detalhe = prova.get('data_detalhe')
+    if data_detalhe:
+        coletado = datetime.strptime(data_detalhe, '%Y-%m-%d %H:%M:%S')
+        return datetime.now() - coletado > timedelta(days=idade_maxima_dias)
+    return any(not prova.get(campo) for campo in CAMPOS_DETALHE)
+
+
+class LimitadorTaxa:
+    """Token bucket assíncrono para limitar a taxa de requisições a um host"""
+    
+    def __init__(self, taxa=1.0, capacidade=3):
+        self.taxa = taxa  # tokens repostos por segundo
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def aguardar(self):
+        """Espera até haver um token disponível e o consome"""
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.taxa)
+
 
 class ConcursoScraper:
     """Classe para realizar web scraping de provas de concursos públicos"""
     
-    def __init__(self):
-        self.base_url = "https://www.aprovaconcursos.com.br/questoes-de-concurso/provas"
+    def __init__(self, diretorio_cache=None, cache_ttl=None, parser='lxml', fixtures=None,
+                 gravar_fixtures=None, base_url=URL_BASE, arquivo_html=None):
+        self.base_url = base_url.rstrip('/')  # outro endereço, ex.: servidor_mock.py
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.parser = parser  # 'lxml' (rápido) ou 'bs4' (BeautifulSoup, implementação original)
         self.provas = []
+        self.indice_links = {}  # link canônico -> registro em self.provas
+        # Modo incremental: provas do dataset anterior e marca d'água de parada
+        self.provas_existentes = []
+        self.links_conhecidos = set()
+        self.limite_conhecidos = None
+        self.conhecidos_seguidos = 0
+        self._conhecidos_vistos = set()
+        # Checkpoints periódicos para retomar coletas longas
+        self.arquivo_checkpoint = None
+        self.intervalo_checkpoint = 10
+        self.ultima_pagina = 0
+        self.paginas_com_erro = []  # páginas que falharam mesmo após as retentativas
+        self.fim_da_listagem = False  # a coleta parou numa página sem provas, sem nenhuma falha
+        # Saída em streaming: provas gravadas no JSONL saem de self.provas
+        self.saida = None
+        self.provas_gravadas = 0
+        self.posicao_saida = 0
+        # Métricas por página e por etapa (rede, parsing, mesclagem, exportação)
+        self.metricas = Metricas()
+        self._medicoes_paginas = {}
+        # HTML bruto de cada página baixada, para refazer o parsing sem acessar o site
+        self.arquivo_html = ArquivoHTML(arquivo_html) if arquivo_html else None
+        cache = CacheHTTP(diretorio_cache, ttl=cache_ttl) if diretorio_cache else None
+        # Fixtures: `fixtures` reproduz respostas gravadas (offline), `gravar_fixtures` grava a coleta
+        if fixtures:
+            self.cliente = ClienteReproducao(fixtures, headers=self.headers, metricas=self.metricas)
+        elif gravar_fixtures:
+            self.cliente = ClienteGravador(gravar_fixtures, headers=self.headers, cache=cache,
+                                           metricas=self.metricas)
+        else:
+            self.cliente = ClienteHTTP(headers=self.headers, cache=cache, metricas=self.metricas)
     
     def extrair_numero_questoes(self, text):
         """Extrai o número de questões de uma string"""
         if not text:
             return 0
-        match = re.search(r'(\d+)\s+Quest', text)
+        match = RE_QUESTOES.search(text)
         if match:
             return int(match.group(1))
         return 0
     
-    def scrape_pagina(self, pagina=1):
-        """Faz scraping de uma página específica"""
-        url = f"{self.base_url}/filtro/auto/pagina/{pagina}/quantidade-por-pagina/30"
+    def canonizar_link(self, href):
+        """Normaliza o link de uma prova (URL absoluta, sem fragmento nem barra final)"""
+        return canonizar_link(href, self.base_url)
+    
+    def _mesclar_prova(self, existente, nova):
+        """Completa os campos vazios de uma prova já coletada com outra ocorrência do mesmo link"""
+        mesclar_prova(existente, nova)
+    
+    def carregar_existentes(self, arquivo='provas_concursos.json', limite_conhecidos=10):
+        """Carrega o dataset salvo para uma coleta incremental
         
+        Como a listagem vem das mais novas para as mais antigas, a coleta para
+        depois de `limite_conhecidos` provas já conhecidas em sequência.
+        """
+        self.limite_conhecidos = limite_conhecidos
         try:
-            print(f"Acessando página {pagina}...")
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Procurar por cards de provas
-            provas_encontradas = 0
-            
-            # Buscar links de provas
-            links_prova = soup.find_all('a', href=re.compile(r'/questoes-de-concurso/prova/'))
-            
-            for link in links_prova:
-                href = link.get('href', '')
-                
-                # Evitar duplicatas e links de informações
-                if 'prova/' in href and href not in [p.get('link') for p in self.provas]:
-                    # Buscar informações próximas ao link
-                    parent = link.find_parent(['div', 'article', 'section'])
-                    
-                    if parent:
-                        prova_info = {
-                            'titulo': link.get_text(strip=True),
-                            'link': f"https://www.aprovaconcursos.com.br{href}" if href.startswith('/') else href,
-                            'banca': '',
-                            'orgao': '',
-                            'cargo': '',
-                            'ano': '',
-                            'nivel': '',
-                            'data_aplicacao': '',
-                            'num_questoes': 0,
-                            'link_prova_pdf': '',
-                            'link_gabarito_pdf': '',
-                            'data_coleta': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        # Extrair informações do texto
-                        texto_completo = parent.get_text(separator=' ', strip=True)
-                        
-                        # Buscar concurso público
-                        concurso_match = re.search(r'Concurso Público:\s*([^P]+)', texto_completo)
-                        if concurso_match:
-                            prova_info['orgao'] = concurso_match.group(1).strip()
-                        
-                        # Buscar data de aplicação
-                        data_match = re.search(r'Prova aplicada em:\s*(\d+/\d+)', texto_completo)
-                        if data_match:
-                            prova_info['data_aplicacao'] = data_match.group(1).strip()
-                        
-                        # Buscar nível
-                        nivel_match = re.search(r'Nível:\s*([^I]+)', texto_completo)
-                        if nivel_match:
-                            prova_info['nivel'] = nivel_match.group(1).strip()
-                        
-                        # Buscar número de questões
-                        questoes_match = re.search(r'(\d+)\s+Quest', texto_completo)
-                        if questoes_match:
-                            prova_info['num_questoes'] = int(questoes_match.group(1))
-                        
-                        # Buscar links PDF
-                        links_pdf = parent.find_all('a', href=re.compile(r'\.pdf$'))
-                        for pdf_link in links_pdf:
-                            pdf_href = pdf_link.get('href', '')
-                            pdf_text = pdf_link.get_text(strip=True).lower()
-                            
-                            if 'prova' in pdf_text and not prova_info['link_prova_pdf']:
-                                prova_info['link_prova_pdf'] = pdf_href
-                            elif 'gabarito' in pdf_text and not prova_info['link_gabarito_pdf']:
-                                prova_info['link_gabarito_pdf'] = pdf_href
-                        
-                        # Extrair banca, órgão e cargo do título
-                        partes_titulo = prova_info['titulo'].split(' - ')
-                        if len(partes_titulo) >= 3:
-                            prova_info['banca'] = partes_titulo[0].strip()
-                            prova_info['ano'] = partes_titulo[1].strip()
-                            if not prova_info['orgao']:
-                                prova_info['orgao'] = partes_titulo[2].strip()
-                            if len(partes_titulo) > 3:
-                                prova_info['cargo'] = ' - '.join(partes_titulo[3:]).strip()
-                        
-                        self.provas.append(prova_info)
-                        provas_encontradas += 1
+            if arquivo.endswith('.db'):
+                if not os.path.exists(arquivo):
+                    raise FileNotFoundError(arquivo)
+                repositorio = RepositorioProvas(arquivo)
+                dados = repositorio.todas()
+                repositorio.fechar()
+            else:
+                with open(arquivo, 'r', encoding='utf-8') as f:
+                    dados = [Prova.de_dict(prova) for prova in json.load(f)]
+        except FileNotFoundError:
+            print(f"⚠ Arquivo '{arquivo}' não encontrado, fazendo coleta completa.")
+            return 0
+        
+        indice = {}
+        for prova in dados:
+            prova['link'] = self.canonizar_link(prova.get('link', ''))
+            if prova['link'] in indice:
+                self._mesclar_prova(indice[prova['link']], prova)
+            else:
+                indice[prova['link']] = prova
+                self.provas_existentes.append(prova)
+        
+        self.links_conhecidos = set(indice)
+        print(f"✓ {len(self.provas_existentes)} provas já conhecidas carregadas de {arquivo}")
+        return len(self.provas_existentes)
+    
+    def limite_conhecidos_atingido(self):
+        """Indica se a coleta incremental já alcançou a marca d'água"""
+        return self.limite_conhecidos is not None and self.conhecidos_seguidos >= self.limite_conhecidos
+    
+    def coleta_completa(self):
+        """A coleta percorreu a listagem inteira: quem não apareceu saiu do site
+        
+        Só vale para a coleta completa (não a incremental, que para na marca
+        d'água) que chegou à página vazia do fim sem nenhuma página com erro.
+        """
+        return self.fim_da_listagem and self.limite_conhecidos is None and self.total_provas() > 0
+    
+    def mesclar_existentes(self):
+        """Junta as provas novas (primeiro) com as do dataset anterior"""
+        novas = self.total_provas()
+        for prova in self.provas_existentes:
+            if prova['link'] not in self.indice_links:
+                self.indice_links[prova['link']] = prova
+                self.provas.append(prova)
+        self.provas_existentes = []
+        if self.saida is not None:
+            self._descarregar_saida()
+        print(f"✓ {novas} provas novas mescladas ao dataset ({self.total_provas()} no total)")
+    
+    def configurar_saida_jsonl(self, arquivo='provas_concursos.jsonl'):
+        """Ativa a saída em streaming: as provas de cada página vão direto para o JSONL
+        
+        Ao retomar uma coleta, retomar_checkpoint() reabre o JSONL registrado no
+        checkpoint, descartando o que foi gravado depois dele.
+        """
+        self.saida = SaidaJSONL(arquivo, posicao=self.posicao_saida)
+    
+    def _descarregar_saida(self):
+        """Grava as provas pendentes no JSONL e as libera da memória"""
+        self.saida.escrever(self.provas)
+        for prova in self.provas:
+            # O link continua no índice para evitar duplicatas em páginas seguintes
+            self.indice_links[prova['link']] = None
+        self.provas_gravadas += len(self.provas)
+        self.provas = []
+    
+    def total_provas(self):
+        """Total de provas coletadas, incluindo as já gravadas no JSONL"""
+        return self.provas_gravadas + len(self.provas)
+    
+    def configurar_checkpoint(self, arquivo='checkpoint_scraper.json', intervalo=10):
+        """Ativa a gravação de checkpoints a cada `intervalo` páginas processadas"""
+        self.arquivo_checkpoint = arquivo
+        self.intervalo_checkpoint = intervalo
+    
+    def salvar_checkpoint(self):
+        """Grava atomicamente o cursor de páginas, o índice de links e as provas coletadas"""
+        if not self.arquivo_checkpoint:
+            return
+        estado = {
+            'pagina': self.ultima_pagina,
+            'links': list(self.indice_links),
+            'provas': self.provas,
+            'conhecidos_seguidos': self.conhecidos_seguidos,
+            'conhecidos_vistos': list(self._conhecidos_vistos),
+            'provas_gravadas': self.provas_gravadas,
+            'posicao_saida': self.saida.sincronizar() if self.saida else 0,
+            'arquivo_saida': self.saida.arquivo if self.saida else None,
+            'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        gravar_atomico(self.arquivo_checkpoint, json.dumps(estado, ensure_ascii=False, default=dict))
+    
+    def retomar_checkpoint(self):
+        """Restaura o estado do último checkpoint e retorna a próxima página a coletar"""
+        try:
+            with open(self.arquivo_checkpoint, 'r', encoding='utf-8') as f:
+                estado = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠ Checkpoint '{self.arquivo_checkpoint}' não encontrado, começando da página 1.")
+            return 1
+        
+        self.provas = [Prova.de_dict(prova) for prova in estado['provas']]
+        self.indice_links = dict.fromkeys(estado['links'])
+        self.indice_links.update((p['link'], p) for p in self.provas)
+        self.conhecidos_seguidos = estado['conhecidos_seguidos']
+        self._conhecidos_vistos = set(estado['conhecidos_vistos'])
+        self.ultima_pagina = estado['pagina']
+        self.provas_gravadas = estado.get('provas_gravadas', 0)
+        self.posicao_saida = estado.get('posicao_saida', 0)
+        # As provas já descarregadas só existem no JSONL: a coleta continua nele
+        if estado.get('arquivo_saida'):
+            self.configurar_saida_jsonl(estado['arquivo_saida'])
+        
+        print(f"✓ Retomando do checkpoint de {estado['data']}: página {self.ultima_pagina}, "
+              f"{self.total_provas()} provas" + (f" (JSONL: {self.saida.arquivo})" if self.saida else ""))
+        return self.ultima_pagina + 1
+    
+    def configurar_concorrencia_adaptativa(self, minimo=1, maximo=16):
+        """Deixa o ClienteHTTP ajustar sozinho o número de requisições simultâneas (AIMD)"""
+        self.cliente.controle = ControleConcorrencia(minimo=minimo, maximo=maximo)
+    
+    def _trabalhadores(self, concorrencia):
+        """Número de tarefas de download; com controle adaptativo, quem limita é o cliente"""
+        controle = self.cliente.controle
+        trabalhadores = max(1, concorrencia, controle.maximo if controle else 0)
+        # asyncio.to_thread usa o executor padrão, que tem poucas threads em máquinas pequenas
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=trabalhadores))
+        return trabalhadores
+    
+    def _url_pagina(self, pagina):
+        """Monta a URL de uma página da listagem"""
+        return f"{self.base_url}/filtro/auto/pagina/{pagina}/quantidade-por-pagina/30"
+    
+    def _baixar_pagina(self, pagina):
+        """Baixa o HTML de uma página da listagem"""
+        print(f"Acessando página {pagina}...")
+        response = self.cliente.get(self._url_pagina(pagina))
+        self._medicoes_paginas[pagina] = dict(response.fases, bytes=len(response.content),
+                                              status=response.status_code, tentativas=response.tentativas,
+                                              origem=response.origem, tempo_http=response.tempo)
+        response.raise_for_status()
+        if self.arquivo_html:
+            self.arquivo_html.gravar(response.url, response.content, 'listagem', pagina)
+        return response.content
+    
+    def _processar_pagina(self, conteudo, pagina):
+        """Extrai as provas do HTML de uma página e retorna quantas ela trouxe (novas ou já conhecidas)"""
+        inicio = time.perf_counter()
+        registros = extrair_provas(conteudo, self.base_url, self.parser)
+        return self._registrar_provas(registros, pagina, time.perf_counter() - inicio)
+    
+    def _registrar_provas(self, registros, pagina, tempo_parsing=None):
+        """Mescla as provas extraídas de uma página e retorna quantas ela trouxe
+        
+        Conta as novas e as já conhecidas do dataset anterior: uma página só de
+        provas conhecidas não é uma página vazia, e quem decide a parada nesse
+        caso é `limite_conhecidos_atingido()`.
+        """
+        inicio = time.perf_counter()
+        provas_encontradas = 0
+        duplicadas = 0
+        conhecidas = 0
+        
+        for prova_info in registros:
+            link = prova_info['link']
+            if link in self.links_conhecidos:
+                # Já está no dataset anterior; conta uma vez por link para a marca d'água
+                conhecidas += 1
+                if link not in self._conhecidos_vistos:
+                    self._conhecidos_vistos.add(link)
+                    self.conhecidos_seguidos += 1
+                continue
+            self.conhecidos_seguidos = 0
             
-            print(f"  ✓ {provas_encontradas} provas encontradas na página {pagina}")
-            return provas_encontradas > 0
+            # Links repetidos (ex.: âncora "Informações" com os PDFs) completam o registro existente;
+            # se o registro já foi gravado no JSONL (valor None), a repetição é descartada
+            if link in self.indice_links:
+                duplicadas += 1
+                existente = self.indice_links[link]
+                if existente is not None:
+                    self._mesclar_prova(existente, prova_info)
+            else:
+                self.indice_links[link] = prova_info
+                self.provas.append(prova_info)
+                provas_encontradas += 1
+        
+        print(f"  ✓ {provas_encontradas} provas encontradas na página {pagina}")
+        
+        if self.saida is not None:
+            self._descarregar_saida()
+        
+        self._registrar_metricas_pagina(pagina, tempo_parsing, time.perf_counter() - inicio,
+                                        len(registros), provas_encontradas, duplicadas, conhecidas)
+        
+        # As páginas chegam aqui sempre em ordem, então a última processada é o cursor
+        self.ultima_pagina = pagina
+        if self.arquivo_checkpoint and pagina % self.intervalo_checkpoint == 0:
+            self.salvar_checkpoint()
+        
+        return provas_encontradas + conhecidas
+    
+    def _registrar_metricas_pagina(self, pagina, tempo_parsing, tempo_mesclagem, extraidos,
+                                   novas, duplicadas, conhecidas):
+        """Junta as medições de rede e de processamento da página"""
+        dados = self._medicoes_paginas.pop(pagina, {})
+        dados.update(tempo_parsing=tempo_parsing, tempo_mesclagem=tempo_mesclagem, registros=extraidos,
+                     novas=novas, duplicadas=duplicadas, conhecidas=conhecidas)
+        self.metricas.registrar_pagina(pagina, dados)
+        
+        if tempo_parsing is not None:
+            self.metricas.observar('parsing_segundos', tempo_parsing, parser=self.parser)
+        self.metricas.observar('mesclagem_segundos', tempo_mesclagem)
+        self.metricas.observar('registros_por_pagina', extraidos, limites=LIMITES_CONTAGEM)
+        self.metricas.contar('paginas')
+        self.metricas.contar('registros_extraidos', extraidos)
+        self.metricas.contar('provas_novas', novas)
+        self.metricas.contar('duplicadas_mescladas', duplicadas)
+        self.metricas.contar('provas_ja_conhecidas', conhecidas)
+    
+    def scrape_pagina(self, pagina=1):
+        """Faz scraping de uma página específica"""
+        try:
+            conteudo = self._baixar_pagina(pagina)
+            return self._processar_pagina(conteudo, pagina) > 0
             
         except Exception as e:
             print(f"  ✗ Erro ao acessar página {pagina}: {str(e)}")
+            self.paginas_com_erro.append(pagina)
             return False
     
-    def scrape_multiplas_paginas(self, num_paginas=3):
-        """Faz scraping de múltiplas páginas"""
+    def scrape_multiplas_paginas(self, num_paginas=3, assincrono=False, concorrencia=4,
+                                 taxa_por_host=1.0, rajada=3, pagina_inicial=1, processos=0):
+        """Faz scraping de múltiplas páginas
+        
+        No modo assíncrono as páginas são baixadas em paralelo (no máximo
+        `concorrencia` ao mesmo tempo), respeitando um token bucket por host
+        com `taxa_por_host` requisições/s e `rajada` requisições acumuladas.
+        Com `processos` > 0 (implica modo assíncrono), o parsing sai do laço de
+        I/O e roda em um pool de processos. Com concorrência adaptativa
+        configurada (implica modo assíncrono), o cliente HTTP decide quantas
+        páginas baixar ao mesmo tempo e `taxa_por_host` pode ser None.
+        `pagina_inicial` permite continuar uma coleta a partir de um checkpoint.
+        """
         print(f"\n{'='*60}")
         print(f"Iniciando scraping de {num_paginas} página(s)...")
         print(f"{'='*60}\n")
         
-        for pagina in range(1, num_paginas + 1):
-            sucesso = self.scrape_pagina(pagina)
-            if not sucesso:
-                print(f"Parando na página {pagina}")
-                break
-            
-            # Delay para não sobrecarregar o servidor
-            if pagina < num_paginas:
-                time.sleep(2)
+        with self.metricas.medir('coleta'):
+            if processos:
+                with ProcessPoolExecutor(max_workers=processos) as pool:
+                    asyncio.run(self._scrape_assincrono(num_paginas, concorrencia, taxa_por_host, rajada,
+                                                        pagina_inicial, pool=pool, processos=processos))
+            elif assincrono or self.cliente.controle:
+                asyncio.run(self._scrape_assincrono(num_paginas, concorrencia, taxa_por_host, rajada,
+                                                    pagina_inicial))
+            else:
+                for pagina in range(pagina_inicial, num_paginas + 1):
+                    sucesso = self.scrape_pagina(pagina)
+                    if not sucesso:
+                        self.fim_da_listagem = not self.paginas_com_erro
+                        print(f"Parando na página {pagina}")
+                        break
+                    if self.limite_conhecidos_atingido():
+                        print(f"Parando na página {pagina}: {self.conhecidos_seguidos} provas já conhecidas em sequência")
+                        break
+                    
+                    # Delay para não sobrecarregar o servidor
+                    if pagina < num_paginas:
+                        time.sleep(2)
+        
+        self.salvar_checkpoint()
         
         print(f"\n{'='*60}")
-        print(f"Total de provas coletadas: {len(self.provas)}")
+        print(f"Total de provas coletadas: {self.total_provas()}")
+        tempos = self.cliente.resumo_tempos()
+        if tempos:
+            print(f"Requisições: {tempos['requisicoes']} ({tempos['retentativas']} retentativas) | "
+                  f"tempo médio {tempos['media']:.2f}s, p95 {tempos['p95']:.2f}s, máx {tempos['max']:.2f}s")
+            if self.cliente.cache:
+                print(f"Cache: {tempos['do_cache']} dentro do TTL, {tempos['revalidadas']} revalidadas (304)")
+        if self.cliente.controle:
+            controle = self.cliente.controle.resumo()
+            print(f"Concorrência adaptativa: limite final {controle['limite']} "
+                  f"(pico {controle['pico']}, {controle['reducoes']} reduções)")
         print(f"{'='*60}\n")
     
+    async def _scrape_assincrono(self, num_paginas, concorrencia, taxa_por_host, rajada,
+                                 pagina_inicial=1, pool=None, processos=0):
+        """Baixa páginas concorrentemente e processa os resultados na ordem das páginas
+        
+        Com `pool`, os trabalhadores de I/O só colocam o HTML numa fila limitada;
+        o parsing roda nos processos do pool e este laço, único escritor, mescla
+        e deduplica os registros na ordem das páginas.
+        """
+        limitadores = {}
+        paginas = iter(range(pagina_inicial, num_paginas + 1))
+        pendentes = {}  # página -> conteúdo baixado, (registros, tempo de parsing) ou exceção
+        estado = {'proxima': pagina_inicial, 'parada': None}
+        fila = asyncio.Queue(maxsize=2 * max(1, processos)) if pool else None
+        
+        def mesclar_em_ordem():
+            # Só processa a página N depois que 1..N-1 já foram processadas
+            while estado['parada'] is None and estado['proxima'] in pendentes:
+                pagina = estado['proxima']
+                resultado = pendentes.pop(pagina)
+                estado['proxima'] += 1
+                
+                if isinstance(resultado, Exception):
+                    print(f"  ✗ Erro ao acessar página {pagina}: {str(resultado)}")
+                    self.paginas_com_erro.append(pagina)
+                    encontradas = 0
+                elif isinstance(resultado, tuple):
+                    registros, tempo_parsing = resultado
+                    encontradas = self._registrar_provas(registros, pagina, tempo_parsing)
+                else:
+                    encontradas = self._processar_pagina(resultado, pagina)
+                
+                if not encontradas:
+                    estado['parada'] = pagina
+                    self.fim_da_listagem = not self.paginas_com_erro
+                    print(f"Parando na página {pagina}")
+                elif self.limite_conhecidos_atingido():
+                    estado['parada'] = pagina
+                    print(f"Parando na página {pagina}: {self.conhecidos_seguidos} provas já conhecidas em sequência")
+        
+        async def trabalhador():
+            for pagina in paginas:
+                # Páginas além da primeira vazia confirmada não são mais buscadas
+                if estado['parada'] is not None and pagina > estado['parada']:
+                    break
+                
+                if taxa_por_host:
+                    host = urlparse(self._url_pagina(pagina)).netloc
+                    if host not in limitadores:
+                        limitadores[host] = LimitadorTaxa(taxa_por_host, rajada)
+                    await limitadores[host].aguardar()
+                    if estado['parada'] is not None and pagina > estado['parada']:
+                        break
+                
+                try:
+                    resultado = await asyncio.to_thread(self._baixar_pagina, pagina)
+                except Exception as e:
+                    resultado = e
+                
+                if fila is not None and not isinstance(resultado, Exception):
+                    await fila.put((pagina, resultado))
+                else:
+                    pendentes[pagina] = resultado
+                    mesclar_em_ordem()
+        
+        async def extrator():
+            loop = asyncio.get_running_loop()
+            while True:
+                item = await fila.get()
+                if item is None:
+                    break
+                pagina, conteudo = item
+                if estado['parada'] is not None and pagina > estado['parada']:
+                    continue
+                try:
+                    # Inclui a espera por um processo livre do pool
+                    inicio = time.perf_counter()
+                    registros = await loop.run_in_executor(
+                        pool, extrair_provas, conteudo, self.base_url, self.parser)
+                    pendentes[pagina] = (registros, time.perf_counter() - inicio)
+                except Exception as e:
+                    pendentes[pagina] = e
+                mesclar_em_ordem()
+        
+        trabalhadores = self._trabalhadores(concorrencia)
+        if pool is None:
+            await asyncio.gather(*(trabalhador() for _ in range(trabalhadores)))
+            return
+        
+        extratores = [asyncio.create_task(extrator()) for _ in range(processos)]
+        await asyncio.gather(*(trabalhador() for _ in range(trabalhadores)))
+        for _ in extratores:
+            await fila.put(None)
+        await asyncio.gather(*extratores)
+    
+    def enriquecer_detalhes(self, concorrencia=8, taxa_por_host=2.0, rajada=4,
+                            idade_maxima_dias=30, tamanho_lote=500, ao_salvar_lote=None, limite=None):
+        """Visita a página de detalhe das provas incompletas ou desatualizadas
+        
+        As páginas são baixadas em paralelo com o mesmo limite de taxa por host
+        da coleta assíncrona. A cada `tamanho_lote` provas enriquecidas,
+        `ao_salvar_lote(lote)` recebe as provas do lote para gravar o progresso.
+        Provas nunca enriquecidas vêm antes das desatualizadas; `limite`
+        restringe quantas são visitadas nesta chamada. Retorna quantas
+        provas foram enriquecidas.
+        """
+        pendentes = [p for p in self.provas if precisa_detalhes(p, idade_maxima_dias)]
+        pendentes.sort(key=lambda p: bool(p.get('data_detalhe')))
+        if limite is not None:
+            pendentes = pendentes[:limite]
+        
+        print(f"\n{'='*60}")
+        print(f"Enriquecendo {len(pendentes)} de {len(self.provas)} provas com a página de detalhe...")
+        print(f"{'='*60}\n")
+        
+        if not pendentes:
+            return 0
+        with self.metricas.medir('enriquecimento'):
+            return asyncio.run(self._enriquecer_assincrono(pendentes, concorrencia, taxa_por_host, rajada,
+                                                           tamanho_lote, ao_salvar_lote))
+    
+    async def _enriquecer_assincrono(self, pendentes, concorrencia, taxa_por_host, rajada,
+                                     tamanho_lote, ao_salvar_lote):
+        """Baixa as páginas de detalhe concorrentemente e aplica os campos encontrados"""
+        limitadores = {}
+        provas = iter(pendentes)
+        contagem = {'feitas': 0, 'erros': 0}
+        lote = []
+        
+        def concluir_lote():
+            print(f"  ✓ {contagem['feitas']}/{len(pendentes)} provas enriquecidas ({contagem['erros']} erros)")
+            if ao_salvar_lote:
+                ao_salvar_lote(lote[:])
+            lote.clear()
+        
+        async def trabalhador():
+            for prova in provas:
+                if taxa_por_host:
+                    host = urlparse(prova['link']).netloc
+                    if host not in limitadores:
+                        limitadores[host] = LimitadorTaxa(taxa_por_host, rajada)
+                    await limitadores[host].aguardar()
+                
+                try:
+                    response = await asyncio.to_thread(self.cliente.get, prova['link'])
+                    response.raise_for_status()
+                    if self.arquivo_html:
+                        self.arquivo_html.gravar(prova['link'], response.content, 'detalhe')
+                    inicio = time.perf_counter()
+                    detalhes = extrair_detalhes(response.content, prova['link'])
+                    self.metricas.observar('parsing_detalhe_segundos', time.perf_counter() - inicio)
+                except Exception as e:
+                    self.metricas.contar('detalhes_com_erro')
+                    contagem['erros'] += 1
+                    print(f"  ✗ Erro ao acessar {prova['link']}: {str(e)}")
+                    continue
+                
+                aplicar_detalhes(prova, detalhes, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                
+                contagem['feitas'] += 1
+                lote.append(prova)
+                if len(lote) >= tamanho_lote:
+                    concluir_lote()
+        
+        await asyncio.gather(*(trabalhador() for _ in range(self._trabalhadores(concorrencia))))
+        if lote or not contagem['feitas']:
+            concluir_lote()
+        return contagem['feitas']
+
+    def reprocessar_arquivo(self, processos=None):
+        """Refaz o dataset a partir do HTML guardado no ArquivoHTML, sem acessar o site
+
+        O parsing de todas as versões das páginas da listagem e da última
+        versão de cada página de detalhe roda em `processos` processos (padrão:
+        todos os núcleos). Os resultados voltam na ordem do arquivo e são
+        mesclados aqui, como na coleta, com as datas da coleta original.
+        """
+        arquivo = self.arquivo_html
+        listagens = arquivo.listagens()
+        detalhes = arquivo.detalhes()
+        processos = processos or os.cpu_count() or 1
+
+        print(f"\n{'='*60}")
+        print(f"Reprocessando {len(listagens)} páginas da listagem e {len(detalhes)} páginas de detalhe "
+              f"em {processos} processo(s)...")
+        print(f"{'='*60}\n")
+
+        with self.metricas.medir('reprocessamento'), ProcessPoolExecutor(max_workers=processos) as pool:
+            # Blocos grandes amortizam a troca de mensagens; 4 por processo equilibram a carga
+            bloco = max(1, len(listagens) // (4 * processos))
+            resultados = pool.map(reprocessar_registro, repeat(arquivo.caminho_dados), listagens,
+                                  repeat(self.parser), chunksize=bloco)
+            for entrada, registros in zip(listagens, resultados):
+                self._registrar_provas(registros, entrada['pagina'])
+
+            bloco = max(1, len(detalhes) // (4 * processos))
+            resultados = pool.map(reprocessar_registro, repeat(arquivo.caminho_dados), detalhes,
+                                  chunksize=bloco)
+            aplicados = 0
+            for entrada, campos in zip(detalhes, resultados):
+                prova = self.indice_links.get(self.canonizar_link(entrada['url']))
+                if prova is not None:
+                    aplicar_detalhes(prova, campos, entrada['data'])
+                    aplicados += 1
+
+        print(f"\n✓ {self.total_provas()} provas reconstruídas, {aplicados} com página de detalhe")
+
+    def salvar_banco(self, arquivo=ARQUIVO_BANCO, lote=None, remover_ausentes=False):
+        """Grava as provas no repositório SQLite (upsert pelo link canônico)
+        
+        Com `lote`, grava só essas provas, sem mudar a ordem do dataset
+        (progresso do enriquecimento; a gravação completa vem no fim). Com
+        `remover_ausentes`, as provas do banco que não vieram nesta coleta
+        são removidas (ver coleta_completa).
+        """
+        with self.metricas.medir('gravacao_banco'):
+            repositorio = RepositorioProvas(arquivo)
+            try:
+                if lote is not None:
+                    total = repositorio.regravar(lote)
+                elif self.saida is not None:
+                    self.saida.sincronizar()
+                    total = repositorio.salvar((p for lote in exportacao.ler_lotes(self.saida.arquivo) for p in lote),
+                                               remover_ausentes=remover_ausentes)
+                else:
+                    total = repositorio.salvar(self.provas, remover_ausentes=remover_ausentes)
+            finally:
+                repositorio.fechar()
+        print(f"✓ {total} provas gravadas em {arquivo}")
+
+    def exportar_do_banco(self, arquivo=ARQUIVO_BANCO):
+        """Publica uma versão (com o delta desde a anterior) e gera provas_concursos.json/.csv/.xlsx/.bin/.parquet
+        a partir do repositório SQLite"""
+        repositorio = RepositorioProvas(arquivo)
+        try:
+            with self.metricas.medir('versionamento'):
+                versao = repositorio.publicar_versao()
+            print(f"✓ Versão {versao} do dataset publicada em versoes/")
+            with self.metricas.medir('exportacao_json'):
+                repositorio.exportar_json()
+            print("✓ Dados salvos em provas_concursos.json")
+            with self.metricas.medir('exportacao_csv'):
+                if repositorio.exportar_csv():
+                    print("✓ Dados salvos em provas_concursos.csv")
+            try:
+                with self.metricas.medir('exportacao_excel'):
+                    if repositorio.exportar_excel():
+                        print("✓ Dados salvos em provas_concursos.xlsx")
+            except Exception as e:
+                print(f"⚠ Não foi possível salvar Excel: {e}")
+                print("  Instale openpyxl: pip install openpyxl")
+            with self.metricas.medir('exportacao_binario'):
+                repositorio.exportar_binario()
+            print("✓ Snapshot binário salvo em provas_concursos.bin")
+            with self.metricas.medir('exportacao_snapshot'):
+                if repositorio.exportar_snapshot():
+                    print("✓ Snapshot colunar salvo em provas_concursos.parquet")
+                else:
+                    print("⚠ Snapshot colunar não gerado: instale pyarrow")
+        finally:
+            repositorio.fechar()
+
     def salvar_json(self, arquivo='provas_concursos.json'):
         """Salva os dados em formato JSON"""
-        with open(arquivo, 'w', encoding='utf-8') as f:
-            json.dump(self.provas, f, ensure_ascii=False, indent=2)
+        with self.metricas.medir('exportacao_json'):
+            if self.saida is not None:
+                self.saida.sincronizar()
+                exportacao.exportar_json(self.saida.arquivo, arquivo)
+            else:
+                gravar_atomico(arquivo, json.dumps(self.provas, ensure_ascii=False, indent=2, default=dict))
         print(f"✓ Dados salvos em {arquivo}")
     
     def salvar_csv(self, arquivo='provas_concursos.csv'):
         """Salva os dados em formato CSV"""
-        if self.provas:
-            df = pd.DataFrame(self.provas)
-            df.to_csv(arquivo, index=False, encoding='utf-8-sig')
-            print(f"✓ Dados salvos em {arquivo}")
+        with self.metricas.medir('exportacao_csv'):
+            if self.saida is not None:
+                self.saida.sincronizar()
+                if exportacao.exportar_csv(self.saida.arquivo, arquivo):
+                    print(f"✓ Dados salvos em {arquivo}")
+            elif self.provas:
+                df = ColecaoProvas(self.provas).dataframe()
+                df.to_csv(arquivo, index=False, encoding='utf-8-sig')
+                print(f"✓ Dados salvos em {arquivo}")
     
     def salvar_excel(self, arquivo='provas_concursos.xlsx'):
         """Salva os dados em formato Excel"""
-        if self.provas:
-            df = pd.DataFrame(self.provas)
-            df.to_excel(arquivo, index=False, engine='openpyxl')
-            print(f"✓ Dados salvos em {arquivo}")
+        with self.metricas.medir('exportacao_excel'):
+            if self.saida is not None:
+                self.saida.sincronizar()
+                if exportacao.exportar_excel(self.saida.arquivo, arquivo):
+                    print(f"✓ Dados salvos em {arquivo}")
+            elif self.provas:
+                df = ColecaoProvas(self.provas).dataframe()
+                df.to_excel(arquivo, index=False, engine='openpyxl')
+                print(f"✓ Dados salvos em {arquivo}")
+    
+    def _exibir_estatisticas_streaming(self):
+        """Estatísticas calculadas lendo o JSONL em lotes"""
+        self.saida.sincronizar()
+        total, total_questoes, contagens = exportacao.contar_campos(self.saida.arquivo)
+        
+        print(f"\n{'='*60}")
+        print("ESTATÍSTICAS DOS DADOS COLETADOS")
+        print(f"{'='*60}\n")
+        
+        print(f"Total de provas: {total}")
+        for titulo, campo, limite in [("Bancas mais frequentes", 'banca', 10),
+                                      ("Órgãos mais frequentes", 'orgao', 10),
+                                      ("Níveis de escolaridade", 'nivel', None)]:
+            print(f"\n{titulo}:")
+            for valor, quantidade in contagens[campo].most_common(limite):
+                print(f"  {valor or '(vazio)'}: {quantidade}")
+        
+        print(f"\nTotal de questões disponíveis: {total_questoes}")
+        print(f"Média de questões por prova: {total_questoes / total:.1f}")
+        
+        print(f"\n{'='*60}\n")
     
     def exibir_estatisticas(self):
         """Exibe estatísticas dos dados coletados"""
-        if not self.provas:
+        if not self.total_provas():
             print("Nenhuma prova coletada ainda.")
             return
         
-        df = pd.DataFrame(self.provas)
+        if self.saida is not None:
+            self._exibir_estatisticas_streaming()
+            return
+        
+        df = ColecaoProvas(self.provas).dataframe()
         
         print(f"\n{'='*60}")
         print("ESTATÍSTICAS DOS DADOS COLETADOS")
@@ -198,24 +975,154 @@ class ConcursoScraper:
 
 def main():
     """Função principal"""
-    scraper = ConcursoScraper()
+    parser = argparse.ArgumentParser(description="Scraper de provas de concursos públicos")
+    parser.add_argument('--paginas', type=int, default=3,
+                        help="número de páginas da listagem (padrão: 3, ~90 provas)")
+    parser.add_argument('--assincrono', action='store_true',
+                        help="baixa as páginas em paralelo com limite de taxa por host")
+    parser.add_argument('--concorrencia', type=int, default=4,
+                        help="downloads simultâneos no modo assíncrono")
+    parser.add_argument('--taxa', type=float, default=None,
+                        help="requisições por segundo por host no modo assíncrono "
+                             "(padrão: 1.0; sem limite fixo com --adaptativo)")
+    parser.add_argument('--adaptativo', action='store_true',
+                        help="ajusta a concorrência sozinho (AIMD) conforme 429/503 e latência (implica --assincrono)")
+    parser.add_argument('--concorrencia-min', type=int, default=1, metavar='N',
+                        help="limite inferior da concorrência adaptativa")
+    parser.add_argument('--concorrencia-max', type=int, default=16, metavar='N',
+                        help="limite superior da concorrência adaptativa")
+    parser.add_argument('--processos', type=int, default=0, metavar='N',
+                        help="faz o parsing em N processos separados do download (implica --assincrono)")
+    parser.add_argument('--cache', default='.cache_http', metavar='DIR',
+                        help="diretório do cache HTTP (padrão: .cache_http)")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="não usa o cache HTTP")
+    parser.add_argument('--cache-ttl', type=float, default=None, metavar='SEGUNDOS',
+                        help="reaproveita páginas em cache sem revalidar por esse tempo")
+    parser.add_argument('--parser', choices=['lxml', 'bs4'], default='lxml',
+                        help="lxml (rápido, padrão) ou bs4 (BeautifulSoup, fallback)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="coleta só as provas novas e mescla ao provas_concursos.json existente")
+    parser.add_argument('--limite-conhecidos', type=int, default=10, metavar='N',
+                        help="no modo incremental, para após N provas já conhecidas em sequência")
+    parser.add_argument('--checkpoint', default='checkpoint_scraper.json', metavar='ARQUIVO',
+                        help="arquivo de checkpoint da coleta (padrão: checkpoint_scraper.json)")
+    parser.add_argument('--intervalo-checkpoint', type=int, default=10, metavar='N',
+                        help="grava o checkpoint a cada N páginas")
+    parser.add_argument('--resume', action='store_true',
+                        help="continua a coleta a partir do último checkpoint")
+    parser.add_argument('--jsonl', metavar='ARQUIVO',
+                        help="grava cada página em ARQUIVO (JSONL) sem acumular em memória; "
+                             "JSON/CSV/XLSX são gerados a partir dele")
+    parser.add_argument('--enriquecer', action='store_true',
+                        help="após a coleta, visita a página de detalhe das provas incompletas")
+    parser.add_argument('--apenas-enriquecer', action='store_true',
+                        help="não coleta a listagem; só enriquece o provas_concursos.json existente")
+    parser.add_argument('--concorrencia-detalhes', type=int, default=8, metavar='N',
+                        help="páginas de detalhe baixadas ao mesmo tempo")
+    parser.add_argument('--idade-maxima-dias', type=int, default=30, metavar='DIAS',
+                        help="revisita detalhes coletados há mais de DIAS dias")
+    parser.add_argument('--gravar-fixtures', metavar='ARQUIVO',
+                        help="grava as respostas HTTP da coleta em ARQUIVO (.zip) para reprodução offline")
+    parser.add_argument('--fixtures', metavar='ARQUIVO',
+                        help="reproduz as respostas gravadas em ARQUIVO em vez de acessar o site")
+    parser.add_argument('--metricas-prometheus', metavar='ARQUIVO',
+                        help="grava as métricas da execução em ARQUIVO no formato texto do Prometheus")
+    parser.add_argument('--metricas-json', metavar='ARQUIVO',
+                        help="grava o resumo da execução (métricas por etapa e por página) em ARQUIVO")
+    parser.add_argument('--base-url', default=URL_BASE, metavar='URL',
+                        help="endereço da listagem de provas (ex.: http://127.0.0.1:8000/questoes-de-concurso/provas)")
+    parser.add_argument('--banco', default=ARQUIVO_BANCO, metavar='ARQUIVO',
+                        help="repositório SQLite das provas (padrão: provas_concursos.db); "
+                             "JSON, CSV e Excel são exportados dele")
+    parser.add_argument('--arquivo-html', metavar='DIR',
+                        help="guarda o HTML bruto de cada página baixada em DIR (comprimido, só acréscimo)")
+    parser.add_argument('--reprocessar', action='store_true',
+                        help="refaz o dataset a partir do HTML guardado em --arquivo-html, sem acessar o site "
+                             "(parsing em --processos processos; padrão: todos os núcleos)")
+    args = parser.parse_args()
+    
+    if (args.enriquecer or args.apenas_enriquecer) and args.jsonl:
+        parser.error("--enriquecer não pode ser usado com --jsonl")
+    if args.gravar_fixtures and args.fixtures:
+        parser.error("--gravar-fixtures não pode ser usado com --fixtures")
+    if args.reprocessar and not args.arquivo_html:
+        parser.error("--reprocessar precisa de --arquivo-html")
+    if args.reprocessar and (args.incremental or args.enriquecer or args.apenas_enriquecer):
+        parser.error("--reprocessar não pode ser usado com --incremental nem --enriquecer")
     
-    # Fazer scraping de 3 páginas (90 provas aproximadamente)
-    scraper.scrape_multiplas_paginas(num_paginas=3)
+    scraper = ConcursoScraper(diretorio_cache=None if args.sem_cache else args.cache,
+                              cache_ttl=args.cache_ttl, parser=args.parser,
+                              fixtures=args.fixtures, gravar_fixtures=args.gravar_fixtures,
+                              base_url=args.base_url, arquivo_html=args.arquivo_html)
+    
+    # O reprocessamento não é uma coleta: não mexe no checkpoint
+    if not args.reprocessar:
+        scraper.configurar_checkpoint(args.checkpoint, args.intervalo_checkpoint)
+    
+    # Com --adaptativo a taxa é descoberta pelo controle AIMD; --taxa ainda pode impor um teto
+    taxa = args.taxa if args.taxa is not None else (None if args.adaptativo else 1.0)
+    if args.adaptativo:
+        scraper.configurar_concorrencia_adaptativa(args.concorrencia_min, args.concorrencia_max)
+    
+    # O dataset anterior vem do banco; na primeira execução com banco, do JSON
+    existentes = args.banco if os.path.exists(args.banco) else 'provas_concursos.json'
+    if args.incremental:
+        scraper.carregar_existentes(existentes, limite_conhecidos=args.limite_conhecidos)
+    
+    if args.reprocessar:
+        if args.jsonl:
+            scraper.configurar_saida_jsonl(args.jsonl)
+        scraper.reprocessar_arquivo(args.processos)
+    elif args.apenas_enriquecer:
+        scraper.carregar_existentes(existentes)
+        scraper.mesclar_existentes()
+    else:
+        pagina_inicial = scraper.retomar_checkpoint() if args.resume else 1
+        
+        if scraper.saida is not None:
+            if args.enriquecer:
+                parser.error("--enriquecer não pode ser usado ao retomar uma coleta com --jsonl")
+            if args.jsonl and os.path.abspath(args.jsonl) != os.path.abspath(scraper.saida.arquivo):
+                parser.error(f"o checkpoint continua a coleta em {scraper.saida.arquivo}, não em {args.jsonl}")
+        elif args.jsonl:
+            scraper.configurar_saida_jsonl(args.jsonl)
+        
+        scraper.scrape_multiplas_paginas(num_paginas=args.paginas, assincrono=args.assincrono,
+                                         concorrencia=args.concorrencia, taxa_por_host=taxa,
+                                         pagina_inicial=pagina_inicial, processos=args.processos)
+        
+        if args.incremental:
+            scraper.mesclar_existentes()
+    
+    if args.enriquecer or args.apenas_enriquecer:
+        scraper.enriquecer_detalhes(concorrencia=args.concorrencia_detalhes, taxa_por_host=taxa,
+                                    idade_maxima_dias=args.idade_maxima_dias,
+                                    ao_salvar_lote=lambda lote: scraper.salvar_banco(args.banco, lote))
     
     # Exibir estatísticas
     scraper.exibir_estatisticas()
     
     # Salvar em diferentes formatos
     print("Salvando dados...")
-    scraper.salvar_json()
-    scraper.salvar_csv()
-    
-    try:
-        scraper.salvar_excel()
-    except Exception as e:
-        print(f"⚠ Não foi possível salvar Excel: {e}")
-        print("  Instale openpyxl: pip install openpyxl")
+    # O reprocessamento junta versões antigas das páginas: não é um retrato da listagem atual
+    remover_ausentes = not args.reprocessar and scraper.coleta_completa()
+    if remover_ausentes:
+        print("✓ Listagem percorrida até o fim: provas que saíram do site serão removidas do banco")
+    scraper.salvar_banco(args.banco, remover_ausentes=remover_ausentes)
+    scraper.exportar_do_banco(args.banco)
+    
+    scraper.cliente.fechar()
+    if scraper.arquivo_html:
+        scraper.arquivo_html.fechar()
+    
+    scraper.metricas.exibir_etapas()
+    if args.metricas_prometheus:
+        scraper.metricas.exportar_prometheus(args.metricas_prometheus)
+        print(f"✓ Métricas salvas em {args.metricas_prometheus}")
+    if args.metricas_json:
+        scraper.metricas.exportar_json(args.metricas_json)
+        print(f"✓ Resumo da execução salvo em {args.metricas_json}")
     
     print("\n✓ Scraping concluído com sucesso!")
 
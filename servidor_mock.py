@@ -0,0 +1,257 @@
+"""
+Servidor local que imita a listagem e as páginas de detalhe do site
+Gera páginas sintéticas determinísticas (fixtures_http.py) em qualquer escala,
+com latência, erros, 429, ETag e downloads interrompidos configuráveis, para
+testar a coleta completa sem rede:
+
+    python servidor_mock.py --porta 8000 --total-provas 30000 --latencia 0.2 --taxa-erros 0.02
+    python scraper.py --base-url http://127.0.0.1:8000/questoes-de-concurso/provas --paginas 1000 --assincrono
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixtures_http import gerar_pagina_detalhe, gerar_pagina_listagem
+
+RE_LISTAGEM = re.compile(r'^/questoes-de-concurso/provas/filtro/auto/pagina/(\d+)/quantidade-por-pagina/(\d+)/?$')
+RE_DETALHE = re.compile(r'^/questoes-de-concurso/prova/[\w-]+-p(\d+)-(\d+)/?$')
+RE_PDF = re.compile(r'^/arquivos/([\w-]+)-(prova|gabarito)\.pdf$')
+RE_RANGE = re.compile(r'bytes=(\d+)-$')
+
+# Todas as respostas têm a mesma data de modificação: o conteúdo é determinístico
+ULTIMA_MODIFICACAO = 'Mon, 02 Feb 2026 12:00:00 GMT'
+
+
+def gerar_pdf(nome):
+    """Corpo fictício de PDF, determinístico pelo nome"""
+    semente = hashlib.sha256(nome.encode('utf-8')).digest()
+    return b'%PDF-1.4\n% ' + nome.encode('utf-8') + b'\n' + semente * 2048 + b'\n%%EOF\n'
+
+
+class ServidorMock(ThreadingHTTPServer):
+    """Servidor HTTP com a configuração de latência e falhas compartilhada pelos handlers"""
+
+    daemon_threads = True
+
+    def __init__(self, endereco, total_provas=3000, latencia=0.0, jitter=0.5, taxa_erros=0.0,
+                 taxa_429=0.0, retry_after=1, limite_rps=None, etag=True, semente=0, corte_pdf=None):
+        super().__init__(endereco, HandlerMock)
+        self.total_provas = total_provas
+        self.latencia = latencia
+        self.jitter = jitter
+        self.taxa_erros = taxa_erros
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.limite_rps = limite_rps  # acima disso por segundo, responde 429
+        self.etag = etag
+        self.semente = semente
+        self.corte_pdf = corte_pdf  # bytes enviados antes de derrubar o primeiro download de cada PDF
+
+        self._cortados = set()
+
+        self._rng = random.Random(semente)
+        self._lock = threading.Lock()
+        self._recentes = deque()
+        self.contagem = Counter()
+
+    def sortear(self):
+        with self._lock:
+            return self._rng.random()
+
+    def excedeu_limite(self):
+        """Janela deslizante de 1s com as requisições aceitas"""
+        if not self.limite_rps:
+            return False
+        agora = time.monotonic()
+        with self._lock:
+            while self._recentes and agora - self._recentes[0] > 1:
+                self._recentes.popleft()
+            if len(self._recentes) >= self.limite_rps:
+                return True
+            self._recentes.append(agora)
+            return False
+
+    def cortar(self, caminho):
+        """Indica se este download do PDF deve cair no meio (só o primeiro de cada caminho)"""
+        if not self.corte_pdf:
+            return False
+        with self._lock:
+            if caminho in self._cortados:
+                return False
+            self._cortados.add(caminho)
+            return True
+
+    def registrar(self, tipo, status):
+        with self._lock:
+            self.contagem[f'{tipo} {status}'] += 1
+
+    def estatisticas(self):
+        with self._lock:
+            return dict(self.contagem)
+
+
+class HandlerMock(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, tipo, status, corpo=b'', content_type='text/html; charset=utf-8', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (headers or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if corpo:
+            self.wfile.write(corpo)
+        self.server.registrar(tipo, status)
+
+    def _conteudo(self):
+        """Retorna (tipo, corpo, content_type) da rota pedida, ou None"""
+        servidor = self.server
+        caminho = self.path.split('?', 1)[0]
+
+        match = RE_LISTAGEM.match(caminho)
+        if match:
+            pagina, por_pagina = int(match.group(1)), int(match.group(2))
+            return 'listagem', gerar_pagina_listagem(pagina, por_pagina, servidor.semente,
+                                                     total=servidor.total_provas), 'text/html; charset=utf-8'
+
+        match = RE_DETALHE.match(caminho)
+        if match:
+            return 'detalhe', gerar_pagina_detalhe(int(match.group(1)), int(match.group(2)),
+                                                   servidor.semente), 'text/html; charset=utf-8'
+
+        match = RE_PDF.match(caminho)
+        if match:
+            return 'pdf', gerar_pdf(match.group(1) + '-' + match.group(2)), 'application/pdf'
+
+        return None
+
+    def do_GET(self):
+        servidor = self.server
+
+        if self.path == '/_estatisticas':
+            corpo = json.dumps(servidor.estatisticas(), ensure_ascii=False).encode('utf-8')
+            self._responder('estatisticas', 200, corpo, 'application/json')
+            return
+
+        if servidor.latencia:
+            variacao = servidor.latencia * servidor.jitter
+            time.sleep(max(0.0, servidor.latencia + random.uniform(-variacao, variacao)))
+
+        conteudo = self._conteudo()
+        if conteudo is None:
+            self._responder('outro', 404, b'Not Found', 'text/plain')
+            return
+        tipo, corpo, content_type = conteudo
+
+        if servidor.excedeu_limite() or servidor.sortear() < servidor.taxa_429:
+            self._responder(tipo, 429, b'Too Many Requests', 'text/plain',
+                            {'Retry-After': str(servidor.retry_after)})
+            return
+        if servidor.sortear() < servidor.taxa_erros:
+            self._responder(tipo, 503, b'Service Unavailable', 'text/plain')
+            return
+
+        headers = {'Accept-Ranges': 'bytes'} if tipo == 'pdf' else {}
+        if servidor.etag:
+            etag = '"' + hashlib.sha256(corpo).hexdigest()[:16] + '"'
+            headers.update({'ETag': etag, 'Last-Modified': ULTIMA_MODIFICACAO})
+            if self.headers.get('If-None-Match') == etag:
+                self._responder(tipo, 304, headers=headers)
+                return
+
+        intervalo = RE_RANGE.match(self.headers.get('Range', '')) if tipo == 'pdf' else None
+        if intervalo:
+            inicio = int(intervalo.group(1))
+            if inicio >= len(corpo):
+                self._responder(tipo, 416, headers={'Content-Range': f'bytes */{len(corpo)}'})
+                return
+            headers['Content-Range'] = f'bytes {inicio}-{len(corpo) - 1}/{len(corpo)}'
+            self._responder(tipo, 206, corpo[inicio:], content_type, headers)
+            return
+
+        if tipo == 'pdf' and servidor.cortar(self.path):
+            # Anuncia o tamanho inteiro, envia só o começo e fecha a conexão
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(corpo)))
+            for nome, valor in headers.items():
+                self.send_header(nome, valor)
+            self.end_headers()
+            self.wfile.write(corpo[:servidor.corte_pdf])
+            self.close_connection = True
+            servidor.registrar('pdf cortado', 200)
+            return
+
+        self._responder(tipo, 200, corpo, content_type, headers)
+
+
+def iniciar_servidor(porta=0, em_segundo_plano=True, **config):
+    """Cria o servidor (porta 0 = porta livre) e, se pedido, atende em uma thread
+
+    Retorna o ServidorMock; a URL base da listagem é
+    f"http://127.0.0.1:{servidor.server_port}/questoes-de-concurso/provas".
+    """
+    servidor = ServidorMock(('127.0.0.1', porta), **config)
+    if em_segundo_plano:
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Servidor local que imita o site de provas")
+    parser.add_argument('--porta', type=int, default=8000)
+    parser.add_argument('--total-provas', type=int, default=3000,
+                        help="provas na listagem; as páginas seguintes vêm vazias (padrão: 3000)")
+    parser.add_argument('--latencia', type=float, default=0.0, metavar='SEGUNDOS',
+                        help="latência média de cada resposta")
+    parser.add_argument('--jitter', type=float, default=0.5,
+                        help="variação da latência, em fração da média (padrão: 0.5)")
+    parser.add_argument('--taxa-erros', type=float, default=0.0, metavar='FRACAO',
+                        help="fração de respostas 503")
+    parser.add_argument('--taxa-429', type=float, default=0.0, metavar='FRACAO',
+                        help="fração de respostas 429 com Retry-After")
+    parser.add_argument('--retry-after', type=int, default=1, metavar='SEGUNDOS')
+    parser.add_argument('--limite-rps', type=int, default=None, metavar='N',
+                        help="responde 429 acima de N requisições por segundo")
+    parser.add_argument('--sem-etag', action='store_true',
+                        help="não envia ETag/Last-Modified nem responde 304")
+    parser.add_argument('--semente', type=int, default=0,
+                        help="semente das páginas sintéticas")
+    parser.add_argument('--corte-pdf', type=int, default=None, metavar='BYTES',
+                        help="derruba o primeiro download de cada PDF depois de BYTES bytes")
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(args.porta, em_segundo_plano=False, total_provas=args.total_provas,
+                                latencia=args.latencia, jitter=args.jitter, taxa_erros=args.taxa_erros,
+                                taxa_429=args.taxa_429, retry_after=args.retry_after,
+                                limite_rps=args.limite_rps, etag=not args.sem_etag, semente=args.semente,
+                                corte_pdf=args.corte_pdf)
+
+    print(f"🚀 Servidor mock em http://127.0.0.1:{servidor.server_port}/questoes-de-concurso/provas")
+    print(f"   {args.total_provas} provas | latência {args.latencia}s | erros {args.taxa_erros:.0%} | "
+          f"429 {args.taxa_429:.0%}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print("\n📊 Respostas enviadas:")
+        for chave, quantidade in sorted(servidor.estatisticas().items()):
+            print(f"  {chave}: {quantidade}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Snapshot binário das provas, lido por mmap
+Gerado a partir do repositório SQLite a cada publicação. Os bots abrem o
+arquivo somente leitura com mmap: a abertura lê apenas o cabeçalho (não
+depende do número de provas) e vários processos no mesmo servidor
+compartilham as mesmas páginas do cache do sistema, em vez de cada um
+manter sua cópia do dataset. Quando um snapshot novo é publicado, basta
+remapear o arquivo (atualizar), sem carregar nada.
+
+Formato (little-endian, seções alinhadas em 8 bytes):
+    MAGICO | tamanho do cabeçalho (uint32) | cabeçalho JSON | seções
+- banca, órgão, cargo, ano e nível: códigos int32 (-1 = ausente) em um
+  dicionário de valores distintos
+- textos (título, links, datas): deslocamentos uint64 em um pool UTF-8,
+  mais um byte de presença por prova
+- num_questoes: int32, mais um byte de presença por prova
+- extras: campos fora do esquema (ou de outro tipo), em JSON
+"""
+
+import json
+import mmap
+import struct
+import os
+import sys
+import time
+from array import array
+
+import numpy as np
+
+from arquivos import gravar_atomico
+from modelo import ColecaoProvas, Prova
+
+ARQUIVO_BINARIO = 'provas_concursos.bin'
+
+MAGICO = b'PROVABIN'
+VERSAO_FORMATO = 1
+
+CAMPOS_DICIONARIO = ('banca', 'orgao', 'cargo', 'ano', 'nivel')
+CAMPOS_TEXTO = ('titulo', 'link', 'data_aplicacao', 'link_prova_pdf', 'link_gabarito_pdf',
+                'data_coleta', 'data_detalhe')
+CAMPOS_INTEIROS = ('num_questoes',)
+
+# Ordem dos campos nos registros reconstruídos (a mesma do scraper)
+ORDEM_CAMPOS = ('titulo', 'link', 'banca', 'orgao', 'cargo', 'ano', 'nivel', 'data_aplicacao',
+                'num_questoes', 'link_prova_pdf', 'link_gabarito_pdf', 'data_coleta', 'data_detalhe')
+
+
+class _ColunaTexto:
+    def __init__(self):
+        self.pool = bytearray()
+        self.deslocamentos = array('Q', [0])
+        self.presenca = bytearray()
+
+    def acrescentar(self, valor):
+        if valor is not None:
+            self.pool += valor.encode('utf-8')
+        self.deslocamentos.append(len(self.pool))
+        self.presenca.append(valor is not None)
+
+    def secoes(self, nome):
+        return {f'{nome}.deslocamentos': ('<u8', self.deslocamentos.tobytes()),
+                f'{nome}.pool': ('|u1', bytes(self.pool)),
+                f'{nome}.presenca': ('|u1', bytes(self.presenca))}
+
+
+class _ColunaDicionario:
+    def __init__(self):
+        self.indice = {}
+        self.codigos = array('i')
+
+    def acrescentar(self, valor):
+        if valor is None:
+            self.codigos.append(-1)
+        else:
+            self.codigos.append(self.indice.setdefault(valor, len(self.indice)))
+
+    def secoes(self, nome):
+        dicionario = _ColunaTexto()
+        for valor in self.indice:
+            dicionario.acrescentar(valor)
+        secoes = {f'{nome}.codigos': ('<i4', self.codigos.tobytes())}
+        secoes.update(dicionario.secoes(f'{nome}.dicionario'))
+        return secoes
+
+
+class _ColunaInteiro:
+    def __init__(self):
+        self.valores = array('i')
+        self.presenca = bytearray()
+
+    def acrescentar(self, valor):
+        self.valores.append(valor or 0)
+        self.presenca.append(valor is not None)
+
+    def secoes(self, nome):
+        return {f'{nome}.valores': ('<i4', self.valores.tobytes()),
+                f'{nome}.presenca': ('|u1', bytes(self.presenca))}
+
+
+def _tipo_valido(campo, valor):
+    if campo in CAMPOS_INTEIROS:
+        return isinstance(valor, int) and not isinstance(valor, bool) and -2**31 <= valor < 2**31
+    return isinstance(valor, str)
+
+
+def salvar_snapshot_binario(lotes, arquivo=ARQUIVO_BINARIO, versao=0):
+    """Grava o snapshot binário (da `versao` do dataset) de forma atômica e retorna quantas provas ele tem
+
+    Quem está com o arquivo antigo mapeado continua lendo a versão antiga.
+    """
+    colunas = {campo: _ColunaDicionario() for campo in CAMPOS_DICIONARIO}
+    colunas.update((campo, _ColunaTexto()) for campo in CAMPOS_TEXTO)
+    colunas.update((campo, _ColunaInteiro()) for campo in CAMPOS_INTEIROS)
+    extras = _ColunaTexto()
+    total = 0
+    for lote in lotes:
+        for prova in lote:
+            for campo, coluna in colunas.items():
+                valor = prova.get(campo)
+                coluna.acrescentar(valor if _tipo_valido(campo, valor) else None)
+            fora_do_esquema = {campo: valor for campo, valor in prova.items()
+                               if campo not in colunas or not _tipo_valido(campo, valor)}
+            extras.acrescentar(json.dumps(fora_do_esquema, ensure_ascii=False) if fora_do_esquema else None)
+            total += 1
+
+    secoes = {}
+    for campo, coluna in colunas.items():
+        secoes.update(coluna.secoes(campo))
+    secoes.update(extras.secoes('extras'))
+
+    # Os deslocamentos das seções dependem do tamanho do cabeçalho, que depende deles
+    def montar_cabecalho(inicio):
+        posicao = inicio
+        descricao = {}
+        for nome, (tipo, dados) in secoes.items():
+            descricao[nome] = [tipo, posicao, len(dados)]
+            posicao += len(dados) + (-len(dados) % 8)
+        return json.dumps({'versao': VERSAO_FORMATO, 'versao_dados': versao, 'total': total,
+                           'secoes': descricao}).encode('utf-8')
+
+    inicio = 0
+    while True:
+        cabecalho = montar_cabecalho(inicio)
+        tamanho = len(MAGICO) + 4 + len(cabecalho)
+        if inicio == tamanho + (-tamanho % 8):
+            break
+        inicio = tamanho + (-tamanho % 8)
+
+    partes = [MAGICO, struct.pack('<I', len(cabecalho)), cabecalho, b'\0' * (inicio - tamanho)]
+    for _, dados in secoes.values():
+        partes.append(dados)
+        partes.append(b'\0' * (-len(dados) % 8))
+    gravar_atomico(arquivo, b''.join(partes))
+    return total
+
+
+class SnapshotBinario:
+    """Consultas sobre o snapshot mapeado em memória, com a mesma interface do RepositorioProvas
+
+    A cada `intervalo_atualizacao` segundos (None = nunca) as consultas
+    verificam se o arquivo foi substituído e, se foi, remapeiam o novo.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_BINARIO, intervalo_atualizacao=60):
+        self.arquivo = arquivo
+        self.intervalo_atualizacao = intervalo_atualizacao
+        self._mmap = None
+        self._abrir()
+
+    def _abrir(self):
+        with open(self.arquivo, 'rb') as f:
+            identidade = os.fstat(f.fileno())
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapa[:len(MAGICO)] != MAGICO:
+            mapa.close()
+            raise ValueError(f"{self.arquivo} não é um snapshot binário de provas")
+        tamanho, = struct.unpack_from('<I', mapa, len(MAGICO))
+        inicio = len(MAGICO) + 4
+        cabecalho = json.loads(mapa[inicio:inicio + tamanho])
+        if cabecalho['versao'] != VERSAO_FORMATO:
+            mapa.close()
+            raise ValueError(f"Versão de snapshot não suportada: {cabecalho['versao']}")
+        self._fechar_mapa()
+        self._mmap = mapa
+        self._identidade = (identidade.st_ino, identidade.st_mtime_ns)
+        self._verificado_em = time.monotonic()
+        self.quantidade = cabecalho['total']
+        self.versao_dados = cabecalho.get('versao_dados', 0)
+        self._secoes = cabecalho['secoes']
+        self._arrays = {}
+        self._dicionarios = {}
+
+    def versao(self):
+        """Versão do dataset contida no snapshot (0 = anterior ao versionamento)"""
+        return self.versao_dados
+
+    def atualizar(self):
+        """Remapeia o arquivo se um snapshot novo foi publicado; retorna quantas versões avançou
+
+        Custo constante: só o cabeçalho do arquivo novo é lido.
+        """
+        self._verificado_em = time.monotonic()
+        try:
+            identidade = os.stat(self.arquivo)
+        except FileNotFoundError:
+            return 0
+        if (identidade.st_ino, identidade.st_mtime_ns) == self._identidade:
+            return 0
+        anterior = self.versao_dados
+        self._abrir()
+        return max(self.versao_dados - anterior, 0)
+
+    def _verificar_atualizacao(self):
+        if (self.intervalo_atualizacao is not None
+                and time.monotonic() - self._verificado_em >= self.intervalo_atualizacao):
+            self.atualizar()
+
+    def _array(self, nome):
+        """Seção como array numpy somente leitura, sem cópia (aponta para o mmap)"""
+        if nome not in self._arrays:
+            tipo, offset, tamanho = self._secoes[nome]
+            tipo = np.dtype(tipo)
+            self._arrays[nome] = np.frombuffer(self._mmap, dtype=tipo, count=tamanho // tipo.itemsize,
+                                               offset=offset)
+        return self._arrays[nome]
+
+    def _texto(self, nome, i):
+        deslocamentos = self._array(f'{nome}.deslocamentos')
+        _, offset, _ = self._secoes[f'{nome}.pool']
+        return self._mmap[offset + int(deslocamentos[i]):offset + int(deslocamentos[i + 1])].decode('utf-8')
+
+    def _dicionario(self, campo):
+        """Valores distintos do campo (internados), decodificados na primeira consulta"""
+        if campo not in self._dicionarios:
+            nome = f'{campo}.dicionario'
+            total = len(self._array(f'{nome}.deslocamentos')) - 1
+            self._dicionarios[campo] = [sys.intern(self._texto(nome, i)) for i in range(total)]
+        return self._dicionarios[campo]
+
+    def _registro(self, i):
+        prova = {}
+        for campo in ORDEM_CAMPOS:
+            if campo in CAMPOS_DICIONARIO:
+                codigo = self._array(f'{campo}.codigos')[i]
+                if codigo >= 0:
+                    prova[campo] = self._dicionario(campo)[codigo]
+            elif self._array(f'{campo}.presenca')[i]:
+                if campo in CAMPOS_INTEIROS:
+                    prova[campo] = int(self._array(f'{campo}.valores')[i])
+                else:
+                    prova[campo] = self._texto(campo, i)
+        if self._array('extras.presenca')[i]:
+            prova.update(json.loads(self._texto('extras', i)))
+        return prova
+
+    def _mascara(self, com_questoes=False, contendo=False, **filtros):
+        from repositorio import CAMPOS_INDEXADOS
+
+        self._verificar_atualizacao()
+        mascara = np.ones(self.quantidade, dtype=bool)
+        for campo, valor in filtros.items():
+            if campo not in CAMPOS_INDEXADOS:
+                raise ValueError(f"Campo não indexado: {campo}")
+            if valor is None:
+                continue
+            if campo in CAMPOS_DICIONARIO:
+                dicionario = self._dicionario(campo)
+                if contendo:
+                    termo = str(valor).upper()
+                    aceitos = [codigo for codigo, texto in enumerate(dicionario) if termo in texto.upper()]
+                else:
+                    alvo = str(valor) if campo == 'ano' else valor
+                    aceitos = [codigo for codigo, texto in enumerate(dicionario) if texto == alvo]
+                mascara &= np.isin(self._array(f'{campo}.codigos'), aceitos)
+            else:
+                valores = self._array(f'{campo}.valores')
+                if contendo:
+                    termo = str(valor).upper()
+                    aceitos = [v for v in np.unique(valores) if termo in str(v)]
+                    mascara &= np.isin(valores, aceitos)
+                else:
+                    mascara &= valores == valor
+        if com_questoes:
+            mascara &= self._array('num_questoes.valores') > 0
+        return mascara
+
+    def buscar(self, com_questoes=False, contendo=False, limite=None, **filtros):
+        indices = np.flatnonzero(self._mascara(com_questoes, contendo, **filtros))
+        if limite is not None:
+            indices = indices[:limite]
+        return ColecaoProvas(self._registro(i) for i in indices)
+
+    def total(self, com_questoes=False, contendo=False, **filtros):
+        return int(self._mascara(com_questoes, contendo, **filtros).sum())
+
+    def contar(self, campo, com_questoes=False, limite=None, **filtros):
+        """[(valor, quantidade), ...] do campo, da mais frequente para a menos frequente"""
+        mascara = self._mascara(com_questoes, **filtros)
+        if campo in CAMPOS_DICIONARIO:
+            codigos = self._array(f'{campo}.codigos')[mascara]
+            dicionario = self._dicionario(campo)
+            contagem = np.bincount(codigos[codigos >= 0], minlength=len(dicionario))
+            pares = [(dicionario[codigo], int(n)) for codigo, n in enumerate(contagem) if n]
+        elif campo in CAMPOS_INTEIROS:
+            valores, contagem = np.unique(self._array(f'{campo}.valores')[mascara], return_counts=True)
+            pares = [(int(v), int(n)) for v, n in zip(valores, contagem)]
+        else:
+            raise ValueError(f"Campo não indexado: {campo}")
+        pares.sort(key=lambda par: (-par[1], par[0]))
+        return pares if limite is None else pares[:limite]
+
+    def valores(self, campo, com_questoes=False):
+        mascara = self._mascara(com_questoes)
+        if campo in CAMPOS_DICIONARIO:
+            codigos = np.unique(self._array(f'{campo}.codigos')[mascara])
+            return sorted(self._dicionario(campo)[c] for c in codigos if c >= 0)
+        if campo in CAMPOS_INTEIROS:
+            return [int(v) for v in np.unique(self._array(f'{campo}.valores')[mascara])]
+        raise ValueError(f"Campo não indexado: {campo}")
+
+    def estatisticas(self, com_questoes=False):
+        questoes = self._array('num_questoes.valores')[self._mascara(com_questoes)]
+        total = len(questoes)
+        return {'total': total, 'total_questoes': int(questoes.sum()),
+                'media_questoes': float(questoes.mean()) if total else 0,
+                'min_questoes': int(questoes.min()) if total else None,
+                'max_questoes': int(questoes.max()) if total else None}
+
+    def ultimas(self, quantidade=10):
+        self._verificar_atualizacao()
+        return ColecaoProvas(self._registro(i) for i in range(max(0, self.quantidade - quantidade), self.quantidade))
+
+    def lotes(self, tamanho_lote=5000):
+        for inicio in range(0, self.quantidade, tamanho_lote):
+            yield [self._registro(i) for i in range(inicio, min(inicio + tamanho_lote, self.quantidade))]
+
+    def todas(self):
+        return [Prova.de_dict(self._registro(i)) for i in range(self.quantidade)]
+
+    def dataframe(self):
+        """DataFrame com os tipos do snapshot colunar; os categóricos saem direto dos códigos"""
+        import pandas as pd
+
+        dados = {}
+        for campo in ORDEM_CAMPOS:
+            if campo in CAMPOS_DICIONARIO:
+                dados[campo] = pd.Categorical.from_codes(self._array(f'{campo}.codigos'),
+                                                         categories=self._dicionario(campo))
+            elif campo in CAMPOS_INTEIROS:
+                dados[campo] = self._array(f'{campo}.valores').astype(np.int16 if campo == 'num_questoes' else np.int64)
+            elif self._array(f'{campo}.presenca').any():
+                presenca = self._array(f'{campo}.presenca')
+                dados[campo] = [self._texto(campo, i) if presenca[i] else None for i in range(self.quantidade)]
+        df = pd.DataFrame(dados)
+        presenca = self._array('extras.presenca')
+        if presenca.any():
+            extras = pd.DataFrame([json.loads(self._texto('extras', i)) if presenca[i] else {}
+                                   for i in range(self.quantidade)])
+            df = pd.concat([df.drop(columns=[c for c in extras if c in df]), extras], axis=1)
+        return df
+
+    def _fechar_mapa(self):
+        if self._mmap is None:
+            return
+        # Os arrays apontam para o mmap: precisam sair antes de fechá-lo
+        self._arrays.clear()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # ainda há arrays em uso fora daqui; o mapeamento é liberado junto com eles
+
+    def fechar(self):
+        self._fechar_mapa()
+        self._mmap = None
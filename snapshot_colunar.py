@@ -0,0 +1,200 @@
+"""
+Snapshot colunar (Parquet) do dataset
+Gerado a partir do repositório SQLite a cada publicação, com banca, órgão,
+cargo, nível e ano como categóricos (codificados por dicionário) e
+num_questoes como inteiro pequeno. Carregar o snapshot e fazer contagens
+sobre ele é muito mais rápido e ocupa muito menos memória do que montar um
+DataFrame de strings a partir do JSON; por isso a análise e os bots o
+preferem quando ele existe e está em dia com o banco. Em memória, o
+snapshot acompanha as publicações seguintes aplicando só os deltas (ver
+versoes.py).
+
+Requer (opcional): pyarrow
+"""
+
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from arquivos import gravar_atomico
+from modelo import ColecaoProvas, Prova
+from repositorio import CAMPOS_INDEXADOS
+from versoes import DIRETORIO_VERSOES, aplicar_delta_dataframe, deltas_pendentes
+
+ARQUIVO_SNAPSHOT = 'provas_concursos.parquet'
+
+CAMPOS_CATEGORICOS = ('banca', 'orgao', 'cargo', 'nivel', 'ano')
+
+
+def pyarrow_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def dataframe_colunar(lotes):
+    """DataFrame com os tipos do snapshot, montado coluna a coluna a partir de lotes de provas"""
+    colunas = {}
+    total = 0
+    for lote in lotes:
+        for prova in lote:
+            for campo in prova:
+                if campo not in colunas:
+                    colunas[campo] = [None] * total
+            for campo, valores in colunas.items():
+                valores.append(prova.get(campo))
+            total += 1
+
+    dados = {}
+    for campo, valores in colunas.items():
+        if campo in CAMPOS_CATEGORICOS:
+            dados[campo] = pd.Categorical([None if v is None else str(v) for v in valores])
+        elif campo == 'num_questoes':
+            dados[campo] = np.array([v or 0 for v in valores], dtype=np.int16)
+        elif pd.api.types.infer_dtype(valores, skipna=True) == 'integer':
+            dados[campo] = pd.array(valores, dtype='Int64')
+        else:
+            dados[campo] = valores
+    return pd.DataFrame(dados)
+
+
+def salvar_snapshot(lotes, arquivo=ARQUIVO_SNAPSHOT, versao=0):
+    """Grava o snapshot Parquet (da `versao` do dataset) de forma atômica e retorna quantas provas ele tem"""
+    df = dataframe_colunar(lotes)
+    df.attrs['versao'] = versao
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine='pyarrow', index=False)
+    gravar_atomico(arquivo, buffer.getvalue())
+    return len(df)
+
+
+def carregar_snapshot(arquivo=ARQUIVO_SNAPSHOT):
+    """Lê o snapshot; os categóricos e o num_questoes voltam com os mesmos tipos"""
+    return pd.read_parquet(arquivo, engine='pyarrow')
+
+
+def _registros(df):
+    """Linhas do DataFrame como dicionários, sem os campos ausentes no registro original"""
+    return [{campo: valor for campo, valor in linha.items()
+             if valor is not None and valor is not pd.NA and valor == valor}
+            for linha in df.to_dict('records')]
+
+
+class SnapshotColunar:
+    """Consultas sobre o snapshot em memória, com a mesma interface do RepositorioProvas
+
+    A cada `intervalo_atualizacao` segundos (None = nunca) as consultas
+    procuram versões novas e aplicam os deltas ao DataFrame.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_SNAPSHOT, diretorio_versoes=DIRETORIO_VERSOES, intervalo_atualizacao=60):
+        self.arquivo = arquivo
+        self.diretorio_versoes = diretorio_versoes
+        self.intervalo_atualizacao = intervalo_atualizacao
+        self.df = carregar_snapshot(arquivo)
+        self.versao_dados = self.df.attrs.get('versao', 0)
+        self._verificado_em = time.monotonic()
+
+    def versao(self):
+        """Versão do dataset contida no DataFrame (0 = anterior ao versionamento)"""
+        return self.versao_dados
+
+    def atualizar(self):
+        """Aplica os deltas publicados desde a versão em memória; retorna quantas provas mudaram
+
+        Se faltar algum delta, recarrega o snapshot inteiro (se ele for mais novo).
+        """
+        self._verificado_em = time.monotonic()
+        deltas = deltas_pendentes(self.versao_dados, self.diretorio_versoes)
+        if deltas is None:
+            df = carregar_snapshot(self.arquivo)
+            if df.attrs.get('versao', 0) <= self.versao_dados:
+                return 0
+            self.df, self.versao_dados = df, df.attrs.get('versao', 0)
+            return len(df)
+        mudancas = 0
+        for delta in deltas:
+            self.df = aplicar_delta_dataframe(self.df, delta)
+            self.versao_dados = delta['versao']
+            mudancas += (len(delta['adicionadas']) + len(delta['removidas']) + len(delta['modificadas'])
+                         + len(delta.get('movidas', ())))
+        return mudancas
+
+    def _verificar_atualizacao(self):
+        if (self.intervalo_atualizacao is not None
+                and time.monotonic() - self._verificado_em >= self.intervalo_atualizacao):
+            self.atualizar()
+
+    def _mascara(self, com_questoes=False, contendo=False, **filtros):
+        self._verificar_atualizacao()
+        mascara = np.ones(len(self.df), dtype=bool)
+        for campo, valor in filtros.items():
+            if campo not in CAMPOS_INDEXADOS:
+                raise ValueError(f"Campo não indexado: {campo}")
+            if valor is None or campo not in self.df:
+                continue
+            coluna = self.df[campo]
+            if contendo and campo in CAMPOS_CATEGORICOS:
+                # O trecho é procurado só no dicionário de valores distintos, não em cada linha
+                categorias = coluna.cat.categories.astype(str)
+                encontradas = categorias[categorias.str.upper().str.contains(str(valor).upper(), regex=False)]
+                mascara &= coluna.isin(encontradas).to_numpy()
+            elif contendo:
+                mascara &= coluna.astype(str).str.upper().str.contains(str(valor).upper(), regex=False).to_numpy()
+            else:
+                mascara &= (coluna == (str(valor) if campo == 'ano' else valor)).to_numpy()
+        if com_questoes:
+            mascara &= self.df['num_questoes'].to_numpy() > 0
+        return mascara
+
+    def buscar(self, com_questoes=False, contendo=False, limite=None, **filtros):
+        selecao = self.df[self._mascara(com_questoes, contendo, **filtros)]
+        if limite is not None:
+            selecao = selecao.head(limite)
+        return ColecaoProvas(_registros(selecao))
+
+    def total(self, com_questoes=False, contendo=False, **filtros):
+        return int(self._mascara(com_questoes, contendo, **filtros).sum())
+
+    def contar(self, campo, com_questoes=False, limite=None, **filtros):
+        """[(valor, quantidade), ...] do campo, da mais frequente para a menos frequente"""
+        if campo not in CAMPOS_INDEXADOS:
+            raise ValueError(f"Campo não indexado: {campo}")
+        contagem = self.df.loc[self._mascara(com_questoes, **filtros), campo].value_counts()
+        pares = sorted(((valor, int(n)) for valor, n in contagem.items() if n),
+                       key=lambda par: (-par[1], par[0]))
+        return pares if limite is None else pares[:limite]
+
+    def valores(self, campo, com_questoes=False):
+        if campo not in CAMPOS_INDEXADOS:
+            raise ValueError(f"Campo não indexado: {campo}")
+        return sorted(self.df.loc[self._mascara(com_questoes), campo].dropna().unique())
+
+    def estatisticas(self, com_questoes=False):
+        questoes = self.df.loc[self._mascara(com_questoes), 'num_questoes']
+        total = len(questoes)
+        return {'total': total, 'total_questoes': int(questoes.sum()),
+                'media_questoes': float(questoes.mean()) if total else 0,
+                'min_questoes': int(questoes.min()) if total else None,
+                'max_questoes': int(questoes.max()) if total else None}
+
+    def ultimas(self, quantidade=10):
+        self._verificar_atualizacao()
+        return ColecaoProvas(_registros(self.df.tail(quantidade)))
+
+    def lotes(self, tamanho_lote=5000):
+        for inicio in range(0, len(self.df), tamanho_lote):
+            yield _registros(self.df.iloc[inicio:inicio + tamanho_lote])
+
+    def todas(self):
+        return [Prova.de_dict(prova) for prova in _registros(self.df)]
+
+    def dataframe(self):
+        return self.df
+
+    def fechar(self):
+        self.df = None
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz, sem pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servidor_mock import iniciar_servidor  # noqa: E402
+
+
+def fazer_prova(i, **campos):
+    """Registro no formato do scraper, com valores derivados de `i`"""
+    prova = {'titulo': f'Prova {i}', 'link': f'https://exemplo.com/prova/{i}',
+             'banca': ('FGV', 'Cebraspe', 'FCC')[i % 3], 'orgao': f'Órgão {i % 5}', 'cargo': 'Analista',
+             'ano': str(2020 + i % 4), 'nivel': 'Superior', 'data_aplicacao': '05/2023',
+             'num_questoes': 50 + i, 'link_prova_pdf': None, 'link_gabarito_pdf': None,
+             'data_coleta': '2026-01-01 10:00:00'}
+    prova.update(campos)
+    return prova
+
+
+@pytest.fixture
+def em_tmp(tmp_path, monkeypatch):
+    """Roda o teste dentro de um diretório temporário (arquivos com nomes padrão)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def servidor():
+    """servidor_mock.py numa porta livre; retorna a URL base da listagem"""
+    servidor = iniciar_servidor(total_provas=300)
+    yield f"http://127.0.0.1:{servidor.server_port}/questoes-de-concurso/provas"
+    servidor.shutdown()
+    servidor.server_close()
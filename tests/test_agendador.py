@@ -0,0 +1,27 @@
+from argparse import Namespace
+
+import pytest
+
+from agendador import Agendador
+from conftest import fazer_prova
+from repositorio import RepositorioProvas
+
+
+@pytest.mark.parametrize('validos, resultado', [(0, 'erro'), (1, 'parcial'), (2, 'ok')])
+def test_resultado_da_tarefa_pdfs(em_tmp, servidor, validos, resultado):
+    host = servidor.split('/questoes-de-concurso')[0]
+    provas = [fazer_prova(i, link_prova_pdf=f"{host}/arquivos/{'p' if i < validos else 'x'}{i}"
+                                            f"{'-prova' if i < validos else ''}.pdf")
+              for i in range(2)]
+    repositorio = RepositorioProvas('provas.db')
+    repositorio.salvar(provas)
+    repositorio.fechar()
+
+    config = Namespace(arquivo='provas_concursos.json', banco='provas.db', diretorio_pdfs='pdfs',
+                       concorrencia=2, limite_pdfs=None)
+    agendador = Agendador(config, {'pdfs': 3600})
+    agendador.executar('pdfs')
+
+    estado = agendador.status['tarefas']['pdfs']
+    assert estado['resultado'] == resultado
+    assert estado['falhas'] == (resultado == 'erro')
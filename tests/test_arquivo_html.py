@@ -0,0 +1,31 @@
+from arquivo_html import ArquivoHTML
+from scraper import ConcursoScraper
+
+
+def _sem_data_coleta(provas):
+    return [{campo: valor for campo, valor in prova.items() if campo != 'data_coleta'} for prova in provas]
+
+
+def test_reprocessar_reproduz_a_coleta(em_tmp, servidor):
+    # Coleta síncrona: as páginas são gravadas em segundos diferentes
+    coleta = ConcursoScraper(base_url=servidor, arquivo_html='arquivo_html')
+    coleta.scrape_multiplas_paginas(num_paginas=3)
+    coleta.arquivo_html.fechar()
+
+    assert [entrada['pagina'] for entrada in ArquivoHTML('arquivo_html').listagens()] == [1, 2, 3]
+
+    refeito = ConcursoScraper(base_url=servidor, arquivo_html='arquivo_html')
+    refeito.reprocessar_arquivo(processos=1)
+    assert refeito.total_provas() == 90
+    assert _sem_data_coleta(refeito.provas) == _sem_data_coleta(coleta.provas)
+
+
+def test_listagens_da_coleta_mais_nova_primeiro(em_tmp):
+    for corpos in ([b'a1', b'a2'], [b'b1', b'b2']):
+        arquivo = ArquivoHTML('arquivo_html')
+        for pagina in (2, 1):  # no modo assíncrono as páginas chegam fora de ordem
+            arquivo.gravar(f'https://exemplo.com/pagina/{pagina}', corpos[pagina - 1], 'listagem', pagina)
+        arquivo.fechar()
+
+    arquivo = ArquivoHTML('arquivo_html')
+    assert [arquivo.ler(entrada) for entrada in arquivo.listagens()] == [b'b1', b'b2', b'a1', b'a2']
@@ -0,0 +1,40 @@
+import hashlib
+import os
+
+import baixar_pdfs
+from baixar_pdfs import BaixadorPDFs
+from scraper import ConcursoScraper
+from servidor_mock import gerar_pdf, iniciar_servidor
+
+
+def test_baixa_pdfs_da_listagem(em_tmp, servidor):
+    scraper = ConcursoScraper(base_url=servidor)
+    scraper.scrape_multiplas_paginas(num_paginas=1)
+    provas = scraper.provas[:2]
+
+    feitos, erros = BaixadorPDFs('pdfs', concorrencia=2).baixar_todos(provas)
+
+    assert (feitos, erros) == (4, 0)
+    for prova in provas:
+        assert os.path.getsize(prova['arquivo_prova_pdf']) == prova['tamanho_prova_pdf']
+        assert prova['hash_gabarito_pdf'] in prova['arquivo_gabarito_pdf']
+
+
+def test_download_interrompido_continua_com_range(em_tmp, monkeypatch):
+    servidor = iniciar_servidor(corte_pdf=50000)
+    monkeypatch.setattr(baixar_pdfs.time, 'sleep', lambda segundos: None)
+    try:
+        url = f"http://127.0.0.1:{servidor.server_port}/arquivos/fgv-2024-p1-0-prova.pdf"
+        # Blocos menores que o corte: a primeira tentativa deixa parte do arquivo no .part
+        caminho, tamanho, digest = BaixadorPDFs('pdfs', tamanho_bloco=16 * 1024).baixar(url)
+
+        corpo = gerar_pdf('fgv-2024-p1-0-prova')
+        assert tamanho == len(corpo) > 50000
+        assert digest == hashlib.sha256(corpo).hexdigest()
+        with open(caminho, 'rb') as f:
+            assert f.read() == corpo
+        # A segunda tentativa pediu só o que faltava
+        assert servidor.estatisticas() == {'pdf cortado 200': 1, 'pdf 206': 1}
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
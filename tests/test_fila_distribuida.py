@@ -0,0 +1,34 @@
+import json
+
+from conftest import fazer_prova
+from fila_distribuida import FilaSQLite, exportar
+from repositorio import RepositorioProvas
+import versoes
+
+
+def test_exportar_grava_no_repositorio_e_publica_versao(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(1, hash_prova_pdf='abcd', arquivo_prova_pdf='pdfs/ab/abcd.pdf')])
+    repositorio.publicar()
+    repositorio.fechar()
+
+    fila = FilaSQLite()
+    fila.criar(2, tamanho_unidade=1)
+    for provas in ([fazer_prova(0), fazer_prova(1)], [fazer_prova(2)]):
+        unidade = fila.arrendar('teste')
+        fila.concluir(unidade['id'], 'teste', provas)
+    assert exportar(fila) == 3
+    fila.fechar()
+
+    with open('provas_concursos.json', encoding='utf-8') as f:
+        dados = json.load(f)
+    assert [prova['link'] for prova in dados] == [fazer_prova(i)['link'] for i in range(3)]
+    # Os campos gravados por outras etapas continuam no registro
+    assert dados[1]['hash_prova_pdf'] == 'abcd'
+
+    manifesto = versoes.ler_manifesto()
+    assert manifesto['versao'] == 2
+    delta = versoes.ler_delta('versoes/delta_000002.json.gz')
+    assert [adicionada['prova']['link'] for adicionada in delta['adicionadas']] == \
+        [fazer_prova(0)['link'], fazer_prova(2)['link']]
+    assert delta['modificadas'] == []
@@ -0,0 +1,28 @@
+import sys
+
+import pytest
+
+from conftest import fazer_prova
+from indice_questoes import IndiceQuestoes, processar_pdf
+
+
+def test_pdf_sem_pypdf_fica_pendente(em_tmp, monkeypatch):
+    pypdf = pytest.importorskip('pypdf')
+    escritor = pypdf.PdfWriter()
+    escritor.add_blank_page(width=595, height=842)
+    escritor.write('prova.pdf')
+    provas = [fazer_prova(1, hash_prova_pdf='ab' * 32, arquivo_prova_pdf='prova.pdf')]
+    indice = IndiceQuestoes('indice.db')
+
+    with monkeypatch.context() as m:
+        m.setitem(sys.modules, 'pypdf', None)  # import pypdf levanta ImportError
+        with pytest.raises(ImportError):
+            processar_pdf('ab' * 32, 'prova.pdf')
+        with pytest.raises(ImportError):
+            indice.atualizar(provas, processos=1)
+    assert indice.hashes_processados() == set()
+
+    # Com o pypdf instalado, o PDF é lido na execução seguinte
+    assert indice.atualizar(provas, processos=1) == 1
+    assert indice.hashes_processados() == {'ab' * 32}
+    indice.fechar()
@@ -0,0 +1,92 @@
+import os
+
+from conftest import fazer_prova
+from repositorio import RepositorioProvas, mesclar_dados, snapshot_em_dia
+
+
+def _links(repositorio):
+    return [prova['link'] for lote in repositorio.lotes() for prova in lote]
+
+
+def test_salvar_em_lotes_mantem_a_ordem_recebida(em_tmp):
+    repositorio = RepositorioProvas()
+    assert repositorio.salvar((fazer_prova(i) for i in range(10)), tamanho_lote=3) == 10
+    assert _links(repositorio) == [fazer_prova(i)['link'] for i in range(10)]
+
+    # Novas e repetidas no topo, na ordem recebida; as não recebidas depois, na ordem de antes
+    recebidas = [20, 21, 4, 22, 0]
+    assert repositorio.salvar((fazer_prova(i) for i in recebidas), tamanho_lote=2) == 5
+    esperadas = recebidas + [i for i in range(10) if i not in recebidas]
+    assert _links(repositorio) == [fazer_prova(i)['link'] for i in esperadas]
+    assert repositorio.total() == 13
+    repositorio.fechar()
+
+
+def test_salvar_nao_reescreve_as_provas_nao_recebidas(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar(fazer_prova(i) for i in range(5))
+    antes = dict(repositorio.conn.execute("SELECT link, ordem FROM provas"))
+    repositorio.salvar([fazer_prova(9)])
+    depois = dict(repositorio.conn.execute("SELECT link, ordem FROM provas"))
+    assert all(depois[link] == ordem for link, ordem in antes.items())
+    repositorio.fechar()
+
+
+def test_nova_coleta_nao_apaga_campos_de_enriquecimento(em_tmp):
+    repositorio = RepositorioProvas()
+    enriquecida = fazer_prova(1, data_detalhe='2026-01-02 10:00:00', arquivo_prova_pdf='pdfs/ab/cd.pdf',
+                              hash_prova_pdf='abcd', link_prova_pdf='https://exemplo.com/p.pdf')
+    repositorio.salvar([enriquecida])
+    repositorio.salvar([fazer_prova(1, titulo='Título novo', data_coleta='2026-03-01 10:00:00')])
+
+    prova, = repositorio.buscar()
+    assert prova['titulo'] == 'Título novo'
+    assert prova['data_coleta'] == '2026-03-01 10:00:00'
+    assert prova['link_prova_pdf'] == 'https://exemplo.com/p.pdf'
+    assert prova['arquivo_prova_pdf'] == 'pdfs/ab/cd.pdf'
+    assert prova['hash_prova_pdf'] == 'abcd'
+    assert prova['data_detalhe'] == '2026-01-02 10:00:00'
+    repositorio.fechar()
+
+
+def test_link_repetido_na_mesma_chamada_mescla_e_fica_na_ultima_posicao(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(1, cargo=''), fazer_prova(2), fazer_prova(1, nivel='Médio')])
+    assert _links(repositorio) == [fazer_prova(2)['link'], fazer_prova(1)['link']]
+    prova = repositorio.buscar(banca=fazer_prova(1)['banca'])[0]
+    assert (prova['cargo'], prova['nivel']) == ('Analista', 'Médio')
+    repositorio.fechar()
+
+
+def test_mesclar_dados_preserva_ordem_e_valores_preenchidos():
+    existente = {'titulo': 'A', 'num_questoes': 40, 'hash_prova_pdf': 'x'}
+    mesclada = mesclar_dados(existente, {'titulo': 'B', 'num_questoes': 0, 'nivel': ''})
+    assert mesclada == {'titulo': 'B', 'num_questoes': 40, 'hash_prova_pdf': 'x', 'nivel': ''}
+    assert list(mesclada) == ['titulo', 'num_questoes', 'hash_prova_pdf', 'nivel']
+
+
+def test_abrir_banco_em_dia_nao_escreve(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(i) for i in range(5)])
+    repositorio.publicar()
+    repositorio.fechar()
+    antigo = os.path.getmtime('provas_concursos.db') - 10
+    os.utime('provas_concursos.db', (antigo, antigo))
+
+    leitor = RepositorioProvas()
+    assert leitor.total() == 5
+    assert os.path.getmtime('provas_concursos.db') == antigo
+    assert snapshot_em_dia('provas_concursos.bin')
+    leitor.fechar()
+
+
+def test_regravar_mantem_a_ordem_do_dataset(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(i) for i in range(5)])
+    repositorio.regravar([fazer_prova(3, nivel='Médio'), fazer_prova(9), fazer_prova(1, data_detalhe='hoje')])
+
+    assert _links(repositorio) == [fazer_prova(i)['link'] for i in (0, 1, 2, 3, 4, 9)]
+    provas = {prova['link']: prova for prova in repositorio.todas()}
+    assert provas[fazer_prova(3)['link']]['nivel'] == 'Médio'
+    assert provas[fazer_prova(1)['link']]['data_detalhe'] == 'hoje'
+    repositorio.fechar()
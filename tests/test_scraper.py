@@ -0,0 +1,73 @@
+from repositorio import RepositorioProvas
+from scraper import ConcursoScraper
+
+
+def test_incremental_nao_para_em_pagina_so_de_conhecidas(em_tmp, servidor):
+    anterior = ConcursoScraper(base_url=servidor)
+    anterior.scrape_multiplas_paginas(num_paginas=2, assincrono=True, concorrencia=1, taxa_por_host=None)
+    anterior.salvar_json('provas_concursos.json')
+    assert anterior.total_provas() == 60
+
+    # A página 1 traz só provas conhecidas (30), abaixo da marca d'água de 40
+    scraper = ConcursoScraper(base_url=servidor)
+    scraper.carregar_existentes('provas_concursos.json', limite_conhecidos=40)
+    scraper.scrape_multiplas_paginas(num_paginas=5, assincrono=True, concorrencia=1, taxa_por_host=None)
+
+    assert scraper.ultima_pagina == 2
+    assert scraper.limite_conhecidos_atingido()
+    assert scraper.total_provas() == 0
+
+
+def test_links_dos_pdfs_sao_absolutos(servidor):
+    for parser in ('lxml', 'bs4'):
+        scraper = ConcursoScraper(base_url=servidor, parser=parser)
+        scraper.scrape_multiplas_paginas(num_paginas=1)
+        prova = scraper.provas[0]
+        assert prova['link_prova_pdf'].startswith('http://127.0.0.1:')
+        assert prova['link_gabarito_pdf'].endswith('-gabarito.pdf')
+
+
+def test_retomar_checkpoint_reabre_o_jsonl(em_tmp, servidor):
+    anterior = ConcursoScraper(base_url=servidor)
+    anterior.configurar_checkpoint('checkpoint.json', intervalo=1)
+    anterior.configurar_saida_jsonl('coleta.jsonl')
+    anterior.scrape_multiplas_paginas(num_paginas=2, assincrono=True, taxa_por_host=None)
+
+    # Retomada sem configurar o JSONL: as provas já descarregadas continuam nele
+    scraper = ConcursoScraper(base_url=servidor)
+    scraper.configurar_checkpoint('checkpoint.json', intervalo=1)
+    pagina = scraper.retomar_checkpoint()
+    assert (pagina, scraper.saida.arquivo) == (3, 'coleta.jsonl')
+    scraper.scrape_multiplas_paginas(num_paginas=3, assincrono=True, taxa_por_host=None, pagina_inicial=pagina)
+    scraper.salvar_banco('provas.db')
+
+    repositorio = RepositorioProvas('provas.db')
+    assert repositorio.total() == scraper.total_provas() == 90
+    repositorio.fechar()
+
+
+def test_enriquecimento_grava_so_as_provas_de_cada_lote(em_tmp, servidor):
+    scraper = ConcursoScraper(base_url=servidor)
+    scraper.scrape_multiplas_paginas(num_paginas=1)
+    for prova in scraper.provas:
+        prova['nivel'] = ''  # campo que só a página de detalhe traz de forma confiável
+    lotes = []
+
+    enriquecidas = scraper.enriquecer_detalhes(taxa_por_host=None, tamanho_lote=12, ao_salvar_lote=lotes.append)
+
+    assert enriquecidas == 30
+    assert [len(lote) for lote in lotes] == [12, 12, 6]
+    assert {prova['link'] for lote in lotes for prova in lote} == set(scraper.indice_links)
+    assert all(prova.get('data_detalhe') for lote in lotes for prova in lote)
+
+
+def test_coleta_completa_so_ao_chegar_ao_fim_da_listagem(servidor):
+    # O servidor tem 300 provas: 10 páginas de 30
+    parcial = ConcursoScraper(base_url=servidor)
+    parcial.scrape_multiplas_paginas(num_paginas=3, assincrono=True, taxa_por_host=None)
+    assert not parcial.coleta_completa()
+
+    completa = ConcursoScraper(base_url=servidor)
+    completa.scrape_multiplas_paginas(num_paginas=20, assincrono=True, taxa_por_host=None)
+    assert completa.total_provas() == 300
+    assert completa.coleta_completa()
@@ -0,0 +1,95 @@
+import pytest
+
+from conftest import fazer_prova
+from repositorio import RepositorioProvas
+import versoes
+
+
+def test_duas_gravacoes_do_mesmo_link_entre_publicacoes(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(1)])
+    assert repositorio.publicar_versao() == 1
+
+    repositorio.salvar([fazer_prova(1, titulo='Segunda')])
+    repositorio.salvar([fazer_prova(1, titulo='Terceira')])
+    assert repositorio.publicar_versao() == 2
+
+    delta = versoes.ler_delta('versoes/delta_000002.json.gz')
+    # O estado anterior é o da última versão, não o da gravação intermediária
+    assert delta['modificadas'] == [{'link': fazer_prova(1)['link'],
+                                     'campos': {'titulo': {'de': 'Prova 1', 'para': 'Terceira'}}}]
+    repositorio.fechar()
+
+
+def test_inclusao_e_remocao_antes_da_publicacao_se_anulam(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(1)])
+    repositorio.publicar_versao()
+    repositorio.salvar([fazer_prova(2)])
+    repositorio.salvar([fazer_prova(2, titulo='Outro')])
+    repositorio.salvar([fazer_prova(1)], remover_ausentes=True)
+    assert repositorio.publicar_versao() == 1
+    repositorio.fechar()
+
+
+def test_so_data_coleta_nao_gera_versao(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(1)])
+    repositorio.publicar_versao()
+    repositorio.salvar([fazer_prova(1, data_coleta='2026-02-01 10:00:00')])
+    assert repositorio.publicar_versao() == 1
+    repositorio.fechar()
+
+
+def test_deltas_aplicados_equivalem_a_um_snapshot_novo(em_tmp):
+    pytest.importorskip('pyarrow')
+    from snapshot_colunar import _registros, carregar_snapshot
+
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(i) for i in range(10)])
+    repositorio.publicar_versao()
+    repositorio.exportar_snapshot('v1.parquet')
+    df = carregar_snapshot('v1.parquet')
+    indice = {prova['link']: prova for prova in repositorio.todas()}
+
+    # Inclusões no topo e no meio, campos alterados (inclusive categoria nova) e novos, e uma remoção
+    repositorio.salvar([fazer_prova(20), fazer_prova(3, titulo='Retificada', num_questoes=80),
+                        fazer_prova(21, banca='Vunesp'), fazer_prova(5, banca='Quadrix', arquivo_prova_pdf='a.pdf')])
+    repositorio.salvar([fazer_prova(7, nivel='Médio', data_coleta='2026-03-01 10:00:00')])
+    # Coleta completa em que a prova 8 não aparece mais
+    repositorio.salvar([prova for prova in repositorio.todas() if prova['link'] != fazer_prova(8)['link']],
+                       remover_ausentes=True)
+    repositorio.publicar_versao()
+    repositorio.publicar_versao()  # sem mudanças: não cria versão
+    repositorio.salvar([fazer_prova(22), fazer_prova(0, orgao=None)])
+    assert repositorio.publicar_versao() == 3
+    repositorio.exportar_snapshot('v3.parquet')
+
+    deltas = versoes.deltas_pendentes(1)
+    assert [delta['versao'] for delta in deltas] == [2, 3]
+    for delta in deltas:
+        versoes.aplicar_delta(indice, delta)
+        df = versoes.aplicar_delta_dataframe(df, delta)
+
+    def sem_data_coleta(provas):
+        return [{campo: valor for campo, valor in prova.items() if campo != 'data_coleta'} for prova in provas]
+
+    # O índice não guarda ordem; o DataFrame, sim
+    assert ({prova['link']: prova for prova in sem_data_coleta(indice.values())}
+            == {prova['link']: prova for prova in sem_data_coleta(repositorio.todas())})
+    assert sem_data_coleta(_registros(df)) == sem_data_coleta(_registros(carregar_snapshot('v3.parquet')))
+    repositorio.fechar()
+
+
+def test_coleta_completa_remove_as_ausentes(em_tmp):
+    repositorio = RepositorioProvas()
+    repositorio.salvar([fazer_prova(i) for i in range(5)])
+    repositorio.publicar_versao()
+
+    repositorio.salvar([fazer_prova(i) for i in (0, 1, 3)], remover_ausentes=True)
+    assert repositorio.total() == 3
+    assert repositorio.publicar_versao() == 2
+    delta = versoes.ler_delta('versoes/delta_000002.json.gz')
+    assert sorted(delta['removidas']) == sorted(fazer_prova(i)['link'] for i in (2, 4))
+    assert delta['adicionadas'] == delta['modificadas'] == delta['movidas'] == []
+    repositorio.fechar()
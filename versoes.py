@@ -0,0 +1,332 @@
+"""
+Versões do dataset e deltas entre publicações
+Cada publicação do repositório (fim do scraper, tarefa do agendador ou
+`repositorio.py exportar`) fecha uma versão numerada. O banco registra, por
+gatilhos, o estado anterior de cada prova alterada desde a última versão;
+na publicação essas mudanças viram um delta (versoes/delta_NNNNNN.json.gz)
+com as provas adicionadas (e a posição delas), os links removidos (provas
+que saíram do site, detectadas numa coleta completa da listagem), a nova
+posição das provas que mudaram de lugar e, para as modificadas, a
+diferença campo a campo. O manifesto
+(versoes/manifesto.json) lista as versões, e os snapshots levam o número
+da versão que contêm.
+
+Quem mantém as provas em memória (snapshot colunar, análise, índices
+próprios) aplica só os deltas posteriores à sua versão, em vez de
+recarregar o dataset inteiro:
+
+    deltas = deltas_pendentes(versao_local)
+    if deltas is None:
+        ...  # faltam deltas (ou não há versão local): recarregar tudo
+    for delta in deltas:
+        aplicar_delta(provas_por_link, delta)
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+from datetime import datetime
+
+from arquivos import gravar_atomico
+from modelo import Prova
+
+DIRETORIO_VERSOES = 'versoes'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Mudam a cada nova coleta da mesma prova sem que a prova tenha mudado
+CAMPOS_SEM_DELTA = ('data_coleta',)
+
+_AUSENTE = object()
+
+
+def diferencas(antes, depois):
+    """{campo: {'de': valor antigo, 'para': valor novo}}; o lado em que o campo não existe é omitido"""
+    campos = {}
+    for campo in list(antes) + [campo for campo in depois if campo not in antes]:
+        if campo in CAMPOS_SEM_DELTA:
+            continue
+        de, para = antes.get(campo, _AUSENTE), depois.get(campo, _AUSENTE)
+        if de != para:
+            mudanca = {}
+            if de is not _AUSENTE:
+                mudanca['de'] = de
+            if para is not _AUSENTE:
+                mudanca['para'] = para
+            campos[campo] = mudanca
+    return campos
+
+
+def movidas(linhas):
+    """Provas que mudaram de lugar, a partir de [(link, posição nova, ordem antiga), ...] na ordem nova
+
+    As demais formam a maior sequência que já estava em ordem, então o delta
+    leva só o que foi de fato reposicionado (nada, quando a coleta inteira é
+    regravada na mesma ordem).
+    """
+    linhas = list(linhas)
+    finais, indices_finais = [], []  # menor ordem que encerra uma sequência de cada tamanho
+    anteriores = [None] * len(linhas)
+    for i, (_, _, ordem) in enumerate(linhas):
+        tamanho = bisect.bisect_left(finais, ordem)
+        if tamanho == len(finais):
+            finais.append(ordem)
+            indices_finais.append(i)
+        else:
+            finais[tamanho] = ordem
+            indices_finais[tamanho] = i
+        anteriores[i] = indices_finais[tamanho - 1] if tamanho else None
+    em_ordem = set()
+    i = indices_finais[-1] if indices_finais else None
+    while i is not None:
+        em_ordem.add(i)
+        i = anteriores[i]
+    return [{'link': link, 'posicao': posicao}
+            for i, (link, posicao, _) in enumerate(linhas) if i not in em_ordem]
+
+
+def montar_delta(versao, mudancas, movidas=()):
+    """Delta da `versao` a partir de [(link, dados antes, dados depois, posição), ...]
+
+    Os dados vêm em JSON (None = a prova não existe daquele lado) e a posição
+    é a da prova no dataset novo; `movidas` vem de movidas(). Retorna None se
+    nenhuma mudança tiver efeito.
+    """
+    adicionadas, removidas, modificadas = [], [], []
+    for link, antes, depois, posicao in mudancas:
+        if depois is None:
+            if antes is not None:
+                removidas.append(link)
+        elif antes is None:
+            adicionadas.append({'posicao': posicao, 'prova': json.loads(depois)})
+        else:
+            campos = diferencas(json.loads(antes), json.loads(depois))
+            if campos:
+                modificadas.append({'link': link, 'campos': campos})
+    movidas = list(movidas)
+    if not (adicionadas or removidas or modificadas or movidas):
+        return None
+    return {
+        'versao': versao,
+        'versao_anterior': versao - 1,
+        'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'adicionadas': adicionadas,
+        'removidas': removidas,
+        'modificadas': modificadas,
+        'movidas': movidas,
+    }
+
+
+def gravar_delta(delta, diretorio=DIRETORIO_VERSOES):
+    """Grava o delta comprimido e retorna o nome do arquivo (relativo ao diretório)"""
+    nome = f"delta_{delta['versao']:06d}.json.gz"
+    gravar_atomico(os.path.join(diretorio, nome),
+                   gzip.compress(json.dumps(delta, ensure_ascii=False).encode('utf-8')))
+    return nome
+
+
+def gravar_manifesto(versoes, diretorio=DIRETORIO_VERSOES):
+    manifesto = {'versao': versoes[-1]['versao'] if versoes else 0, 'versoes': versoes}
+    gravar_atomico(os.path.join(diretorio, ARQUIVO_MANIFESTO),
+                   json.dumps(manifesto, ensure_ascii=False, indent=2))
+
+
+def ler_manifesto(diretorio=DIRETORIO_VERSOES):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def ler_delta(caminho):
+    with open(caminho, 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def deltas_pendentes(versao, diretorio=DIRETORIO_VERSOES):
+    """Deltas posteriores à `versao`, em ordem; None se for preciso recarregar tudo
+
+    Sem versão local (0), ou com algum delta faltando no caminho, não há
+    como chegar à versão atual só com deltas.
+    """
+    manifesto = ler_manifesto(diretorio)
+    if manifesto is None or manifesto['versao'] <= versao:
+        return []
+    if not versao:
+        return None
+    deltas = []
+    for entrada in manifesto['versoes']:
+        if entrada['versao'] <= versao:
+            continue
+        if not entrada['delta']:
+            return None
+        try:
+            deltas.append(ler_delta(os.path.join(diretorio, entrada['delta'])))
+        except FileNotFoundError:
+            return None
+    return deltas
+
+
+def aplicar_delta(provas, delta):
+    """Aplica o delta a um índice em memória {link: prova} e retorna quantas provas mudaram
+
+    O índice não tem ordem, então as provas movidas só entram na contagem.
+    """
+    for link in delta['removidas']:
+        provas.pop(link, None)
+    for modificada in delta['modificadas']:
+        prova = provas.get(modificada['link'])
+        if prova is None:
+            continue
+        for campo, mudanca in modificada['campos'].items():
+            if 'para' in mudanca:
+                prova[campo] = mudanca['para']
+            elif campo in prova:
+                del prova[campo]
+    for adicionada in delta['adicionadas']:
+        provas[adicionada['prova']['link']] = Prova.de_dict(adicionada['prova'])
+    return (len(delta['removidas']) + len(delta['modificadas']) + len(delta['adicionadas'])
+            + len(delta.get('movidas', ())))
+
+
+def aplicar_delta_dataframe(df, delta):
+    """Aplica o delta a um DataFrame de provas (tipos do snapshot colunar) e retorna o DataFrame novo
+
+    As modificações são feitas nas próprias linhas. Remoções, inclusões e
+    mudanças de lugar refazem o DataFrame uma vez (cópia das colunas, sem
+    ler nem converter o dataset); as provas adicionadas e as movidas entram
+    na posição que têm no dataset novo, e as demais mantêm a ordem entre si.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from snapshot_colunar import dataframe_colunar
+
+    movidas = delta.get('movidas', [])  # ausente nos deltas gravados antes das mudanças de lugar
+    afetados = ([modificada['link'] for modificada in delta['modificadas']] + delta['removidas']
+                + [movida['link'] for movida in movidas])
+    linhas = {}
+    if afetados:
+        posicoes = np.flatnonzero(df['link'].isin(afetados).to_numpy())
+        linhas = dict(zip(df['link'].to_numpy()[posicoes], posicoes))
+        # Uma atribuição por campo, com todas as linhas que mudaram nele
+        por_campo = {}
+        for modificada in delta['modificadas']:
+            linha = linhas.get(modificada['link'])
+            if linha is None:
+                continue
+            for campo, mudanca in modificada['campos'].items():
+                posicoes_campo, valores = por_campo.setdefault(campo, ([], []))
+                posicoes_campo.append(linha)
+                valores.append(mudanca.get('para'))
+        for campo, (posicoes_campo, valores) in por_campo.items():
+            if campo not in df:
+                df[campo] = pd.Series([None] * len(df), dtype=object)
+            coluna = df[campo]
+            if isinstance(coluna.dtype, pd.CategoricalDtype):
+                valores = [None if valor is None else str(valor) for valor in valores]
+                novos = {valor for valor in valores if valor is not None} - set(coluna.cat.categories)
+                if novos:
+                    df[campo] = coluna.cat.add_categories(sorted(novos))
+            elif campo == 'num_questoes':
+                valores = np.array([valor or 0 for valor in valores], dtype=coluna.dtype)
+            try:
+                df.iloc[posicoes_campo, df.columns.get_loc(campo)] = valores
+            except (TypeError, ValueError):
+                # Valor que não cabe no tipo da coluna (texto em coluna inteira, por exemplo)
+                df[campo] = df[campo].astype(object)
+                df.iloc[posicoes_campo, df.columns.get_loc(campo)] = valores
+    removidas = [linhas[link] for link in delta['removidas'] if link in linhas]
+    movidas = [(movida['posicao'], linhas[movida['link']]) for movida in movidas if movida['link'] in linhas]
+    if not (removidas or delta['adicionadas'] or movidas):
+        return df
+
+    antigas = np.arange(len(df))
+    if removidas or movidas:
+        antigas = np.delete(antigas, removidas + [linha for _, linha in movidas])
+    novas = None
+    if delta['adicionadas']:
+        novas = dataframe_colunar([[adicionada['prova'] for adicionada in delta['adicionadas']]])
+        for campo in novas.columns:
+            if (campo in df and isinstance(novas[campo].dtype, pd.CategoricalDtype)
+                    and isinstance(df[campo].dtype, pd.CategoricalDtype)):
+                # Mesmas categorias dos dois lados, senão o concat vira object
+                novos = novas[campo].cat.categories.difference(df[campo].cat.categories)
+                if len(novos):
+                    df[campo] = df[campo].cat.add_categories(novos)
+                novas[campo] = novas[campo].cat.set_categories(df[campo].cat.categories)
+
+    # Linha de origem de cada posição final: as novas e as movidas onde o delta indica, as demais no resto,
+    # em ordem
+    total = len(antigas) + len(movidas) + (len(novas) if novas is not None else 0)
+    origem = np.empty(total, dtype=np.int64)
+    indicadas = np.zeros(total, dtype=bool)
+    posicoes_novas = [adicionada['posicao'] for adicionada in delta['adicionadas']]
+    origem[posicoes_novas] = len(df) + np.arange(len(posicoes_novas))
+    for posicao, linha in movidas:
+        origem[posicao] = linha
+    indicadas[posicoes_novas + [posicao for posicao, _ in movidas]] = True
+    origem[~indicadas] = antigas
+    if novas is not None:
+        df = pd.concat([df, novas], ignore_index=True)
+    df = df.take(origem)
+    df.index = pd.RangeIndex(total)  # sem a cópia do reset_index
+    return df
+
+
+def exibir_status(diretorio=DIRETORIO_VERSOES):
+    manifesto = ler_manifesto(diretorio)
+    if manifesto is None:
+        print(f"⚠ Nenhuma versão publicada em {diretorio}/")
+        return
+    print(f"\n📦 Versão atual: {manifesto['versao']}\n")
+    for entrada in manifesto['versoes'][-20:]:
+        mudancas = (f"+{entrada['adicionadas']} -{entrada['removidas']} ~{entrada['modificadas']}"
+                    if entrada['delta'] else "versão base (sem delta)")
+        print(f"  v{entrada['versao']:<5} {entrada['data']}  {entrada['total']:>8} provas  {mudancas}")
+
+
+def exibir_delta(versao, diretorio=DIRETORIO_VERSOES, limite=20):
+    try:
+        delta = ler_delta(os.path.join(diretorio, f"delta_{versao:06d}.json.gz"))
+    except FileNotFoundError:
+        print(f"⚠ Não há delta da versão {versao} em {diretorio}/")
+        return
+    print(f"\n📦 Versão {delta['versao']} ({delta['data']}), desde a {delta['versao_anterior']}\n")
+    print(f"➕ {len(delta['adicionadas'])} adicionadas")
+    for adicionada in delta['adicionadas'][:limite]:
+        prova = adicionada['prova']
+        print(f"   {prova.get('titulo', prova['link'])}")
+    print(f"➖ {len(delta['removidas'])} removidas")
+    for link in delta['removidas'][:limite]:
+        print(f"   {link}")
+    print(f"↕ {len(delta.get('movidas', ()))} mudaram de lugar")
+    print(f"✏️  {len(delta['modificadas'])} modificadas")
+    for modificada in delta['modificadas'][:limite]:
+        print(f"   {modificada['link']}")
+        for campo, mudanca in modificada['campos'].items():
+            print(f"      {campo}: {mudanca.get('de', '—')!r} → {mudanca.get('para', '—')!r}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Versões do dataset e deltas entre publicações")
+    parser.add_argument('--diretorio', default=DIRETORIO_VERSOES,
+                        help=f"diretório das versões (padrão: {DIRETORIO_VERSOES})")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('status', help="lista as versões publicadas")
+    mostrar = sub.add_parser('mostrar', help="mostra o delta de uma versão")
+    mostrar.add_argument('versao', type=int)
+    mostrar.add_argument('--limite', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.comando == 'status':
+        exibir_status(args.diretorio)
+    else:
+        exibir_delta(args.versao, args.diretorio, args.limite)
+
+
+if __name__ == "__main__":
+    main()